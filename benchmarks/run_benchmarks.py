@@ -0,0 +1,283 @@
+"""
+Sanmiao benchmark suite.
+
+Runs the main entry points over the bundled corpora (single dates, annals paragraphs,
+date-free prose, a TEI sample) and generated ISO / JDN / year lists, and writes one JSON
+document with throughput, p50/p99 latency and peak traced memory per case.
+
+Usage::
+
+    python benchmarks/run_benchmarks.py                     # full run, prints a table
+    python benchmarks/run_benchmarks.py --quick --out b.json
+    python benchmarks/run_benchmarks.py --only jdn --repeat 5
+    python benchmarks/run_benchmarks.py --compare baseline.json   # exit 1 on regressions
+    python benchmarks/run_benchmarks.py --synthetic 500     # add a generated corpus (sanmiao.synthetic)
+
+Latency samples are per unit of work: one call for the single-input APIs, one chunk
+(taken from the progress callback) for the batch APIs, and one whole call for the
+vectorised *_batch converters. Tables are loaded in an untimed warm-up run first.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+import sanmiao
+from sanmiao import (
+    cjk_date_interpreter,
+    jdn_to_ccs,
+    jdn_to_ccs_batch,
+    jy_to_ccs,
+    jy_to_ccs_batch,
+    resolve_dates_batch,
+    tag_dates_batch,
+)
+from sanmiao.converters import jdn_to_iso
+from sanmiao.ns import TEI_NS
+from sanmiao.synthetic import generate_corpus
+from sanmiao.tei_bridge import propose_dates_batch
+
+SCHEMA = 1
+CORPORA = Path(__file__).parent / 'corpora'
+
+SINGLE_DATES = [
+    '貞觀三年四月甲子',
+    '建安十八年五月丙申',
+    '永明元年正月辛亥',
+    '宋太祖建隆元年',
+    '唐開元十年',
+    '元狩元年五月乙巳晦',
+    '貞觀二年三月戊寅朔',
+    '建隆元年閏三月',
+    '明治元年九月八日',
+    '天平勝寶元年七月甲午',
+]
+
+PROLIFERATE_DATES = [
+    '三年四月甲子',
+    '十八年五月丙申',
+]
+
+
+@dataclass
+class Case:
+    name: str
+    items: int
+    run: Callable[[], list[float]]  # one timed pass; returns latency samples in seconds
+
+
+def _lines(name: str) -> list[str]:
+    return [ln.strip() for ln in (CORPORA / name).read_text(encoding='utf-8').splitlines() if ln.strip()]
+
+
+def _tei_inputs() -> tuple[list[str], list[str]]:
+    """Paragraph texts and serialised <date> elements from the TEI sample."""
+    import lxml.etree as et
+
+    root = et.parse(str(CORPORA / 'sample_tei.xml')).getroot()
+    paragraphs = [''.join(p.itertext()) for p in root.iter(f'{{{TEI_NS}}}p') if p.getparent().tag != f'{{{TEI_NS}}}publicationStmt']
+    paragraphs = [p for p in paragraphs if any(c in p for c in '年月')]
+    dates = [et.tostring(d, encoding='unicode', with_tail=False) for d in root.iter(f'{{{TEI_NS}}}date')]
+    return paragraphs, dates
+
+
+def _per_call(fn: Callable, inputs: list) -> Callable[[], list[float]]:
+    def run() -> list[float]:
+        samples = []
+        for x in inputs:
+            t0 = time.perf_counter()
+            fn(x)
+            samples.append(time.perf_counter() - t0)
+        return samples
+    return run
+
+
+def _per_chunk(fn: Callable, inputs: list, callback: str, **kwargs) -> Callable[[], list[float]]:
+    """Latency of each chunk, measured between successive progress events."""
+    def run() -> list[float]:
+        marks = []
+
+        def on_event(event: dict) -> None:
+            if event.get('type') in ('init', 'chunk'):
+                marks.append(time.perf_counter())
+
+        fn(inputs, **{callback: on_event}, **kwargs)
+        return list(np.diff(marks))
+    return run
+
+
+def _whole_call(fn: Callable, inputs, **kwargs) -> Callable[[], list[float]]:
+    def run() -> list[float]:
+        t0 = time.perf_counter()
+        fn(inputs, **kwargs)
+        return [time.perf_counter() - t0]
+    return run
+
+
+def build_cases(quick: bool = False, synthetic: int = 0) -> list[Case]:
+    rng = np.random.default_rng(20260101)
+    annals = _lines('annals.txt')
+    prose = _lines('prose.txt')
+    tei_paragraphs, tei_dates = _tei_inputs()
+    n_single, n_list, n_batch = (50, 500, 5000) if quick else (200, 2000, 50000)
+    # -606 .. 1872: some late-19th/20th-century lunations have no year ganzhi, which
+    # jdn_to_ccs rejects
+    jdns = rng.uniform(1_500_000, 2_405_000, size=n_batch).round() + 0.5
+    isos = [jdn_to_iso(float(j)) for j in jdns[:n_list]]
+    years = rng.integers(-500, 2050, size=n_list).tolist()
+    civ = ['c', 'j', 'k']
+
+    cases = [
+        Case('cjk_date_interpreter/single', len(SINGLE_DATES),
+             _per_call(lambda s: cjk_date_interpreter(s, civ=civ), SINGLE_DATES)),
+        Case('cjk_date_interpreter/iso', 20,
+             _per_call(lambda s: cjk_date_interpreter(s, civ=civ), isos[:20])),
+        Case('cjk_date_interpreter/proliferate', len(PROLIFERATE_DATES),
+             _per_call(lambda s: cjk_date_interpreter(s, civ=['c'], sequential=False), PROLIFERATE_DATES)),
+        Case('propose_dates_batch/annals', len(annals),
+             _per_chunk(propose_dates_batch, annals, 'on_chunk', civ=civ)),
+        Case('propose_dates_batch/prose', len(prose),
+             _per_chunk(propose_dates_batch, prose, 'on_chunk', civ=civ)),
+        Case('propose_dates_batch/tei', len(tei_paragraphs),
+             _per_chunk(propose_dates_batch, tei_paragraphs, 'on_chunk', civ=civ)),
+        Case('tag_dates_batch/annals', len(annals),
+             _per_chunk(tag_dates_batch, annals, 'on_chunk', civ=civ)),
+        Case('resolve_dates_batch/tei', len(tei_dates),
+             _per_chunk(resolve_dates_batch, tei_dates, 'on_progress', civ=civ)),
+        Case('resolve_dates_batch/tei_one_pass', len(tei_dates),
+             _whole_call(resolve_dates_batch, tei_dates, civ=civ, one_pass=True)),
+        Case('jdn_to_ccs/jdn', n_single,
+             _per_call(lambda j: jdn_to_ccs(j, civ=civ), [float(j) for j in jdns[:n_single]])),
+        Case('jdn_to_ccs/iso', n_single,
+             _per_call(lambda s: jdn_to_ccs(s, civ=civ), isos[:n_single])),
+        Case('jdn_to_ccs_batch/jdn', n_batch,
+             _whole_call(jdn_to_ccs_batch, jdns, civ=civ)),
+        Case('jy_to_ccs/years', n_single,
+             _per_call(lambda y: jy_to_ccs(y, civ=civ), years[:n_single])),
+        Case('jy_to_ccs_batch/years', n_list,
+             _whole_call(jy_to_ccs_batch, years, civ=civ)),
+    ]
+    if synthetic:
+        paragraphs = [p['text'] for p in generate_corpus(synthetic, seed=20260101, civ=civ)]
+        cases.append(Case('propose_dates_batch/synthetic', len(paragraphs),
+                          _per_chunk(propose_dates_batch, paragraphs, 'on_chunk', civ=civ)))
+    return cases
+
+
+def measure(case: Case, repeat: int, memory: bool = True) -> dict:
+    case.run()  # warm-up: table loads and caches
+    samples: list[float] = []
+    wall = 0.0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        samples.extend(case.run())
+        wall += time.perf_counter() - t0
+    result = {
+        'name': case.name,
+        'items': case.items,
+        'repeat': repeat,
+        'samples': len(samples),
+        'wall_s': round(wall, 4),
+        'throughput_per_s': round(case.items * repeat / wall, 2) if wall else None,
+        'p50_ms': round(float(np.percentile(samples, 50)) * 1000, 3) if samples else None,
+        'p99_ms': round(float(np.percentile(samples, 99)) * 1000, 3) if samples else None,
+        'peak_mb': None,
+    }
+    if memory:
+        tracemalloc.start()
+        try:
+            case.run()
+            result['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_suite(quick: bool = False, repeat: int = 3, only: str | None = None, memory: bool = True,
+              synthetic: int = 0) -> dict:
+    cases = [c for c in build_cases(quick, synthetic) if not only or only in c.name]
+    results = []
+    for case in cases:
+        print(f'  {case.name} ...', file=sys.stderr, flush=True)
+        results.append(measure(case, repeat, memory=memory))
+    return {
+        'schema': SCHEMA,
+        'sanmiao': sanmiao.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'quick': quick,
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Cases whose throughput dropped or p99 latency grew by more than threshold (a fraction).
+    """
+    before = {r['name']: r for r in baseline.get('results', [])}
+    regressions = []
+    for r in current['results']:
+        b = before.get(r['name'])
+        if not b:
+            continue
+        if b.get('throughput_per_s') and r.get('throughput_per_s') is not None:
+            drop = 1 - r['throughput_per_s'] / b['throughput_per_s']
+            if drop > threshold:
+                regressions.append(f"{r['name']}: throughput {b['throughput_per_s']} -> {r['throughput_per_s']}/s ({drop:.0%} slower)")
+        if b.get('p99_ms') and r.get('p99_ms') is not None:
+            growth = r['p99_ms'] / b['p99_ms'] - 1
+            if growth > threshold:
+                regressions.append(f"{r['name']}: p99 {b['p99_ms']} -> {r['p99_ms']} ms (+{growth:.0%})")
+    return regressions
+
+
+def format_table(report: dict) -> str:
+    rows = [f"{'case':40} {'items/s':>12} {'p50 ms':>10} {'p99 ms':>10} {'peak MB':>9}"]
+    for r in report['results']:
+        rows.append(
+            f"{r['name']:40} {r['throughput_per_s'] or 0:>12.1f} {r['p50_ms'] or 0:>10.2f} "
+            f"{r['p99_ms'] or 0:>10.2f} {r['peak_mb'] if r['peak_mb'] is not None else '-':>9}"
+        )
+    return '\n'.join(rows)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python benchmarks/run_benchmarks.py')
+    parser.add_argument('--quick', action='store_true', help='smaller inputs (for CI / pre-release checks)')
+    parser.add_argument('--repeat', type=int, default=3, help='timed passes per case (default: 3)')
+    parser.add_argument('--only', metavar='TEXT', help='run only cases whose name contains TEXT')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--out', metavar='PATH', help='write the JSON report here')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='regression threshold (default: 0.2)')
+    parser.add_argument('--synthetic', type=int, default=0, metavar='N', help='add a generated corpus of N dates')
+    args = parser.parse_args(argv)
+
+    report = run_suite(quick=args.quick, repeat=args.repeat, only=args.only, memory=not args.no_memory,
+                       synthetic=args.synthetic)
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(format_table(report))
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        regressions = compare(report, baseline, args.threshold)
+        for line in regressions:
+            print(f'REGRESSION {line}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1028 @@
+"""
+Array-backed solver kernel for ``extract_date_table_bulk``.
+
+The default ('frame') kernel runs each date's candidates through ``solving.py`` as small
+DataFrames, where pandas' per-call overhead dominates for the usual 1–20 rows. This kernel
+holds a date's candidates as NumPy column arrays (``Candidates``), applies the same
+constraint logic as ``solve_date_simple`` / ``solve_date_with_year`` /
+``solve_date_with_lunar_constraints`` / ``add_jdn_and_iso_to_proliferate_candidates``, and
+builds a DataFrame once, for the solved result.
+
+Select it with ``extract_date_table_bulk(..., solver_kernel='array')`` or
+``SANMIAO_SOLVER_KERNEL=array``. Results match the frame kernel, which stays the default
+and the reference: changes to the solving rules go into ``solving.py`` first and are
+mirrored here.
+"""
+
+from __future__ import annotations
+
+import operator
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype
+
+from .config import DEFAULT_SOLVER_KERNEL, DEFAULT_TPQ, DEFAULT_TAQ, phrase_dic_en
+from .converters import ganshu, jdn_to_iso, gz_year
+
+SOLVER_KERNELS = ('frame', 'array')
+
+# drop_duplicates falls back to pandas above this many rows
+_PY_DEDUP_MAX_ROWS = 2000
+
+
+def resolve_solver_kernel(kernel: str | None = None) -> str:
+    """
+    Kernel name from the argument, else SANMIAO_SOLVER_KERNEL, else DEFAULT_SOLVER_KERNEL.
+    """
+    if kernel is None:
+        kernel = os.environ.get('SANMIAO_SOLVER_KERNEL', '').strip().lower() or DEFAULT_SOLVER_KERNEL
+    if kernel not in SOLVER_KERNELS:
+        raise ValueError(f"solver_kernel must be one of {SOLVER_KERNELS}, got {kernel!r}")
+    return kernel
+
+
+def _isna(a: np.ndarray) -> np.ndarray:
+    if a.dtype.kind == 'f':
+        return np.isnan(a)
+    if a.dtype.kind in 'iub':
+        return np.zeros(len(a), dtype=bool)
+    return pd.isna(a)
+
+
+def _unique(a: np.ndarray) -> np.ndarray:
+    """Non-null values in order of appearance (``Series.dropna().unique()``)."""
+    return pd.unique(a[~_isna(a)])
+
+
+def _is_number(v) -> bool:
+    return isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, (bool, np.bool_))
+
+
+def _compare(a: np.ndarray, b, op) -> np.ndarray:
+    """Elementwise comparison with pandas semantics (nulls compare False, except !=)."""
+    if a.dtype.kind in 'iuf' and (b.dtype.kind in 'iuf' if isinstance(b, np.ndarray) else _is_number(b)):
+        return op(a, b)
+    right = pd.Series(b, copy=False) if isinstance(b, np.ndarray) else b
+    return np.asarray(op(pd.Series(a, copy=False), right), dtype=bool)
+
+
+def _isin(a: np.ndarray, values) -> np.ndarray:
+    values = list(values)
+    if a.dtype.kind in 'iuf' and all(_is_number(v) for v in values):
+        return np.isin(a, values)
+    return pd.Series(a, copy=False).isin(values).to_numpy()
+
+
+def _full(n: int, value) -> np.ndarray:
+    """Column for ``df[col] = value``, with the dtype pandas gives a broadcast scalar."""
+    if isinstance(value, (bool, np.bool_)):
+        return np.full(n, value, dtype=bool)
+    if isinstance(value, np.generic):
+        return np.full(n, value, dtype=value.dtype)
+    if isinstance(value, int):
+        return np.full(n, value, dtype=np.int64)
+    if isinstance(value, float):
+        return np.full(n, value, dtype=np.float64)
+    out = np.empty(n, dtype=object)
+    out[:] = [value] * n
+    return out
+
+
+def _infer(values: list) -> np.ndarray:
+    """Column for a list of Python results, typed the way pandas types an ``apply`` result."""
+    kinds = set(map(type, values))
+    if kinds <= {int}:
+        return np.array(values, dtype=np.int64)
+    if kinds <= {int, float}:
+        return np.array(values, dtype=np.float64)
+    if kinds <= {str, type(None)}:
+        out = np.empty(len(values), dtype=object)
+        out[:] = values
+        return out
+    return pd.Series(values).to_numpy()
+
+
+def _map(fn, a: np.ndarray) -> np.ndarray:
+    """``Series.apply(fn)``: Python scalars in, inferred column out."""
+    if len(a) == 0:
+        return a.copy()
+    return _infer([fn(v) for v in a.tolist()])
+
+
+def _reinfer(a: np.ndarray) -> np.ndarray:
+    """Re-type an object column the way ``pd.DataFrame(list_of_rows)`` would."""
+    if a.dtype != object or len(a) == 0:
+        return a
+    return _infer(a.tolist())
+
+
+def _keys(a: np.ndarray) -> list:
+    """Hashable per-row values, nulls collapsed to None (pandas matches null with null)."""
+    mask = _isna(a)
+    values = a.tolist()
+    if mask.any():
+        for i in np.flatnonzero(mask):
+            values[i] = None
+    return values
+
+
+def _with_missing(a: np.ndarray, missing: np.ndarray) -> np.ndarray:
+    """Fill unmatched rows of a left-merge column with NaN, upcasting as pandas does."""
+    if a.dtype.kind in 'iu':
+        a = a.astype(np.float64)
+    elif a.dtype.kind == 'f':
+        a = a.copy()
+    else:
+        a = a.astype(object)
+    a[missing] = np.nan
+    return a
+
+
+class Candidates:
+    """
+    One date's candidate rows as a struct of column arrays.
+
+    Arrays are never modified in place, so filtering and copying share them freely.
+    ``dtypes`` keeps the pandas dtype of object and ``str`` columns taken from a DataFrame,
+    so ``to_frame`` gives back what the frame kernel would have produced.
+
+    :param cols: dict, column name -> 1-D ndarray (in column order)
+    :param index: ndarray, row labels
+    :param dtypes: dict, column name -> pandas dtype for object / extension columns
+    """
+
+    __slots__ = ('cols', 'index', 'dtypes')
+
+    def __init__(self, cols: dict, index: np.ndarray, dtypes: dict | None = None):
+        self.cols = cols
+        self.index = index
+        self.dtypes = dtypes if dtypes is not None else {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'Candidates':
+        cols = {}
+        dtypes = {}
+        for name, s in df.items():
+            cols[name] = s.to_numpy()
+            if not isinstance(s.dtype, np.dtype) or s.dtype == object:
+                dtypes[name] = s.dtype
+        return cls(cols, df.index.to_numpy(), dtypes)
+
+    @classmethod
+    def empty_frame(cls) -> 'Candidates':
+        """Counterpart of ``pd.DataFrame()``."""
+        return cls({}, np.arange(0))
+
+    def to_frame(self) -> pd.DataFrame:
+        index = pd.Index(self.index)
+        data = {}
+        for name, a in self.cols.items():
+            dtype = self.dtypes.get(name)
+            if dtype is not None and a.dtype == object:
+                # only wrap where plain inference would pick another dtype
+                is_str = infer_dtype(a, skipna=True) == 'string'
+                if (dtype == object) == is_str:
+                    a = pd.Series(a, index=index, dtype=dtype, copy=False)
+            data[name] = a
+        return pd.DataFrame(data, index=index)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.index) == 0 or not self.cols
+
+    def __contains__(self, name) -> bool:
+        return name in self.cols
+
+    def __getitem__(self, name) -> np.ndarray:
+        return self.cols[name]
+
+    def __setitem__(self, name, value) -> None:
+        """``df[name] = value``: replaces the column (and its dtype)."""
+        self.cols[name] = value if isinstance(value, np.ndarray) else _full(len(self), value)
+        self.dtypes.pop(name, None)
+
+    def __delitem__(self, name) -> None:
+        del self.cols[name]
+        self.dtypes.pop(name, None)
+
+    def alias(self, name, source) -> None:
+        """``df[name] = df[source]``."""
+        self.cols[name] = self.cols[source]
+        if source in self.dtypes:
+            self.dtypes[name] = self.dtypes[source]
+        else:
+            self.dtypes.pop(name, None)
+
+    def append_text(self, name, text) -> None:
+        """``df[name] += text`` on a string column; nulls stay null."""
+        out = np.empty(len(self), dtype=object)
+        out[:] = [v + text if isinstance(v, str) else (np.nan if pd.isna(v) else v + text)
+                  for v in self.cols[name].tolist()]
+        self.cols[name] = out
+
+    def copy(self) -> 'Candidates':
+        return Candidates(dict(self.cols), self.index, dict(self.dtypes))
+
+    def take(self, rows) -> 'Candidates':
+        """Rows by boolean mask or positions (labels kept)."""
+        return Candidates({k: a[rows] for k, a in self.cols.items()}, self.index[rows], dict(self.dtypes))
+
+    def head(self, n: int) -> 'Candidates':
+        return self.take(slice(0, n))
+
+    def select(self, names) -> 'Candidates':
+        return Candidates({n: self.cols[n] for n in names}, self.index,
+                          {n: t for n, t in self.dtypes.items() if n in names})
+
+    def drop(self, names) -> 'Candidates':
+        names = set(names)
+        return Candidates({k: a for k, a in self.cols.items() if k not in names}, self.index,
+                          {k: t for k, t in self.dtypes.items() if k not in names})
+
+    def rename(self, mapping: dict) -> 'Candidates':
+        return Candidates({mapping.get(k, k): a for k, a in self.cols.items()}, self.index,
+                          {mapping.get(k, k): t for k, t in self.dtypes.items()})
+
+    def notna(self, name) -> np.ndarray:
+        return ~_isna(self.cols[name])
+
+    def unique(self, name) -> np.ndarray:
+        return _unique(self.cols[name])
+
+    def all_na(self, name) -> bool:
+        """True when the column is missing or entirely null."""
+        return name not in self.cols or bool(_isna(self.cols[name]).all())
+
+    def first(self, name, default=None):
+        """``df.iloc[0].get(name)`` (a NumPy scalar for numeric columns)."""
+        a = self.cols.get(name)
+        return a[0] if a is not None else default
+
+    def reinfer(self) -> 'Candidates':
+        """Dtypes as ``pd.DataFrame([row.copy() for _, row in df.iterrows()])`` would give them."""
+        return Candidates({k: _reinfer(a) for k, a in self.cols.items()}, self.index)
+
+    def drop_duplicates(self) -> 'Candidates':
+        n = len(self)
+        if n < 2 or not self.cols:
+            return self.copy()
+        if n > _PY_DEDUP_MAX_ROWS:
+            dup = pd.DataFrame({i: a for i, a in enumerate(self.cols.values())}).duplicated().to_numpy()
+            return self.take(~dup) if dup.any() else self.copy()
+        seen = set()
+        keep = []
+        for pos, row in enumerate(zip(*(_keys(a) for a in self.cols.values()))):
+            if row not in seen:
+                seen.add(row)
+                keep.append(pos)
+        return self.take(np.array(keep, dtype=np.intp)) if len(keep) < n else self.copy()
+
+    def merge_plan(self, right: 'Candidates', on: list) -> tuple[np.ndarray, np.ndarray]:
+        """Row pairs of ``self.merge(right, how='left', on=on)``; -1 marks an unmatched left row."""
+        groups: dict = {}
+        for pos, key in enumerate(zip(*(_keys(right[c]) for c in on))):
+            groups.setdefault(key, []).append(pos)
+        li: list[int] = []
+        ri: list[int] = []
+        for pos, key in enumerate(zip(*(_keys(self[c]) for c in on))):
+            hits = groups.get(key)
+            if hits:
+                li.extend([pos] * len(hits))
+                ri.extend(hits)
+            else:
+                li.append(pos)
+                ri.append(-1)
+        return np.array(li, dtype=np.intp), np.array(ri, dtype=np.intp)
+
+    def merge_left(self, right: 'Candidates', on: list, plan=None) -> 'Candidates':
+        """
+        ``self.merge(right, how='left', on=on)``: left row order, matches in right order,
+        overlapping columns suffixed _x / _y, fresh RangeIndex.
+        """
+        li, ri = plan if plan is not None else self.merge_plan(right, on)
+        missing = ri < 0
+        overlap = (set(self.cols) & set(right.cols)) - set(on)
+        cols = {}
+        dtypes = {}
+        for name, a in self.cols.items():
+            out = f'{name}_x' if name in overlap else name
+            cols[out] = a[li]
+            if name in self.dtypes:
+                dtypes[out] = self.dtypes[name]
+        for name, a in right.cols.items():
+            if name in on:
+                continue
+            out = f'{name}_y' if name in overlap else name
+            if len(a) == 0:
+                taken = _with_missing(np.empty(len(li), dtype=a.dtype), np.ones(len(li), dtype=bool))
+            else:
+                taken = a[ri]
+                if missing.any():
+                    taken = _with_missing(taken, missing)
+            cols[out] = taken
+            if name in right.dtypes:
+                dtypes[out] = right.dtypes[name]
+        return Candidates(cols, np.arange(len(li)), dtypes)
+
+
+def _row_bytes(c: Candidates) -> float:
+    """Shallow bytes per row, as ``budget.frame_row_bytes`` counts them."""
+    if c.empty:
+        return 0.0
+    return float(sum(a.itemsize for a in c.cols.values()) + c.index.itemsize)
+
+
+def _update_implied_ids(df: Candidates, updated_implied: dict) -> None:
+    for i in ['cal_stream', 'dyn_id', 'ruler_id', 'era_id']:
+        if i in df:
+            unique_vals = df.unique(i)
+            if len(unique_vals) == 1:
+                updated_implied.update({f'{i}_ls': list(unique_vals)})
+
+
+def _month_fallback(g: Candidates) -> Candidates:
+    """``g.copy()[g['month'] == g['lunar_month']]``: candidates whose own month matched."""
+    return g.take(_compare(g['month'], g['lunar_month'], operator.eq))
+
+
+def preference_filter(table: Candidates, implied: dict) -> Candidates:
+    """
+    Array counterpart of ``solving.preference_filtering_bulk``.
+    """
+    if len(table) < 2:
+        return table
+
+    bu = table
+    for col, key in (('era_id', 'era_id_ls'), ('ruler_id', 'ruler_id_ls'), ('dyn_id', 'dyn_id_ls')):
+        ids = implied.get(key, [])
+        if col in table and len(ids) > 0:
+            table = table.take(_isin(table[col], ids))
+            if table.empty:
+                table = bu
+            else:
+                bu = table
+
+    mn = implied.get('month')
+    if 'month' in table and mn is not None:
+        if len(table) > 1:
+            if len(table.unique('month')) > 1:
+                table = table.take(_compare(table['month'], mn, operator.eq))
+            if table.empty:
+                table = bu
+            else:
+                bu = table
+
+    inter = implied.get('intercalary')
+    bu = table
+    if 'intercalary' in table and inter is not None:
+        if len(table) > 1:
+            if len(table.unique('intercalary')) > 1:
+                table = table.take(_compare(table['intercalary'], inter, operator.eq))
+            if table.empty:
+                table = bu
+
+    return table.drop_duplicates()
+
+
+def solve_simple(g: Candidates, implied: dict, phrase_dic=phrase_dic_en, tpq=DEFAULT_TPQ, taq=DEFAULT_TAQ):
+    """
+    Array counterpart of ``solving.solve_date_simple``.
+    :return: tuple (Candidates, updated_implied)
+    """
+    if g.empty:
+        return Candidates.empty_frame(), implied.copy()
+
+    df = preference_filter(g.copy(), implied)
+    updated_implied = implied.copy()
+
+    context_cols = [c for c in ('dyn_id', 'ruler_id', 'era_id', 'cal_stream') if c in df]
+    has_explicit_context = any(df.notna(c).any() for c in context_cols)
+
+    rel_dir = None
+    rel_unit = None
+    if 'rel_dir' in df:
+        vals = df.unique('rel_dir')
+        rel_dir = str(vals[0]).strip() if len(vals) > 0 else None
+    if 'rel_unit' in df:
+        vals = df.unique('rel_unit')
+        rel_unit = str(vals[0]).strip() if len(vals) > 0 else None
+
+    relative_year_offsets = {'明', '來', '次', '去', '昨', '前', '後'}
+    is_relative_year_shift = (rel_unit in ('年', '歲')) and (rel_dir in relative_year_offsets)
+
+    is_null_relative = (rel_dir in ('是', '其', '今')) and (rel_unit in (None, '', '年', '歲', '月'))
+    is_null_relative_month = is_null_relative and (rel_unit == '月')
+    is_null_relative_year = is_null_relative and (rel_unit in ('年', '歲'))
+
+    if has_explicit_context or is_relative_year_shift:
+        updated_implied.update({'year': None, 'month': None, 'intercalary': None})
+    elif is_null_relative_month or is_null_relative_year:
+        # 是月/其月/今月 and 是歲/其年/今年: inherit month, year and the context lists
+        for key in ('month', 'intercalary', 'year', 'sex_year'):
+            if implied.get(key) is not None:
+                updated_implied[key] = implied[key]
+        for key in ['cal_stream_ls', 'dyn_id_ls', 'ruler_id_ls', 'era_id_ls']:
+            if key in implied and implied[key]:
+                updated_implied[key] = implied[key]
+
+    _update_implied_ids(df, updated_implied)
+
+    if len(df) > 1:
+        if 'era_start_year' in df and 'era_end_year' in df:
+            if not (df.notna('era_start_year') & df.notna('era_end_year')).any():
+                keep = (_compare(df['era_start_year'], tpq, operator.ge)
+                        & _compare(df['era_end_year'], taq, operator.le))
+                temp = df.take(keep)
+                if not temp.empty:
+                    df = temp
+                else:
+                    df = g.copy()
+                    df.append_text('error_str', "Dyn-rul-era mismatch; ")
+
+    return df, updated_implied
+
+
+def _era_lookup(era_df: pd.DataFrame) -> pd.DataFrame:
+    era_lookup = era_df[['era_id', 'era_start_year']].drop_duplicates(subset=['era_id'])
+    if 'era_end_year' in era_df.columns:
+        era_lookup = era_lookup.merge(era_df[['era_id', 'era_end_year']].drop_duplicates(subset=['era_id']), on='era_id')
+    if 'max_year' in era_df.columns:
+        era_lookup = era_lookup.merge(era_df[['era_id', 'max_year']].drop_duplicates(subset=['era_id']), on='era_id')
+    return era_lookup
+
+
+def _expand_rows(df: Candidates, rows: list[int], updates: dict) -> Candidates:
+    """
+    ``pd.DataFrame(expanded_rows)`` for row copies of ``df`` (positions ``rows``) with
+    per-copy values in ``updates``; columns are re-typed as pandas re-infers them.
+    """
+    if not rows:
+        return Candidates.empty_frame()
+    out = df.take(np.array(rows, dtype=np.intp)).reinfer()
+    for name, values in updates.items():
+        if name in out:
+            out.cols[name] = _infer(values)
+        else:
+            out[name] = _infer(values)
+    return out
+
+
+def solve_with_year(g: Candidates, implied: dict, era_df: pd.DataFrame, phrase_dic=phrase_dic_en,
+                    tpq=DEFAULT_TPQ, taq=DEFAULT_TAQ, has_month=False, has_day=False, has_gz=False,
+                    has_lp=False, budget=None):
+    """
+    Array counterpart of ``solving.solve_date_with_year``.
+    :return: tuple (Candidates, updated_implied)
+    """
+    if g.empty:
+        return Candidates.empty_frame(), implied.copy()
+
+    df = g.copy()
+    updated_implied = implied.copy()
+
+    year = None
+    year_from_era_selection = False
+    if 'year' in df:
+        year_vals = df.unique('year')
+        if len(year_vals) > 0:
+            year = int(year_vals[0])
+            if year == 1 and 'ruler_id' in df and len(df.unique('ruler_id')) > 1:
+                year_from_era_selection = True
+
+    sex_year = None
+    if 'sex_year' in df:
+        sex_year_vals = df.unique('sex_year')
+        if len(sex_year_vals) > 0:
+            sex_year = int(sex_year_vals[0])
+
+    if year is not None:
+        if df.all_na('era_id') and implied.get('era_id_ls'):
+            implied_era_id = implied['era_id_ls'][0]
+            era_rows = era_df[era_df['era_id'] == implied_era_id]
+            era_info = era_rows.iloc[0] if not era_rows.empty else None
+            if era_info is not None:
+                df['era_id'] = implied_era_id
+                for col in ('ruler_id', 'dyn_id', 'cal_stream', 'era_start_year', 'era_end_year', 'max_year', 'era_name'):
+                    df[col] = era_info[col]
+        elif 'era_id' in df and df.notna('era_id').any():
+            need_era = df.all_na('era_start_year')
+            if need_era and 'era_id' in era_df.columns and 'era_start_year' in era_df.columns:
+                df = df.merge_left(Candidates.from_frame(_era_lookup(era_df)), ['era_id'])
+
+        if 'max_year' in df:
+            bu = df
+            df = df.take(_compare(df['max_year'], year, operator.ge))
+            if df.empty:
+                df = bu.copy()
+                df.append_text('error_str', phrase_dic.get('year-over-max', 'Year out of bounds; '))
+
+        if 'era_start_year' in df:
+            df['ind_year'] = df['era_start_year'] + year - 1
+            if sex_year is None:
+                df['sex_year'] = _map(gz_year, df['ind_year'])
+        else:
+            df['ind_year'] = None
+
+        updated_implied = implied.copy()
+        if implied.get('year') != year:
+            updated_implied.update({'year': year, 'month': None, 'intercalary': None})
+        else:
+            updated_implied['year'] = year
+
+    elif sex_year is not None:
+        gz_origin = -596 + sex_year - 1
+        if 'era_start_year' in df and 'era_end_year' in df:
+            starts = df['era_start_year']
+            ends = df['era_end_year']
+            valid_starts = starts[~_isna(starts)]
+            valid_ends = ends[~_isna(ends)]
+            era_min = valid_starts.min() if len(valid_starts) else np.nan
+            era_max = valid_ends.max() if len(valid_ends) else np.nan
+            if pd.isna(era_min) or pd.isna(era_max) or pd.isna(gz_origin):
+                df['error_str'] = 'Missing era or sexagenary year data'
+                return df, implied
+
+            cycles_elapsed = int((era_min - gz_origin) / 60)
+            last_instance = int(cycles_elapsed * 60 + gz_origin)
+            ind_years = [i for i in range(last_instance, int(era_max) + 1, 60)]
+
+            if budget is not None and len(ind_years) > 0:
+                years = np.array(ind_years)
+                n_rows = (np.searchsorted(years, ends, side='right')
+                          - np.searchsorted(years, starts, side='left')).clip(0).sum()
+                date_index = df.first('date_index')
+                if not budget.allow_rows(date_index, n_rows, _row_bytes(df), 'sexagenary year expansion'):
+                    return df.head(0), implied
+
+            if len(ind_years) > 0:
+                rows, new_ind, new_year = [], [], []
+                for pos, (era_start, era_end) in enumerate(zip(starts.tolist(), ends.tolist())):
+                    for ind_year in ind_years:
+                        if era_start <= ind_year <= era_end:
+                            rows.append(pos)
+                            new_ind.append(ind_year)
+                            new_year.append(ind_year - era_start + 1)
+                df = _expand_rows(df, rows, {'ind_year': new_ind, 'year': new_year})
+
+        updated_implied = implied.copy()
+        updated_implied.update({'sex_year': sex_year, 'month': None, 'intercalary': None})
+
+    elif not has_month and not has_day and not has_gz and not has_lp:
+        implied_year = implied.get('year')
+        if implied_year is not None:
+            if 'era_start_year' in df:
+                df['year'] = implied_year
+                df['ind_year'] = df['era_start_year'] + implied_year - 1
+            updated_implied = implied.copy()
+            updated_implied['year'] = implied_year
+        else:
+            rows, new_year, new_ind = [], [], []
+            max_years = df['max_year'].tolist() if 'max_year' in df else [None] * len(df)
+            era_starts = df['era_start_year'].tolist() if 'era_start_year' in df else [0] * len(df)
+            for pos, (max_year, era_start) in enumerate(zip(max_years, era_starts)):
+                if pd.notna(max_year):
+                    for y in range(1, int(max_year) + 1):
+                        rows.append(pos)
+                        new_year.append(y)
+                        new_ind.append(era_start + y - 1)
+            if rows:
+                df = _expand_rows(df, rows, {'year': new_year, 'ind_year': new_ind})
+            updated_implied = implied.copy()
+            updated_implied['year'] = None
+
+    df = preference_filter(df, updated_implied)
+
+    if not has_month and not has_day and not has_gz and not has_lp:
+        if len(df) > 1 and 'ind_year' in df:
+            if not year_from_era_selection:
+                keep = _compare(df['ind_year'], tpq, operator.ge) & _compare(df['ind_year'], taq, operator.le)
+                temp = df.take(keep)
+                if not temp.empty:
+                    df = temp
+
+        _update_implied_ids(df, updated_implied)
+
+        if df.empty:
+            df = g.copy()
+            df.append_text('error_str', phrase_dic.get('year-solving-failed', 'Year resolution failed; '))
+
+        return df, updated_implied
+
+    if df.empty:
+        df = g.copy()
+        df.append_text('error_str', phrase_dic.get('year-solving-failed', 'Year resolution failed; '))
+
+    return df, updated_implied
+
+
+def _present(value) -> bool:
+    return value is not None and str(value) != '' and str(value) != 'nan'
+
+
+def _lunar_rows(lunar_table: pd.DataFrame, ind_years: np.ndarray, cal_streams) -> Candidates:
+    """Lunar-table rows for the given index years and calendar streams, in table order."""
+    rows = np.flatnonzero(_isin(lunar_table['ind_year'].to_numpy(), ind_years)
+                          & _isin(lunar_table['cal_stream'].to_numpy(), cal_streams))
+    cols = {}
+    dtypes = {}
+    for name, s in lunar_table.items():
+        cols[name] = s.to_numpy()[rows]
+        if not isinstance(s.dtype, np.dtype) or s.dtype == object:
+            dtypes[name] = s.dtype
+    return Candidates(cols, lunar_table.index.to_numpy()[rows], dtypes)
+
+
+def solve_with_lunar_constraints(g: Candidates, implied: dict, lunar_table: pd.DataFrame, phrase_dic=phrase_dic_en,
+                                 month=None, day=None, gz=None, lp=None, nmd_gz=None, intercalary=None,
+                                 tpq=DEFAULT_TPQ, taq=DEFAULT_TAQ, pg=False, gs=None, budget=None):
+    """
+    Array counterpart of ``solving.solve_date_with_lunar_constraints``.
+    :return: tuple (Candidates, updated_implied)
+    """
+    if g.empty or 'ind_year' not in g:
+        return Candidates.empty_frame(), implied.copy()
+
+    updated_implied = implied.copy()
+
+    has_month = _present(month)
+    has_day = _present(day)
+    has_gz = _present(gz)
+    has_lp = _present(lp)
+    has_nmd_gz = _present(nmd_gz)
+    stop_at_month = has_month and not has_day and not has_gz and not has_lp and not has_nmd_gz
+
+    if has_month and month is not None:
+        if isinstance(month, (list, tuple)):
+            months = [int(m) for m in month if m is not None and str(m) != '']
+        else:
+            months = [int(month)] if str(month) != '' else []
+    else:
+        months = []
+
+    lp_value = lp if has_lp else None
+
+    ind_years = g.unique('ind_year')
+    if 'cal_stream' in g:
+        cal_streams = g.unique('cal_stream')
+    else:
+        cal_streams = lunar_table['cal_stream'].dropna().unique()
+
+    lunar_filtered = _lunar_rows(lunar_table, ind_years, cal_streams)
+
+    if lunar_filtered.empty:
+        return g, updated_implied
+
+    if intercalary == 1:
+        lunar_filtered = lunar_filtered.take(_compare(lunar_filtered['intercalary'], 1, operator.eq))
+        updated_implied['intercalary'] = 1
+
+    lunar_filtered = lunar_filtered.rename({
+        'month': 'lunar_month',
+        'intercalary': 'lunar_intercalary',
+        'nmd_gz': 'lunar_nmd_gz'
+    })
+
+    on = ['cal_stream', 'ind_year']
+    cols = [col for col in g.cols if col not in lunar_filtered.cols] + on
+    g = g.select(cols)
+    plan = g.merge_plan(lunar_filtered, on)
+    if budget is not None:
+        date_index = g.first('date_index')
+        if not budget.allow_rows(date_index, len(plan[0]), _row_bytes(g) + _row_bytes(lunar_filtered), 'lunar constraints'):
+            return Candidates.empty_frame(), implied.copy()
+    g = g.merge_left(lunar_filtered, on, plan)
+    df = g.copy()
+
+    def mismatch(key, default, ensure=True):
+        out = _month_fallback(g)
+        if ensure and 'error_str' not in out:
+            out['error_str'] = ""
+        out.append_text('error_str', phrase_dic.get(key, default) if default is not None else phrase_dic.get(key))
+        return out
+
+    if len(months) > 0 and intercalary != 1:
+        df_month = df.take(_isin(df['lunar_month'], months))
+        if not df_month.empty:
+            df = df_month
+            df.alias('month', 'lunar_month')
+            df.alias('intercalary', 'lunar_intercalary')
+            if len(months) == 1:
+                updated_implied['month'] = months[0]
+        else:
+            if lp_value == -1 and len(months) > 0:
+                next_months = [m + 1 for m in months]
+                df_month = df.take(_isin(df['lunar_month'], next_months))
+                if not df_month.empty:
+                    df = df_month
+                    updated_implied['month'] = next_months[0]
+                else:
+                    df = mismatch('year-month-mismatch', 'year-month mismatch; ')
+    elif len(months) > 0 and intercalary == 1:
+        keep = (_compare(df['month'], df['lunar_month'], operator.eq)
+                & _compare(df['intercalary'], df['lunar_intercalary'], operator.eq))
+        df = df.take(keep)
+        if df.empty:
+            df = g.copy()
+            same_month = _compare(df['month'], df['lunar_month'], operator.eq)
+            if same_month.any():
+                df = df.take(same_month)
+            if 'error_str' not in df:
+                df['error_str'] = ""
+            df.append_text('error_str', phrase_dic.get('year-int-month-mismatch', 'Year-int. month mismatch; '))
+    else:
+        if df.notna('lunar_intercalary').any():
+            df.alias('month', 'lunar_month')
+        else:
+            if 'error_str' not in df:
+                df['error_str'] = ""
+            df.append_text('error_str', phrase_dic.get('year-int-month-mismatch', 'Year-int. month mismatch; '))
+
+    if stop_at_month:
+        df = preference_filter(df, updated_implied)
+
+        if intercalary is None and 'lunar_intercalary' in df:
+            filtered_df = df.take(_compare(df['lunar_intercalary'], 0, operator.eq))
+            if not filtered_df.empty:
+                df = filtered_df
+
+        if 'nmd_jdn' in df and 'hui_jdn' in df:
+            df['ISO_Date_Start'] = _map(lambda jd: jdn_to_iso(jd, pg, gs), df['nmd_jdn'])
+            df['ISO_Date_End'] = _map(lambda jd: jdn_to_iso(jd, pg, gs), df['hui_jdn'])
+            df.alias('nmd_gz', 'lunar_nmd_gz')
+
+        temp = df.take(df.notna('lunar_nmd_gz'))
+        if not temp.empty:
+            df = temp
+            df['start_gz'] = _map(ganshu, df['lunar_nmd_gz'])
+            df['end_gz'] = _map(ganshu, (df['lunar_nmd_gz'] + df['max_day'] - 2) % 60 + 1)
+
+        if 'month' in df:
+            month_vals = df.unique('month')
+            if len(month_vals) == 1:
+                updated_implied['month'] = int(month_vals[0])
+
+        _update_implied_ids(df, updated_implied)
+        return df, updated_implied
+
+    if has_lp and has_gz and has_day:
+        if has_nmd_gz:
+            temp = df.take(_compare(df['lunar_nmd_gz'], nmd_gz, operator.eq))
+            if temp.empty:
+                df = mismatch('lp-gz-nmdgz-mismatch', None)
+        else:
+            gz_calc = ((df['lunar_nmd_gz'] + df['day'] - 2) % 60) + 1
+            temp = df.take(_compare(df['gz'], gz_calc, operator.eq))
+            if temp.empty:
+                df = mismatch('lp-gz-day-mismatch', 'Lunar phase-gz-day mismatch; ')
+            else:
+                df = temp
+                df['jdn'] = df['nmd_jdn'] + df['day'] - 1
+
+    if has_lp and not has_gz and not has_day and not has_nmd_gz:
+        if lp_value == -1:
+            df['jdn'] = df['nmd_jdn'] + df['max_day'] - 1
+            df.alias('day', 'max_day')
+            df['gz'] = (df['lunar_nmd_gz'] + df['max_day'] - 2) % 60 + 1
+            df['lp'] = -1
+        elif lp_value == 0:
+            df.alias('jdn', 'nmd_jdn')
+            df['day'] = 1
+            df.alias('gz', 'lunar_nmd_gz')
+            df['lp'] = 0
+
+        if 'nmd_gz' in df:
+            df = df.drop(['lunar_nmd_gz'])
+
+    elif has_lp and has_gz and not has_day and has_nmd_gz:
+        if lp_value == -1:
+            df = df.take(_compare(df['gz'], df['hui_gz'], operator.eq))
+            if 'hui_gz' in df:
+                del df['hui_gz']
+            if df.empty:
+                df = mismatch('lp-gz-mismatch', 'Lunar phase-gz mismatch; ')
+            else:
+                df.alias('jdn', 'hui_jdn')
+                df.alias('day', 'max_day')
+        elif lp_value == 0:
+            keep = _compare(df['gz'], nmd_gz, operator.eq) & _compare(df['gz'], df['lunar_nmd_gz'], operator.eq)
+            df = df.take(keep)
+            if df.empty:
+                df = mismatch('lp-gz-mismatch', 'Lunar phase-gz mismatch; ')
+            else:
+                df.alias('jdn', 'nmd_jdn')
+                df['day'] = 1
+    elif has_lp and has_gz and not has_day and not has_nmd_gz:
+        if lp_value == -1:
+            df = df.take(_compare(df['gz'], df['hui_gz'], operator.eq))
+            del df['hui_gz']
+            if df.empty:
+                df = mismatch('lp-gz-mismatch', 'Lunar phase-gz mismatch; ')
+            else:
+                df.alias('jdn', 'hui_jdn')
+                df.alias('day', 'max_day')
+        elif lp_value == 0:
+            df = df.take(_compare(df['gz'], df['lunar_nmd_gz'], operator.eq))
+            if df.empty:
+                df = mismatch('lp-gz-mismatch', 'Lunar phase-gz mismatch; ')
+            else:
+                df.alias('jdn', 'nmd_jdn')
+                df['day'] = 1
+
+        if len(months) > 0:
+            month_match = df.take(_isin(df['lunar_month'], months))
+            if month_match.empty:
+                if lp_value == -1:
+                    next_months = [m + 1 for m in months]
+                    month_match = df.take(_isin(df['lunar_month'], next_months))
+                    if not month_match.empty:
+                        df = month_match
+                        updated_implied['month'] = next_months[0]
+                    else:
+                        df = mismatch('lp-gz-month-mismatch', 'Lunar phase-gz-month mismatch; ', ensure=False)
+                else:
+                    df = mismatch('lp-gz-month-mismatch', 'Lunar phase-gz-month mismatch; ', ensure=False)
+            else:
+                df = month_match
+
+    elif has_gz and has_day and not has_lp and not has_nmd_gz:
+        df['jdn'] = df['nmd_jdn'] + day - 1
+        jdn2 = ((gz - df['lunar_nmd_gz']) % 60) + df['nmd_jdn']
+        df = df.take(_compare(df['jdn'], jdn2, operator.eq))
+
+        if not df.empty:
+            df['day'] = day
+            df['gz'] = gz
+            df = df.take(_compare(df['day'], df['max_day'], operator.le))
+            if df.empty:
+                df = mismatch('month-day-gz-mismatch', 'Month-day-gz mismatch; ', ensure=False)
+        else:
+            df = _month_fallback(g)
+            df.append_text('error_str', "Month-day-gz mismatch; ")
+
+    elif has_gz and not has_day and not has_lp and not has_nmd_gz:
+        df['day'] = ((gz - df['lunar_nmd_gz']) % 60) + 1
+        df = df.take(_compare(df['day'], df['max_day'], operator.le))
+        if df.empty:
+            df = mismatch('month-day-gz-oob', 'Month-day-gz mismatch (out of bounds); ')
+        else:
+            df = preference_filter(df, updated_implied)
+
+            if len(months) > 0:
+                month_match = df.take(_isin(df['lunar_month'], months))
+                if month_match.empty:
+                    next_months = [m + 1 for m in months]
+                    month_match = df.take(_isin(df['month'], next_months))
+                    if not month_match.empty:
+                        df = month_match
+                        updated_implied['month'] = next_months[0]
+                        if 'error_str' not in df:
+                            df['error_str'] = ""
+                        df.append_text('error_str', phrase_dic.get('month-gz-mismatch', 'Month-gz mismatch; '))
+                    else:
+                        df = mismatch('month-gz-mismatch', 'Month-gz mismatch; ')
+                else:
+                    df = month_match
+
+            df['jdn'] = df['day'] + df['nmd_jdn'] - 1
+            df['gz'] = gz
+            if 'nmd_gz' in df:
+                df = df.drop(['lunar_nmd_gz'])
+
+    elif has_day and not has_gz and not has_lp and not has_nmd_gz:
+        df['day'] = day
+        df['jdn'] = df['day'] + df['nmd_jdn'] - 1
+        if 'nmd_gz' in df:
+            df['gz'] = (df['lunar_nmd_gz'] + day - 2) % 60 + 1
+            df = df.drop(['lunar_nmd_gz'])
+
+        df = df.take(_compare(df['day'], df['max_day'], operator.le))
+        if df.empty:
+            df = mismatch('month-day-oob', 'Month-day mismatch (out of bounds); ')
+
+    df = preference_filter(df, updated_implied)
+
+    if len(df) > 1 and 'ind_year' in df:
+        keep = _compare(df['ind_year'], tpq, operator.ge) & _compare(df['ind_year'], taq, operator.le)
+        temp = df.take(keep)
+        if not temp.empty:
+            df = temp
+
+    if 'jdn' in df:
+        df['ISO_Date'] = _map(lambda jd: jdn_to_iso(jd, pg, gs), df['jdn'])
+
+    if 'month' in df:
+        month_vals = df.unique('month')
+        if len(month_vals) == 1:
+            updated_implied['month'] = int(month_vals[0])
+
+    _update_implied_ids(df, updated_implied)
+
+    if df.empty:
+        df = mismatch('lunar-constraint-failed', 'Anomaly in lunar constraint solving; ')
+
+    return df, updated_implied
+
+
+def add_jdn_and_iso(df: Candidates, pg=False, gs=None) -> Candidates:
+    """
+    Array counterpart of ``solving.add_jdn_and_iso_to_proliferate_candidates``.
+    """
+    if df.empty:
+        return df
+
+    df = df.copy()
+
+    if df.all_na('day'):
+        if 'lp' in df and _compare(df['lp'], -1, operator.eq).any():
+            df.alias('day', 'max_day')
+        elif 'lp' in df and _compare(df['lp'], 0, operator.eq).any():
+            df['day'] = 1
+        elif 'gz' in df and 'nmd_gz' in df:
+            df['day'] = ((df['gz'] - df['nmd_gz']) % 60) + 1
+
+    if df.all_na('jdn'):
+        df['jdn'] = df['nmd_jdn'] + df['day'] - 1
+
+    if 'jdn' in df and df.all_na('ISO_Date'):
+        df['ISO_Date'] = _map(lambda jd: jdn_to_iso(jd, pg, gs), df['jdn'])
+
+    if 'nmd_jdn' in df and 'hui_jdn' in df:
+        if df.all_na('ISO_Date_Start'):
+            df['ISO_Date_Start'] = _map(lambda jd: jdn_to_iso(jd, pg, gs), df['nmd_jdn'])
+        if df.all_na('ISO_Date_End'):
+            df['ISO_Date_End'] = _map(lambda jd: jdn_to_iso(jd, pg, gs), df['hui_jdn'])
+
+    return df
+
+
+def solve_candidates(g: pd.DataFrame, implied: dict, *, era_df, lunar_table, phrase_dic=phrase_dic_en,
+                     has_year, has_sex_year, has_month, has_day, has_gz, has_lp, has_nmd_gz, has_intercalary,
+                     tpq=DEFAULT_TPQ, taq=DEFAULT_TAQ, pg=False, gs=None, budget=None):
+    """
+    Solve one date's candidates with the array kernel: the same dispatch as the solve step
+    of ``extract_date_table_bulk``, with a single DataFrame built at the end.
+
+    :param g: DataFrame, the date's candidate rows (after implied-state filling)
+    :param implied: dict, implied state
+    :param phrase_dic: dict, phrase translations
+    :return: tuple (result_df, updated_implied, g_head) where g_head is the first row of the
+        candidates as solved for year (one-row DataFrame, empty if none), which is all the
+        caller reads from ``g`` afterwards
+    """
+    c = Candidates.from_frame(g)
+    g_changed = False
+    is_simple = not (has_year or has_sex_year or has_month or has_day or has_gz or has_lp or has_nmd_gz)
+
+    if is_simple:
+        result, implied = solve_simple(c, implied, phrase_dic, tpq, taq)
+        result_df = result.to_frame()
+    elif has_month or has_day or has_gz or has_lp or has_nmd_gz:
+        if has_year or has_sex_year:
+            c, implied = solve_with_year(c, implied, era_df, phrase_dic, tpq, taq,
+                                         has_month, has_day, has_gz, has_lp, budget=budget)
+            g_changed = True
+        lunar_solution = c['lunar_solution']
+        c_a = c.take(_compare(lunar_solution, 1, operator.eq))
+        result_b = c.take(_compare(lunar_solution, 0, operator.eq))
+        to_concat = []
+        if not c_a.empty:
+            def value(col, flag):
+                v = c_a.first(col)
+                return v if flag and pd.notna(v) else None
+
+            result_a, implied = solve_with_lunar_constraints(
+                c_a, implied, lunar_table, phrase_dic,
+                month=value('month', has_month), day=value('day', has_day), gz=value('gz', has_gz),
+                lp=value('lp', has_lp), nmd_gz=value('nmd_gz', has_nmd_gz),
+                intercalary=1 if has_intercalary else None,
+                tpq=tpq, taq=taq, pg=pg, gs=gs, budget=budget
+            )
+            if not result_a.empty:
+                to_concat.append(result_a.to_frame())
+        if not result_b.empty:
+            to_concat.append(add_jdn_and_iso(result_b, pg=pg, gs=gs).to_frame())
+        if len(to_concat) == 0:
+            result = c.copy()
+            if has_year or has_sex_year:
+                result.append_text('error_str', phrase_dic.get('lunar-constraint-failed', 'Lunar constraint solving failed; '))
+            result_df = result.to_frame()
+        else:
+            result_df = pd.concat(to_concat)
+            sort_cols = [col for col in ['cal_stream', 'ind_year'] if col in result_df.columns]
+            if sort_cols:
+                result_df = result_df.sort_values(by=sort_cols)
+    else:
+        result, implied = solve_with_year(c, implied, era_df, phrase_dic, tpq, taq,
+                                          False, False, False, False, budget=budget)
+        if result.empty:
+            result = c.copy()
+            result.append_text('error_str', phrase_dic.get('year-solving-failed', 'Year resolution failed; '))
+        result_df = result.to_frame()
+
+    g_head = c.head(1).to_frame() if g_changed else g.iloc[:1]
+    return result_df, implied, g_head
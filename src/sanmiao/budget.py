@@ -0,0 +1,123 @@
+"""
+Row/byte budget for intermediate candidate frames.
+
+Proliferate mode and sexagenary-year expansion merge candidate rows against the lunar
+and master tables, and a loosely constrained date can produce millions of rows. The
+pipeline asks a CandidateBudget before each such expansion: ``allow_merge`` /
+``allow_rows`` estimate the result size without building it. When a date is refused,
+``extract_date_table_bulk`` reports it with the ``too-many-cand`` phrase instead of
+running out of memory.
+
+Every check also records the largest frame seen per date_index (``peaks``) and feeds
+the ``frameRowsMax`` / ``frameMbMax`` stage counters.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .config import DEFAULT_MAX_CANDIDATE_MB, DEFAULT_MAX_CANDIDATE_ROWS
+from .stages import stage_max
+
+
+def _env_limit(name: str, default):
+    value = os.environ.get(name, '').strip()
+    if not value:
+        return default
+    if value.lower() in ('none', 'off'):
+        return None
+    return float(value)
+
+
+def _key(date_index):
+    """date_index as a float where possible, so '3', 3 and 3.0 share one entry."""
+    key = pd.to_numeric(date_index, errors='coerce')
+    return float(key) if pd.notna(key) else date_index
+
+
+def frame_row_bytes(df: pd.DataFrame) -> float:
+    """
+    Shallow bytes per row of a DataFrame (object columns count as pointers).
+    """
+    if df is None or df.empty:
+        return 0.0
+    return float(df.memory_usage(index=True, deep=False).sum()) / len(df)
+
+
+def estimate_merge_rows(left: pd.DataFrame, right: pd.DataFrame, on, how: str = 'left') -> int:
+    """
+    Row count of ``left.merge(right, on=on, how=how)`` ('left' or 'inner'), from key counts.
+    """
+    on = [on] if isinstance(on, str) else list(on)
+    if left.empty:
+        return 0
+    lc = left.groupby(on, dropna=False).size()
+    rc = right.groupby(on, dropna=False).size().reindex(lc.index).fillna(0).to_numpy()
+    lc = lc.to_numpy()
+    matched = lc * rc
+    return int(np.where(rc > 0, matched, lc).sum() if how == 'left' else matched.sum())
+
+
+class CandidateBudget:
+    """
+    Per-date limit on intermediate frame size, plus the high-water marks observed.
+    :param max_rows: int or None, largest row count allowed for one date's intermediate frame
+    :param max_mb: float or None, largest estimated size in MiB (shallow: object columns count as pointers)
+    """
+
+    def __init__(self, max_rows: int | None = DEFAULT_MAX_CANDIDATE_ROWS, max_mb: float | None = DEFAULT_MAX_CANDIDATE_MB):
+        self.max_rows = int(max_rows) if max_rows is not None else None
+        self.max_bytes = int(max_mb * 2**20) if max_mb is not None else None
+        self.peaks: dict[Any, dict[str, Any]] = {}
+        self.exceeded: dict[Any, dict[str, Any]] = {}
+
+    @classmethod
+    def from_env(cls, max_rows=None, max_mb=None) -> 'CandidateBudget':
+        """
+        Budget from explicit limits, else SANMIAO_MAX_CANDIDATE_ROWS / SANMIAO_MAX_CANDIDATE_MB,
+        else the config defaults. ``none`` / ``off`` in the environment lifts a limit.
+        """
+        if max_rows is None:
+            max_rows = _env_limit('SANMIAO_MAX_CANDIDATE_ROWS', DEFAULT_MAX_CANDIDATE_ROWS)
+        if max_mb is None:
+            max_mb = _env_limit('SANMIAO_MAX_CANDIDATE_MB', DEFAULT_MAX_CANDIDATE_MB)
+        return cls(max_rows, max_mb)
+
+    def allow_rows(self, date_index, rows: int, row_bytes: float, where: str) -> bool:
+        """
+        Record a frame of ``rows`` rows about to be built for a date.
+        :return: bool, False (and the date is marked as exceeded) when it is over budget
+        """
+        date_index = _key(date_index)
+        rows = int(rows)
+        nbytes = int(rows * row_bytes)
+        peak = self.peaks.get(date_index)
+        if peak is None or rows > peak['rows']:
+            self.peaks[date_index] = {'rows': rows, 'bytes': nbytes, 'where': where}
+        stage_max('frameRowsMax', rows)
+        stage_max('frameMbMax', nbytes // 2**20)
+        if (self.max_rows is not None and rows > self.max_rows) or (self.max_bytes is not None and nbytes > self.max_bytes):
+            self.exceeded[date_index] = {'rows': rows, 'bytes': nbytes, 'where': where}
+            return False
+        return True
+
+    def allow_merge(self, date_index, left: pd.DataFrame, right: pd.DataFrame, on, where: str, how: str = 'left') -> bool:
+        """
+        Check the estimated size of ``left.merge(right, on=on, how=how)``.
+        """
+        rows = estimate_merge_rows(left, right, on, how)
+        return self.allow_rows(date_index, rows, frame_row_bytes(left) + frame_row_bytes(right), where)
+
+    def is_exceeded(self, date_index) -> bool:
+        return _key(date_index) in self.exceeded
+
+    def message(self, date_index, phrase_dic: dict) -> str:
+        """
+        ``error_str`` text for a date that went over budget: '<rows> candidates. Please narrow date range.'
+        """
+        rows = self.exceeded[_key(date_index)]['rows']
+        return f"{rows} {phrase_dic.get('too-many-cand', 'candidates. Please narrow date range.')}"
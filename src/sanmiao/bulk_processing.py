@@ -1,4 +1,6 @@
 import re
+import time
+import warnings
 import numpy as np
 import pandas as pd
 import lxml.etree as et
@@ -8,11 +10,14 @@ from .config import (
     get_cal_streams_from_civ, normalize_defaults
 )
 from .converters import (
-    numcon, ganshu
+    numcon_series, ganshu
 )
 from .loaders import prepare_tables
-from .xml_utils import fix_dynasty_mismatch_xml, date_indices_in_xml_string
-from .ns import child_attr, child_text, has_child, xpath_dates
+from .xml_utils import fix_dynasty_mismatch_tree
+from .ns import first_descendants, normalize_space, string_value, xpath_dates
+from .stages import stage_count, stage_max, stage_time
+from .budget import CandidateBudget, estimate_merge_rows, frame_row_bytes
+from .array_solver import resolve_solver_kernel, solve_candidates
 from .solving import (
     solve_date_simple, solve_date_with_year, solve_date_with_lunar_constraints,
     add_jdn_and_iso_to_proliferate_candidates
@@ -310,10 +315,40 @@ def extract_date_table(xml_string, pg=False, gs=None, lang='en', tpq=DEFAULT_TPQ
     )
 
 
+# (column, child local name) for the text fields of a <date>, in column order
+_DATE_CHILD_COLUMNS = (
+    ('dyn_str', 'dyn'), ('ruler_str', 'ruler'), ('era_str', 'era'),
+    ('rel_dir', 'rel'), ('rel_unit', 'rel'), ('rel_text', 'rel'), ('suffix_str', 'suffix'),
+    ('year_str', 'year'), ('sexYear_str', 'sexYear'), ('month_str', 'month'), ('day_str', 'day'),
+    ('gz_str', 'gz'), ('lp_str', 'lp'), ('nmd_gz_str', 'nmdgz'),
+)
+_DATE_CHILD_NAMES = frozenset(name for _, name in _DATE_CHILD_COLUMNS) | {'int'}
+
+# <date> attributes read when attributes=True (all numeric, including lp=-1)
+_DATE_ATTRIBUTES = (
+    'cal_stream', 'dyn_id', 'ruler_id', 'era_id', 'ind_year',
+    'year', 'sex_year', 'month', 'intercalary', 'day', 'gz', 'nmd_gz', 'lp'
+)
+
+# present_elements letter for each tagged string element, in output order
+_PRESENT_ELEMENT_CODES = (
+    ('dyn_str', 'h'), ('ruler_str', 'r'), ('era_str', 'e'), ('year_str', 'y'),
+    ('sexYear_str', 's'), ('month_str', 'm'), ('has_int', 'i'), ('lp_str', 'l'),
+    ('nmd_gz_str', 'z'), ('day_str', 'd'), ('gz_str', 'g'),
+)
+
+
+def _nonblank(value):
+    return value if value.strip() else None
+
+
 def dates_xml_to_df(xml_root, attributes: bool = False) -> pd.DataFrame:
     """
     Convert XML string with date elements to pandas DataFrame.
 
+    Each <date> is read in one walk over its descendants; the first element of each
+    name supplies the field (as XPath ``.//*[local-name()=name][1]`` would).
+
     :param xml_root: ElementTree element, XML root containing date elements
     :param attributes: bool, if True, extract both attributes and child elements from <date> elements.
                        Attributes take precedence during normalization when both are present.
@@ -322,85 +357,63 @@ def dates_xml_to_df(xml_root, attributes: bool = False) -> pd.DataFrame:
                        sex_year, month, intercalary, day, gz, nmd_gz, lp
     :return: pd.DataFrame, DataFrame with extracted date information
     """
-    rows = []
-    for node in xpath_dates(xml_root, indexed_only=True):
-        row = {
-            "date_index": int(node.attrib.get("index")),
-            "date_string": (node.xpath("normalize-space(string())") or "").strip() or "",
-        }
-
-        row.update({
-            "dyn_str": child_text(node, "dyn"),
-            "ruler_str": child_text(node, "ruler"),
-            "era_str": child_text(node, "era"),
-            "rel_dir": child_attr(node, "rel", "dir"),
-            "rel_unit": child_attr(node, "rel", "unit"),
-            "rel_text": child_text(node, "rel"),
-            "suffix_str": child_text(node, "suffix"),
-            "year_str": child_text(node, "year"),
-            "sexYear_str": child_text(node, "sexYear"),
-            "month_str": child_text(node, "month"),
-            "day_str": child_text(node, "day"),
-            "gz_str": child_text(node, "gz"),
-            "lp_str": child_text(node, "lp"),
-            "nmd_gz_str": child_text(node, "nmdgz"),
-            "has_int": 1 if has_child(node, "int") else 0,
-        })
-        
+    nodes = xpath_dates(xml_root, indexed_only=True)
+    n = len(nodes)
+    if n == 0:
+        return pd.DataFrame()
+
+    columns = {'date_index': [0] * n, 'date_string': [''] * n}
+    columns.update((col, [None] * n) for col, _ in _DATE_CHILD_COLUMNS)
+    columns['has_int'] = [0] * n
+    present = [''] * n
+    # Attribute columns in first-seen order, missing values NaN (as pd.DataFrame(list_of_dicts))
+    attr_columns = {}
+
+    for i, node in enumerate(nodes):
+        columns['date_index'][i] = int(node.attrib.get('index'))
+        columns['date_string'][i] = normalize_space(string_value(node)).strip()
+
+        found = first_descendants(node, _DATE_CHILD_NAMES)
+        row = {}
+        for col, name in _DATE_CHILD_COLUMNS:
+            el = found.get(name)
+            if el is None:
+                continue
+            if col == 'rel_dir' or col == 'rel_unit':
+                row[col] = _nonblank(normalize_space(el.get(col[4:], '')))
+            else:
+                row[col] = _nonblank(normalize_space(string_value(el)))
+        row['has_int'] = 1 if 'int' in found else 0
+
         # If we have gz and lp = 0, also set nmd_gz to equal gz
-        if row.get("gz_str") and row.get("lp_str") == "朔" and not row.get("nmd_gz_str"):
-            row["nmd_gz_str"] = row["gz_str"]
+        if row.get('gz_str') and row.get('lp_str') == '朔' and not row.get('nmd_gz_str'):
+            row['nmd_gz_str'] = row['gz_str']
 
         # If attributes=True, also extract attributes from <date> element
         # Attributes will take precedence over child elements during normalization
         if attributes:
-            attr_names = [
-                'cal_stream', 'dyn_id', 'ruler_id', 'era_id', 'ind_year',
-                'year', 'sex_year', 'month', 'intercalary', 'day', 'gz', 'nmd_gz', 'lp'
-            ]
-            for attr_name in attr_names:
+            for attr_name in _DATE_ATTRIBUTES:
                 attr_value = node.attrib.get(attr_name)
                 if attr_value is not None:
-                    # Convert to appropriate type - all these attributes are numeric (including negative values like lp=-1)
                     try:
-                        # Try to convert to int (handles strings like "1", "23", "-1", etc.)
-                        row[attr_name] = int(attr_value)
+                        attr_value = int(attr_value)
                     except (ValueError, TypeError):
-                        # If conversion fails, keep as string
-                        row[attr_name] = attr_value
+                        pass
+                    attr_columns.setdefault(attr_name, [np.nan] * n)[i] = attr_value
+        attr_columns.setdefault('present_elements', present)
 
-        # Build present_elements string from *tagged string elements only*.
+        # present_elements from *tagged string elements only*
         # (Do NOT count numeric attributes like dyn_id/era_id/etc as "present".)
-        present_elements = ""
-        if row['dyn_str'] and row['dyn_str'].strip():
-            present_elements += "h"
-        if row['ruler_str'] and row['ruler_str'].strip():
-            present_elements += "r"
-        if row['era_str'] and row['era_str'].strip():
-            present_elements += "e"
-        if row['year_str'] and row['year_str'].strip():
-            present_elements += "y"
-        if row['sexYear_str'] and row['sexYear_str'].strip():
-            present_elements += "s"
-        if row['month_str'] and row['month_str'].strip():
-            present_elements += "m"
-        if row['has_int'] == 1:
-            present_elements += "i"
-        if row['lp_str'] and row['lp_str'].strip():
-            present_elements += "l"
-        if row['nmd_gz_str'] and row['nmd_gz_str'].strip():
-            present_elements += "z"
-        if row['day_str'] and row['day_str'].strip():
-            present_elements += "d"
-        if row['gz_str'] and row['gz_str'].strip():
-            present_elements += "g"
-        row['present_elements'] = present_elements
-
-        if row['sexYear_str'] is not None:
+        present[i] = ''.join(code for col, code in _PRESENT_ELEMENT_CODES if row.get(col))
+
+        if row.get('sexYear_str') is not None:
             row['sexYear_str'] = re.sub(r'[歲年]', '', row['sexYear_str'])
-        
-        rows.append(row)
-    return pd.DataFrame(rows)
+
+        for col, value in row.items():
+            columns[col][i] = value
+
+    columns.update(attr_columns)
+    return pd.DataFrame(columns)
 
 
 def normalise_date_fields(df: pd.DataFrame) -> pd.DataFrame:
@@ -432,7 +445,7 @@ def normalise_date_fields(df: pd.DataFrame) -> pd.DataFrame:
         # Convert numeric strings
         m = mask_no_attr & out["year_str"].notna() & (out["year_str"] != "元年")
         if m.any():
-            out.loc[m, "year"] = out.loc[m, "year_str"].str.rstrip('年').map(numcon).astype('float64')
+            out.loc[m, "year"] = numcon_series(out.loc[m, "year_str"].str.rstrip('年'))
 
     # sexYear - only process string if attribute doesn't exist or is NaN for that row
     if 'sex_year' not in out.columns:
@@ -450,15 +463,13 @@ def normalise_date_fields(df: pd.DataFrame) -> pd.DataFrame:
         out.loc[mask_no_attr, "sex_year"] = sex_year_values
     
     # month - only process string if attribute doesn't exist or is NaN for that row
-    def month_to_int(s):
-        if not isinstance(s, str) or not s:
-            return None
-        if s == "正月": return 1
-        if s == "臘月": return 13
-        if s == "腊月": return 13
-        if s == "一月": return 14
+    special_months = {"正月": 1.0, "臘月": 13.0, "腊月": 13.0, "一月": 14.0}
+
+    def months_to_float(strs):
+        special = strs.map(special_months)
+        plain = strs.where(strs.map(lambda s: isinstance(s, str) and bool(s))).astype(object)
         # Strip 月 character before converting numerals
-        return numcon(s.rstrip('月'))
+        return special.fillna(numcon_series(plain.str.rstrip('月'))).astype('float64')
     
     if 'month' not in out.columns:
         out['month'] = pd.Series(index=out.index, dtype='float64')
@@ -468,9 +479,7 @@ def normalise_date_fields(df: pd.DataFrame) -> pd.DataFrame:
     mask_no_attr = out['month'].isna()
     
     if 'month_str' in out.columns and mask_no_attr.any():
-        month_values = out.loc[mask_no_attr, "month_str"].map(month_to_int)
-        month_values = month_values.where(month_values.notna(), np.nan).astype('float64')
-        out.loc[mask_no_attr, "month"] = month_values
+        out.loc[mask_no_attr, "month"] = months_to_float(out.loc[mask_no_attr, "month_str"])
 
     # day - only process string if attribute doesn't exist or is NaN for that row
     if 'day' not in out.columns:
@@ -481,11 +490,9 @@ def normalise_date_fields(df: pd.DataFrame) -> pd.DataFrame:
     mask_no_attr = out['day'].isna()
     
     if 'day_str' in out.columns and mask_no_attr.any():
-        day_values = out.loc[mask_no_attr, "day_str"].map(
-            lambda s: numcon(s.rstrip('日')) if isinstance(s, str) and s else None
-        )
-        day_values = day_values.where(day_values.notna(), np.nan).astype('float64')
-        out.loc[mask_no_attr, "day"] = day_values
+        day_strs = out.loc[mask_no_attr, "day_str"]
+        day_strs = day_strs.where(day_strs.map(lambda s: isinstance(s, str) and bool(s))).astype(object)
+        out.loc[mask_no_attr, "day"] = numcon_series(day_strs.str.rstrip('日'))
 
     # gz (sexagenary day number) - only process string if attribute doesn't exist or is NaN for that row
     if 'gz' not in out.columns:
@@ -1156,7 +1163,14 @@ def bulk_resolve_era_ids(df, era_df, fuzzy=False):
     return out
 
 
-def bulk_generate_date_candidates(df_with_ids, dyn_df, ruler_df, era_df, master_table, lunar_table, phrase_dic=phrase_dic_en, tpq=DEFAULT_TPQ, taq=DEFAULT_TAQ, civ=None, proliferate=False):
+# Columns that proliferate mode takes from the lunar table and the master (era) table
+_PROLIFERATE_MERGED_COLUMNS = (
+    'cal_stream', 'ind_year', 'year_gz', 'nmd_jdn', 'hui_jdn', 'max_day', 'hui_gz',
+    'dyn_id', 'ruler_id', 'era_id', 'era_start_year', 'era_end_year', 'era_start_jdn', 'era_end_jdn',
+)
+
+
+def bulk_generate_date_candidates(df_with_ids, dyn_df, ruler_df, era_df, master_table, lunar_table, phrase_dic=phrase_dic_en, tpq=DEFAULT_TPQ, taq=DEFAULT_TAQ, civ=None, proliferate=False, budget=None, isolate_dates=False):
     """
     Generate all possible dynasty/ruler/era combinations for each date.
     
@@ -1181,6 +1195,10 @@ def bulk_generate_date_candidates(df_with_ids, dyn_df, ruler_df, era_df, master_
     :param tpq: int, terminus post quem
     :param taq: int, terminus ante quem
     :param civ: str or list, civilization filter
+    :param budget: Optional CandidateBudget. Proliferate expansions that would exceed it are skipped,
+                   and the date's rows are passed through unexpanded (see budget.exceeded)
+    :param isolate_dates: bool, drop rows without dyn_id per date rather than across the frame, so a
+                   date's candidates do not depend on the other dates generated with it
     :return: Expanded DataFrame with all candidate combinations, with columns:
              date_index, dyn_id, ruler_id, era_id, cal_stream, era_start_year, era_end_year, max_year, etc.
     """
@@ -1192,19 +1210,14 @@ def bulk_generate_date_candidates(df_with_ids, dyn_df, ruler_df, era_df, master_
     # We'll build candidate rows per date_index
     all_candidates = []
 
+    rows_by_date = partition_by_date_index(out)
     for date_idx in out['date_index'].dropna().unique():
         # Get ALL rows for this date_index (not just first one)
         # This is important because bulk_resolve_era_ids can expand one date_index
         # into multiple rows with different era_id values
-        # Convert date_idx to match the dtype in out['date_index'] for comparison
-        if 'date_index' in out.columns:
-            date_idx_for_filter = pd.to_numeric(date_idx, errors='coerce')
-            if pd.isna(date_idx_for_filter):
-                date_idx_for_filter = date_idx
-            out_date_index_numeric = pd.to_numeric(out['date_index'], errors='coerce')
-            date_rows = out[out_date_index_numeric == date_idx_for_filter].copy()
-        else:
-            date_rows = pd.DataFrame()
+        date_idx_for_filter = pd.to_numeric(date_idx, errors='coerce')
+        date_rows = rows_by_date.get(date_idx_for_filter)
+        date_rows = date_rows.copy() if date_rows is not None else out.iloc[0:0].copy()
         
         
         # Extract all unique combinations of resolved IDs from these rows
@@ -1272,7 +1285,11 @@ def bulk_generate_date_candidates(df_with_ids, dyn_df, ruler_df, era_df, master_
                     all_candidates.append(candidate_row)
                     continue
 
-                t_out = date_rows.copy()
+                # Era and lunation columns left empty by ID resolution (present because other
+                # dates matched) would collide with the lunar and master table merges below
+                t_out = date_rows.drop(columns=[
+                    c for c in _PROLIFERATE_MERGED_COLUMNS if c in date_rows.columns and date_rows[c].isna().all()
+                ])
                 # Copy lunar table
                 t_lt = lunar_table.copy()
                 
@@ -1296,6 +1313,14 @@ def bulk_generate_date_candidates(df_with_ids, dyn_df, ruler_df, era_df, master_
                 b = b[~b.index.isin(c.index)].copy().dropna(subset=['month'], how='any')
                 del c['month'], b['intercalary']
 
+                if budget is not None and not budget.allow_rows(
+                    date_idx,
+                    sum(estimate_merge_rows(x, t_lt, on) for x, on in [(a, ['month', 'intercalary']), (b, ['month']), (c, ['intercalary'])]),
+                    frame_row_bytes(date_rows) + frame_row_bytes(t_lt),
+                    'lunar merge',
+                ):
+                    all_candidates.extend(date_rows.to_dict('records'))
+                    continue
                 d = a.merge(t_lt, on=['month', 'intercalary'], how='left')
                 e = b.merge(t_lt, on=['month'], how='left')
                 f = c.merge(t_lt, on=['intercalary'], how='left')
@@ -1349,6 +1374,9 @@ def bulk_generate_date_candidates(df_with_ids, dyn_df, ruler_df, era_df, master_
                 # Filter master table
                 temp = master_table.copy()
                 temp = temp[(temp['era_end_year'] >= tpq) & (temp['era_start_year'] <= taq)]
+                if budget is not None and not budget.allow_merge(date_idx, t_out, temp, ['cal_stream'], 'master merge'):
+                    all_candidates.extend(date_rows.to_dict('records'))
+                    continue
                 # Merge with master table
                 t_out = t_out.merge(temp, on=['cal_stream'], how='left')
                 
@@ -1429,7 +1457,7 @@ def bulk_generate_date_candidates(df_with_ids, dyn_df, ruler_df, era_df, master_
                 combo['ruler_id'] is None and
                 combo['era_id'] is None):
                 era_str = combo['source_row'].get('era_str')
-                if era_str is not None and str(era_str).strip():
+                if isinstance(era_str, str) and era_str.strip():
                     continue
                 # Find dynasty info - pandas handles int/float comparison automatically
                 # But ensure we're comparing like types by converting both sides
@@ -1475,7 +1503,7 @@ def bulk_generate_date_candidates(df_with_ids, dyn_df, ruler_df, era_df, master_
                 combo['era_id'] is None):
                 # Era was tagged but did not resolve for this dyn/ruler pair — drop it
                 era_str = combo['source_row'].get('era_str')
-                if era_str is not None and str(era_str).strip():
+                if isinstance(era_str, str) and era_str.strip():
                     continue
                 # Find ruler info - convert to same type for comparison
                 ruler_id_val = int(combo['ruler_id']) if pd.notna(combo['ruler_id']) else None
@@ -1644,7 +1672,11 @@ def bulk_generate_date_candidates(df_with_ids, dyn_df, ruler_df, era_df, master_
     
     # Fallback: preserve candidates if dropping dyn_id results in empty DataFrame
     bu = candidates_df.copy()
-    if 'dyn_id' in candidates_df.columns:
+    if 'dyn_id' in candidates_df.columns and isolate_dates:
+        has_dyn = candidates_df['dyn_id'].notna()
+        date_has_dyn = has_dyn.groupby(pd.to_numeric(candidates_df['date_index'], errors='coerce'), dropna=False).transform('any')
+        candidates_df = candidates_df[has_dyn | ~date_has_dyn]
+    elif 'dyn_id' in candidates_df.columns:
         candidates_df = candidates_df.dropna(subset=['dyn_id'])
         if candidates_df.empty:
             candidates_df = bu.copy()
@@ -1730,9 +1762,11 @@ def restore_original_date_strings(df, original_text, normalized_text):
 
     out = df.copy()
     cursor = 0
-    for date_idx in sorted(out['date_index'].dropna().unique(), key=lambda x: float(x)):
-        mask = out['date_index'] == date_idx
-        norm_ds = out.loc[mask, 'date_string'].dropna()
+    positions = out.groupby('date_index', sort=False, dropna=True).indices
+    date_string_col = out.columns.get_loc('date_string')
+    for date_idx in sorted(positions, key=lambda x: float(x)):
+        rows = positions[date_idx]
+        norm_ds = out['date_string'].iloc[rows].dropna()
         if norm_ds.empty:
             continue
         norm_ds = str(norm_ds.iloc[0]).replace(' ', '').strip()
@@ -1742,16 +1776,157 @@ def restore_original_date_strings(df, original_text, normalized_text):
         if pos == -1:
             continue
         end = pos + len(norm_ds)
-        out.loc[mask, 'date_string'] = original_text[pos:end]
+        out.iloc[rows, date_string_col] = original_text[pos:end]
         cursor = end
 
     return out
 
 
+def partition_by_date_index(df, numeric=True):
+    """
+    Split a frame into per-date_index slices in one pass, so loops over dates do
+    O(1) lookups instead of re-scanning the whole frame for each date.
+
+    :param df: DataFrame with a date_index column
+    :param numeric: bool, key on pd.to_numeric(date_index) (rows that do not convert are dropped);
+        if False, key on the raw values
+    :return: dict mapping date_index to its rows (original order and index labels kept)
+    """
+    if df is None or df.empty or 'date_index' not in df.columns:
+        return {}
+    keys = pd.to_numeric(df['date_index'], errors='coerce') if numeric else df['date_index']
+    return {key: part for key, part in df.groupby(keys, sort=False, dropna=True)}
+
+
+# Output columns that are always numeric (solver branches may hand them over as object)
+OUTPUT_NUMERIC_COLUMNS = (
+    'era_id', 'ruler_id', 'dyn_id', 'year', 'sex_year', 'month',
+    'intercalary', 'day', 'jdn', 'ind_year', 'cal_stream',
+    'gz', 'lp', 'nmd_gz', 'nmd_jdn', 'hui_jdn', 'max_day',
+)
+
+
+def _move_to_end(df, col):
+    return df[[c for c in df.columns if c != col] + [col]]
+
+
+def assemble_date_results(results, era_df=None):
+    """
+    Combine the per-date result frames of the solve loop into the output table.
+
+    The schema is the union of the frames' columns in first-seen order, built by one
+    concat. A non-numeric column that some frames lack holds pd.NA (object) for their
+    rows, and OUTPUT_NUMERIC_COLUMNS are coerced to numbers. Then, per date_index, rows
+    with neither era_id nor ruler_id are dropped where a solved row exists, and rows are
+    deduplicated by (ruler_id, dyn_id), preferring a non-null era_id and the earliest era.
+    As with the groupby().apply() passes this replaces, a step regroups rows by
+    date_index only when it drops rows; date_index ends up as the last column.
+
+    :param results: list of DataFrames, one per solved date (empty frames are skipped)
+    :param era_df: Optional DataFrame, era table supplying era_start_jdn for the ordering
+    :return: pd.DataFrame (empty when there are no rows)
+    """
+    frames = [df for df in results if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', category=FutureWarning,
+                                message='.*concatenation with empty or all-NA entries.*')
+        output_df = pd.concat(frames, ignore_index=True, sort=False)
+
+    # concat already gives the result for most columns. Where per-frame handling
+    # differs, patch or rebuild the column: a frame lacking a non-numeric column
+    # contributes pd.NA (the column becomes object), and numeric columns are coerced
+    # frame by frame (an object [1.0] next to int64 frames gives float64, not int64).
+    lengths = np.array([len(df) for df in frames])
+    frame_dtypes = [dict(zip(df.columns, df.dtypes)) for df in frames]
+    for col in output_df.columns:
+        dtypes = [d.get(col) for d in frame_dtypes]
+        present = [dt for dt in dtypes if dt is not None]
+        if col in OUTPUT_NUMERIC_COLUMNS:
+            if all(pd.api.types.is_numeric_dtype(dt) and not pd.api.types.is_bool_dtype(dt) for dt in present):
+                output_df[col] = pd.to_numeric(output_df[col], errors='coerce')
+                continue
+        elif len(present) == len(dtypes):
+            continue
+        elif all(dt == object or dt == 'str' or dt == np.float64 for dt in present):
+            # Same values as concat gives; only the gaps change from NaN to pd.NA
+            values = output_df[col].astype(object)
+            values[np.repeat([dt is None for dt in dtypes], lengths)] = pd.NA
+            output_df[col] = values
+            continue
+        pieces = [
+            df[col] if dt is not None else pd.Series([pd.NA] * len(df), dtype=object)
+            for df, dt in zip(frames, dtypes)
+        ]
+        if col in OUTPUT_NUMERIC_COLUMNS:
+            pieces = [pd.to_numeric(piece, errors='coerce') for piece in pieces]
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', category=FutureWarning,
+                                    message='.*concatenation with empty or all-NA entries.*')
+            output_df[col] = pd.concat(pieces, ignore_index=True)
+
+    if not all(col in output_df.columns for col in ['ruler_id', 'era_id', 'dyn_id']):
+        dup_cols = [col for col in ['ruler_id', 'era_id', 'dyn_id'] if col in output_df.columns]
+        if dup_cols:
+            return output_df.drop_duplicates(subset=dup_cols, keep='first').reset_index(drop=True)
+        return output_df.drop_duplicates().reset_index(drop=True)
+
+    by_date = 'date_index' in output_df.columns
+    # When a date_index has at least one solved row (era_id or ruler_id), drop unresolved
+    # rows (no era_id and no ruler_id) from dynasty expansion that failed to match.
+    solved = output_df['era_id'].notna() | output_df['ruler_id'].notna()
+    if by_date and solved.any() and not solved.all():
+        keep = solved | ~solved.groupby(output_df['date_index']).transform('any')
+        if not keep.all():
+            output_df = output_df[keep].sort_values('date_index', kind='stable')
+        output_df = _move_to_end(output_df, 'date_index').reset_index(drop=True)
+
+    # Sort so rows with non-null era_id (then the earliest era) come first for each (ruler_id, dyn_id)
+    output_df['_era_id_is_null'] = output_df['era_id'].isna()
+    if 'era_start_jdn' not in output_df.columns and era_df is not None and 'era_start_jdn' in era_df.columns:
+        era_lookup = era_df[['era_id', 'era_start_jdn']].drop_duplicates(subset=['era_id'])
+        era_lookup['era_id'] = pd.to_numeric(era_lookup['era_id'], errors='coerce')
+        output_df = output_df.merge(era_lookup, on='era_id', how='left')
+    order = 'era_start_jdn' if 'era_start_jdn' in output_df.columns else 'era_id'
+    output_df = output_df.sort_values(by=['ruler_id', 'dyn_id', '_era_id_is_null', order])
+    output_df = output_df.drop(columns=['_era_id_is_null'])
+
+    # Keep the first row per (ruler_id, dyn_id) within each date_index; this also
+    # removes exact (ruler_id, era_id, dyn_id) duplicates
+    if by_date:
+        dup = output_df.duplicated(subset=['date_index', 'ruler_id', 'dyn_id'], keep='first')
+        if dup.any():
+            output_df = output_df[~dup].sort_values('date_index', kind='stable')
+        output_df = _move_to_end(output_df, 'date_index')
+    else:
+        output_df = output_df.drop_duplicates(subset=['ruler_id', 'dyn_id'], keep='first')
+    return output_df.reset_index(drop=True)
+
+
+def initial_implied_state():
+    """
+    Empty implied state for sequential processing.
+    """
+    return {
+        'cal_stream_ls': [],
+        'dyn_id_ls': [],
+        'ruler_id_ls': [],
+        'era_id_ls': [],
+        # Anchor for sequential relative-year handling (set only when previous date is single-solved)
+        'ind_year': None,
+        'year': None,
+        'month': None,
+        'intercalary': None,
+        'sex_year': None
+    }
+
+
 def extract_date_table_bulk(
     xml_root, implied=None, pg=False, gs=None, lang='en', tpq=DEFAULT_TPQ, taq=DEFAULT_TAQ, civ=None, tables=None, 
     sequential=True, proliferate=False, attributes=False, post_normalisation_func=None, fuzzy=False,
-    original_text=None, normalized_text=None):
+    original_text=None, normalized_text=None, isolate_dates=False, candidate_budget=None, solver_kernel=None):
     """
     Optimized bulk version of extract_date_table using pandas operations.
     
@@ -1760,7 +1935,10 @@ def extract_date_table_bulk(
     2. Bulk candidate generation (all combinations at once)
     3. Sequential constraint solving per date (preserving implied state)
     
-    :param xml_root: ElementTree element, XML root containing date elements
+    :param xml_root: ElementTree element, XML root containing date elements. Modified in place when a
+        dynasty mismatch is repaired: the <dyn> text is moved out of its <date> and dates that are left
+        lone are unwrapped, as in remove_lone_tags (xml_modified is then True). Pass a copy to keep the
+        original tree.
     :param implied: Optional dict, implied state for sequential processing. If None, will be initialized with defaults
     :param pg: bool, proleptic gregorian flag
     :param gs: list, gregorian start date [YYYY, MM, DD]
@@ -1776,11 +1954,19 @@ def extract_date_table_bulk(
     :param original_text: Optional str, user-typed text before normalization. With normalized_text,
         restores per-date date_string spans to the original script for report headers.
     :param normalized_text: Optional str, full line after normalization (the text that was tagged)
+    :param isolate_dates: bool, solve each date as if it had been passed on its own: an ambiguous date
+        does not clear the implied state for the next one, and without sequential each date starts
+        from an empty implied state. Lets many separate dates share one bulk pass.
+    :param candidate_budget: Optional CandidateBudget limiting intermediate candidate frames per date
+        (defaults to CandidateBudget.from_env()). Dates over budget report the too-many-cand phrase;
+        the budget's ``peaks`` holds the largest frame seen per date_index.
+    :param solver_kernel: Optional str, 'frame' (pandas, the default) or 'array' (NumPy column arrays,
+        see array_solver.py); None reads SANMIAO_SOLVER_KERNEL. Both give the same output.
     :return: tuple (xml_string, output_df, implied, xml_modified) - xml_modified is True when dynasty-mismatch fix was applied
     """
     # Defaults
     gs, civ = normalize_defaults(gs, civ)
-    modified_xml_string = None  # set when dynasty-mismatch fix is applied
+    xml_modified = False  # set when dynasty-mismatch fix is applied
 
     # Set phrase dictionary based on language (default to 'en' if None or invalid)
     if lang is None:
@@ -1788,32 +1974,25 @@ def extract_date_table_bulk(
     phrase_dic = get_phrase_dic(lang)
     
     if implied is None:
-        implied = {
-            'cal_stream_ls': [],
-            'dyn_id_ls': [],
-            'ruler_id_ls': [],
-            'era_id_ls': [],
-            # Anchor for sequential relative-year handling (set only when previous date is single-solved)
-            'ind_year': None,
-            'year': None,
-            'month': None,
-            'intercalary': None,
-            'sex_year': None
-        }
+        implied = initial_implied_state()
+    solver_kernel = resolve_solver_kernel(solver_kernel)
 
     # Handle both string and Element inputs
     if isinstance(xml_root, str):
         xml_root = et.fromstring(xml_root)
     
     # Step 1: Extract table
+    t_stage = time.perf_counter()
     df = dates_xml_to_df(xml_root, attributes=attributes)
     df['lunar_solution'] = 1
+    stage_count('dateNodes', len(df))
     
     if df.empty:
         output_df = df
     else:
         # Step 2: Normalize date fields (convert strings to numbers)
         df = normalise_date_fields(df)
+        t_stage = stage_time('extract', t_stage)
 
         # Suffix rule: if an ERA is tagged and has suffix 初/之初, interpret as year=1
         # (only when year is otherwise unspecified).
@@ -1848,11 +2027,8 @@ def extract_date_table_bulk(
             mismatch_indices, df_after_resolution, era_df, dyn_tag_df, dyn_df, fuzzy=fuzzy
         )
         if mismatch_indices:
-            modified_xml_string = fix_dynasty_mismatch_xml(
-                et.tostring(xml_root, encoding='unicode', method='xml'),
-                mismatch_indices
-            )
-            remaining_indices = date_indices_in_xml_string(modified_xml_string)
+            remaining_indices = fix_dynasty_mismatch_tree(xml_root, mismatch_indices)
+            xml_modified = True
             drop_indices = {i for i in mismatch_indices if i not in remaining_indices}
             kept_mismatch = mismatch_indices & remaining_indices
             if drop_indices:
@@ -1867,6 +2043,9 @@ def extract_date_table_bulk(
                 df = bulk_resolve_era_ids(df, era_df, fuzzy=fuzzy)
                 df_after_resolution = df.copy()
         
+        stage_count('rowsResolved', len(df))
+        t_stage = stage_time('resolve', t_stage)
+
         # Step 3: Post-normalisation function
         # Save date_indices BEFORE post_normalisation_func (in case it filters rows)
         # Ensure date_indices are numeric for consistent comparison later
@@ -1880,10 +2059,22 @@ def extract_date_table_bulk(
             df = post_normalisation_func(df)
 
         # Step 6: Bulk generate candidates (Phase 2)
-        df_candidates = bulk_generate_date_candidates(df, dyn_df, ruler_df, era_df, master_table, lunar_table, phrase_dic=phrase_dic_en, tpq=tpq, taq=taq, civ=civ, proliferate=proliferate)
+        budget = candidate_budget if candidate_budget is not None else CandidateBudget.from_env()
+        df_candidates = bulk_generate_date_candidates(df, dyn_df, ruler_df, era_df, master_table, lunar_table, phrase_dic=phrase_dic_en, tpq=tpq, taq=taq, civ=civ, proliferate=proliferate, budget=budget, isolate_dates=isolate_dates)
         df_candidates['error_str'] = ""
+        stage_count('candidateRows', len(df_candidates))
+        stage_max('candidateRowsMax', len(df_candidates))
+        t_stage = stage_time('candidates', t_stage)
         
         #############################################################################
+        # Per-date slices, built once (candidates keep their raw date_index keys)
+        before_by_date = partition_by_date_index(df_before_resolution)
+        after_by_date = partition_by_date_index(df_after_resolution)
+        candidates_by_date = partition_by_date_index(df_candidates, numeric=False)
+        # Era/lunar columns that ID resolution and candidate generation add only for dates that matched one
+        generated_columns = [c for c in df_candidates.columns
+                             if c not in df_before_resolution.columns and c not in ('dyn_id', 'ruler_id', 'era_id')]
+
         all_results = []
         # Track previous date's results to check if it had multiple solved options
         prev_date_idx = None
@@ -1894,7 +2085,9 @@ def extract_date_table_bulk(
             # Reset implied state for each date if not sequential
             # Check if previous date had multiple solved results - if so, reset implied state
             # because we can't reliably carry forward ambiguous information
-            if sequential and prev_date_idx is not None and prev_date_results is not None:
+            if isolate_dates and not sequential:
+                implied = initial_implied_state()
+            if sequential and not isolate_dates and prev_date_idx is not None and prev_date_results is not None:
                 if len(prev_date_results) > 1:
                     # Previous date had multiple options after solving - reset implied state
                     # Clear all implied values to avoid carrying forward ambiguous context
@@ -1910,29 +2103,15 @@ def extract_date_table_bulk(
             
             # Get original row from df_before_resolution to check for explicit attributes
             # (before string resolution, so we can distinguish attributes from resolved values)
-            # Convert date_idx for comparison (handle type mismatch)
-            if 'date_index' in df_before_resolution.columns:
-                date_idx_for_compare = pd.to_numeric(date_idx, errors='coerce')
-                if pd.isna(date_idx_for_compare):
-                    date_idx_for_compare = date_idx
-                original_rows_before = df_before_resolution[pd.to_numeric(df_before_resolution['date_index'], errors='coerce') == date_idx_for_compare]
-            else:
-                original_rows_before = pd.DataFrame()
-            if original_rows_before.empty:
+            original_rows_before = before_by_date.get(date_idx)
+            if original_rows_before is None or original_rows_before.empty:
                 continue
             original_row_before = original_rows_before.iloc[0]
             
             # Get row from df_after_resolution (after ID resolution, before post_normalisation_func)
             # This ensures we have the data even if post_normalisation_func filtered rows
-            # Convert date_idx for comparison (handle type mismatch)
-            if 'date_index' in df_after_resolution.columns:
-                date_idx_for_compare = pd.to_numeric(date_idx, errors='coerce')
-                if pd.isna(date_idx_for_compare):
-                    date_idx_for_compare = date_idx
-                original_rows = df_after_resolution[pd.to_numeric(df_after_resolution['date_index'], errors='coerce') == date_idx_for_compare]
-            else:
-                original_rows = pd.DataFrame()
-            if original_rows.empty:
+            original_rows = after_by_date.get(date_idx)
+            if original_rows is None or original_rows.empty:
                 continue
             original_row = original_rows.iloc[0]
             
@@ -2002,18 +2181,13 @@ def extract_date_table_bulk(
                 elif has_explicit_dynasty and explicit_dyn_id is not None:
                     reset_implied_state_for_dynasty(implied, explicit_dyn_id, dyn_df)
 
-            # Convert date_idx to match df_candidates['date_index'] dtype for proper comparison
-            # This handles cases where date_idx is a string but date_index column is numeric
-            if not df_candidates.empty and 'date_index' in df_candidates.columns:
-                # Convert date_idx to numeric to match the column dtype
-                date_idx_converted = pd.to_numeric(date_idx, errors='coerce')
-                if pd.isna(date_idx_converted):
-                    # If conversion fails, try direct comparison (fallback)
-                    date_idx_converted = date_idx
-                comparison_result = df_candidates['date_index'] == date_idx_converted
-                g = df_candidates[comparison_result].copy()
-            else:
-                g = df_candidates[df_candidates['date_index'] == date_idx].copy()
+            # date_idx is numeric (see all_date_indices); 3 and 3.0 share a dict key
+            g = candidates_by_date.get(date_idx)
+            g = g.copy() if g is not None else df_candidates.iloc[0:0].copy()
+            if isolate_dates and not g.empty:
+                # On its own the date would not have these columns at all, and the solvers
+                # treat a present-but-empty max_year or era_start_year as a constraint
+                g = g.drop(columns=[c for c in generated_columns if g[c].isna().all()])
             no_candidates_generated = False
 
             if g.empty:
@@ -2182,6 +2356,16 @@ def extract_date_table_bulk(
                         has_sex_year = ('sex_year' in g.columns) and g['sex_year'].notna().any()
                         no_year = not (has_year or has_sex_year)
 
+            # Candidate expansion was refused (see budget.py): report instead of solving
+            if budget.is_exceeded(date_idx) and not g.empty:
+                result_df = g.iloc[[0]].copy()
+                result_df['error_str'] = budget.message(date_idx, phrase_dic)
+                result_df['date_index'] = date_idx
+                all_results.append(result_df)
+                prev_date_results = result_df
+                prev_date_idx = date_idx
+                continue
+
             # Check if we have sufficient context for dates with year/month/day constraints
             # If date has temporal constraints but no era/dynasty/ruler context, report insufficient information
             has_temporal_constraints = has_year or has_sex_year or has_month or has_day or has_gz or has_lp or has_nmd_gz
@@ -2208,7 +2392,16 @@ def extract_date_table_bulk(
             # Determine date type
             is_simple = not has_year and not has_sex_year and not has_month and not has_day and not has_gz and not has_lp and not has_nmd_gz
             # Solve based on date type
-            if is_simple:
+            g_unsolved = g
+            if solver_kernel == 'array':
+                # Same dispatch on column arrays; g comes back as the first candidate row
+                result_df, implied, g = solve_candidates(
+                    g, implied, era_df=era_df, lunar_table=lunar_table, phrase_dic=phrase_dic,
+                    has_year=has_year, has_sex_year=has_sex_year, has_month=has_month, has_day=has_day,
+                    has_gz=has_gz, has_lp=has_lp, has_nmd_gz=has_nmd_gz, has_intercalary=has_intercalary,
+                    tpq=tpq, taq=taq, pg=pg, gs=gs, budget=budget
+                )
+            elif is_simple:
                 # Simple date (dynasty/era only)
                 result_df, implied = solve_date_simple(
                     g, implied, phrase_dic, tpq, taq
@@ -2219,7 +2412,7 @@ def extract_date_table_bulk(
                 if has_year or has_sex_year:
                     g, implied = solve_date_with_year(
                         g, implied, era_df, phrase_dic, tpq, taq,
-                        has_month, has_day, has_gz, has_lp
+                        has_month, has_day, has_gz, has_lp, budget=budget
                     )
                 # Separate into those needing lunar solution and those not needing lunar solution
                 g_a = g[g['lunar_solution'] == 1].copy()
@@ -2237,7 +2430,7 @@ def extract_date_table_bulk(
                     result_df_a, implied = solve_date_with_lunar_constraints(
                         g_a, implied, lunar_table, phrase_dic,
                         month=month_val, day=day_val, gz=gz_val, lp=lp_val, nmd_gz=nmd_gz_val, intercalary=intercalary_val,
-                        tpq=tpq, taq=taq, pg=pg, gs=gs
+                        tpq=tpq, taq=taq, pg=pg, gs=gs, budget=budget
                     )
                 # Add JDN and ISO dates to proliferate candidates
                 if not result_df_b.empty:
@@ -2269,7 +2462,7 @@ def extract_date_table_bulk(
                 # Year-only date (no month/day constraints)
                 result_df, implied = solve_date_with_year(
                     g, implied, era_df, phrase_dic, tpq, taq,
-                    False, False, False, False
+                    False, False, False, False, budget=budget
                 )
                 # If year-only date solving resulted in no matches, return original candidates
                 if result_df.empty:
@@ -2277,6 +2470,11 @@ def extract_date_table_bulk(
                     phrase_dic = get_phrase_dic(lang if lang is not None else 'en')
                     result_df['error_str'] += phrase_dic.get('year-solving-failed', 'Year resolution failed; ')
             
+            if budget.is_exceeded(date_idx) and not g_unsolved.empty:
+                g = g_unsolved
+                result_df = g.iloc[[0]].copy()
+                result_df['error_str'] = budget.message(date_idx, phrase_dic)
+
             # Add date_index and date_string to result
             # Ensure we always include the date, even if solving failed
             if result_df.empty:
@@ -2347,131 +2545,13 @@ def extract_date_table_bulk(
             # Update previous date_index for next iteration
             prev_date_idx = date_idx
         # Combine all results
-        non_empty_results = [df for df in all_results if not df.empty]
-        if non_empty_results:
-            # Future-proof: ensure consistent columns and dtypes before concat
-            # Get all unique columns from all dataframes (preserve order from first non-empty df)
-            all_columns = list(non_empty_results[0].columns)
-            for df in non_empty_results[1:]:
-                for col in df.columns:
-                    if col not in all_columns:
-                        all_columns.append(col)
-            
-            # Ensure all dataframes have the same columns with consistent dtypes
-            normalized_results = []
-            for df in non_empty_results:
-                df_normalized = df.copy()
-                for col in all_columns:
-                    if col not in df_normalized.columns:
-                        df_normalized[col] = pd.NA
-                # Reorder columns to match the order we determined
-                df_normalized = df_normalized.reindex(columns=all_columns)
-                normalized_results.append(df_normalized)
-            
-            # Future-proof: ensure consistent dtypes for numeric columns before concat
-            # This prevents dtype inference issues and merge errors
-            numeric_cols = ['era_id', 'ruler_id', 'dyn_id', 'year', 'sex_year', 'month', 
-                           'intercalary', 'day', 'jdn', 'ind_year', 'cal_stream', 
-                           'gz', 'lp', 'nmd_gz', 'nmd_jdn', 'hui_jdn', 'max_day']
-            for df in normalized_results:
-                for col in numeric_cols:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            # Use concat with sort=False to preserve column order
-            # Suppress the FutureWarning about empty/all-NA entries by ensuring consistent dtypes
-            import warnings
-            with warnings.catch_warnings():
-                warnings.filterwarnings('ignore', category=FutureWarning, 
-                                      message='.*DataFrame concatenation with empty or all-NA entries.*')
-                output_df = pd.concat(normalized_results, ignore_index=True, sort=False)
-            # When a date_index has at least one solved row (era_id or ruler_id), drop unresolved
-            # rows (no era_id and no ruler_id) from dynasty expansion that failed to match.
-            if all(col in output_df.columns for col in ['ruler_id', 'era_id', 'dyn_id', 'date_index']):
-                has_era = output_df['era_id'].notna()
-                has_ruler = output_df['ruler_id'].notna()
-                solved = has_era | has_ruler
-                unresolved = ~has_era & ~has_ruler
-                if unresolved.any() and solved.any():
-                    def _drop_unresolved_when_solved(g):
-                        if g['solved'].any():
-                            return g[g['solved']].drop(columns=['solved'], errors='ignore')
-                        return g.drop(columns=['solved'], errors='ignore')
-                    output_df['solved'] = solved
-                    _date_index = output_df['date_index'].copy()
-                    output_df = output_df.groupby('date_index', group_keys=False).apply(
-                        _drop_unresolved_when_solved, include_groups=False
-                    )
-                    output_df['date_index'] = _date_index.reindex(output_df.index).values
-                    output_df = output_df.reset_index(drop=True)
-            # Final deduplication by (ruler_id, era_id, dyn_id) removes exact duplicates.
-            if all(col in output_df.columns for col in ['ruler_id', 'era_id', 'dyn_id']):
-                # Sort so rows with non-null era_id come first (for each ruler_id, dyn_id group)
-                output_df['_era_id_is_null'] = output_df['era_id'].isna()
-                
-                # Merge era_start_jdn from era_df to sort by earliest era when available
-                if 'era_start_jdn' not in output_df.columns and era_df is not None and 'era_start_jdn' in era_df.columns:
-                    era_lookup = era_df[['era_id', 'era_start_jdn']].drop_duplicates(subset=['era_id'])
-                    # Ensure era_id has consistent dtype for merge (convert both to numeric)
-                    if 'era_id' in output_df.columns:
-                        output_df['era_id'] = pd.to_numeric(output_df['era_id'], errors='coerce')
-                    if 'era_id' in era_lookup.columns:
-                        era_lookup['era_id'] = pd.to_numeric(era_lookup['era_id'], errors='coerce')
-                    output_df = output_df.merge(era_lookup, on='era_id', how='left', suffixes=('', '_lookup'))
-                    # Use the merged column if it exists, otherwise keep original (if it was already there)
-                    if 'era_start_jdn_lookup' in output_df.columns:
-                        output_df['era_start_jdn'] = output_df['era_start_jdn_lookup']
-                        output_df = output_df.drop(columns=['era_start_jdn_lookup'], errors='ignore')
-                # Sort by (ruler_id, dyn_id, era_id_is_null, era_start_jdn) to prefer non-null era_id and earliest era
-                if 'era_start_jdn' in output_df.columns:
-                    output_df = output_df.sort_values(by=['ruler_id', 'dyn_id', '_era_id_is_null', 'era_start_jdn'], ascending=[True, True, True, True]).reset_index(drop=True)
-                else:
-                    # Fallback: sort by era_id if era_start_jdn not available
-                    output_df = output_df.sort_values(by=['ruler_id', 'dyn_id', '_era_id_is_null', 'era_id'], ascending=[True, True, True, True]).reset_index(drop=True)
-                # Deduplicate by (ruler_id, dyn_id) within each date_index bloc, keeping first (prefers non-null era_id and earliest era)
-                if 'date_index' in output_df.columns:
-                    _date_index = output_df['date_index'].copy()
-                    output_df = output_df.groupby('date_index', group_keys=False).apply(
-                        lambda g: g.drop_duplicates(subset=['ruler_id', 'dyn_id'], keep='first'),
-                        include_groups=False,
-                    )
-                    output_df['date_index'] = _date_index.reindex(output_df.index).values
-                    output_df = output_df.reset_index(drop=True)
-                else:
-                    output_df = output_df.drop_duplicates(subset=['ruler_id', 'dyn_id'], keep='first').reset_index(drop=True)
-                # Drop the temporary column
-                output_df = output_df.drop(columns=['_era_id_is_null'], errors='ignore')
-                # Final deduplication by (ruler_id, era_id, dyn_id) within each date_index bloc
-                if 'date_index' in output_df.columns:
-                    _date_index = output_df['date_index'].copy()
-                    output_df = output_df.groupby('date_index', group_keys=False).apply(
-                        lambda g: g.drop_duplicates(subset=['ruler_id', 'era_id', 'dyn_id'], keep='first'),
-                        include_groups=False,
-                    )
-                    output_df['date_index'] = _date_index.reindex(output_df.index).values
-                    output_df = output_df.reset_index(drop=True)
-                else:
-                    output_df = output_df.drop_duplicates(subset=['ruler_id', 'era_id', 'dyn_id'], keep='first').reset_index(drop=True)
-            else:
-                dup_cols = []
-                for col in ['ruler_id', 'era_id', 'dyn_id']:
-                    if col in output_df.columns:
-                        dup_cols.append(col)
-                if dup_cols:
-                    output_df = output_df.drop_duplicates(subset=dup_cols, keep='first').reset_index(drop=True)
-                else:
-                    output_df = output_df.drop_duplicates().reset_index(drop=True)
-        else:
-            output_df = pd.DataFrame()
+        output_df = assemble_date_results(all_results, era_df)
+        stage_count('rowsSolved', len(output_df))
+        stage_time('solve', t_stage)
 
     if original_text is not None and normalized_text is not None and not output_df.empty:
         output_df = restore_original_date_strings(output_df, original_text, normalized_text)
 
-    # Return XML string (use dynasty-mismatch fixed version when applied), output dataframe, implied, and whether XML was modified
-    xml_string = (
-        modified_xml_string
-        if modified_xml_string is not None
-        else et.tostring(xml_root, encoding='utf8').decode('utf8')
-    )
-    xml_modified = modified_xml_string is not None
+    # Return XML string (the dynasty-mismatch fix, when applied, edited xml_root in place), output dataframe, implied, and whether XML was modified
+    xml_string = et.tostring(xml_root, encoding='utf8').decode('utf8')
     return xml_string, output_df, implied, xml_modified
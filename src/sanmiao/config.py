@@ -7,6 +7,15 @@ DEFAULT_TAQ = 2050  # terminus ante quem (latest date)
 # Default Gregorian start date [YYYY, MM, DD]
 DEFAULT_GREGORIAN_START = [1582, 10, 15]
 
+# Largest intermediate candidate frame allowed per date (see budget.py); None disables a limit.
+# Overridden by the SANMIAO_MAX_CANDIDATE_ROWS / SANMIAO_MAX_CANDIDATE_MB environment variables.
+DEFAULT_MAX_CANDIDATE_ROWS = 5_000_000
+DEFAULT_MAX_CANDIDATE_MB = 1024
+
+# Solver kernel used by extract_date_table_bulk: 'frame' (pandas, solving.py) or 'array'
+# (NumPy column arrays, array_solver.py). Overridden by SANMIAO_SOLVER_KERNEL.
+DEFAULT_SOLVER_KERNEL = 'frame'
+
 # Phrase dictionaries for internationalization
 phrase_dic_en = {
     'ui': 'USER INPUT', 'matches': 'MATCHES',
@@ -1,7 +1,9 @@
 # Date conversion utilities for sanmiao
 
 import re
+import numpy as np
 import pandas as pd
+from functools import lru_cache
 from math import floor
 from typing import Tuple, Union
 
@@ -104,113 +106,202 @@ def ganshu(gz_in, en=False, modulo=False):
     return to_str.get(n, None)
 
 
+_CHINESE_NUMERALS = '〇一二三四五六七八九'
+
+
+def _parse_zh_numeral(x):
+    """
+    Parse a Chinese numeral string into an integer (place-value parser behind numcon).
+    :param x: str
+    :return: int or None
+    """
+    chinese_numerals = _CHINESE_NUMERALS
+    if x in ['正月', '元年']:
+        return 1
+    else:
+        # Normalize number string
+        tups = [
+            ('元', '一'),
+            ('廿', '二十'), ('卅', '三十'), ('卌', '四十'), ('兩', '二'),
+            ('初', '〇'), ('無', '〇'), ('卄', '二十'), ('丗', '三十')
+        ]
+        for tup in tups:
+            x = re.sub(tup[0], tup[1], x)
+        # Variables
+        arab_numerals = '0123456789'
+        w_place_values = ['一', '二', '三', '四', '五', '六', '七', '八', '九', '十', '〇', '百', '千', '萬']
+        # Remove all non number characters
+        only_numbers = ''
+        for char in x:
+            if char in w_place_values:
+                only_numbers += char
+        # Convert to Frankenstein string
+        frankenstein = only_numbers.translate(str.maketrans(chinese_numerals, arab_numerals))
+        # Determine if place value words occur
+        place_values = ['十', '百', '千', '萬']
+        count = 0
+        for i in place_values:
+            if i in frankenstein:
+                count = 1
+                break
+        # Logic tree
+        if count == 0:  # If there are no place values
+            # Try to return as integer
+            if frankenstein.strip():  # Only try to convert non-empty strings
+                try:
+                    return int(frankenstein)
+                except (ValueError, TypeError):
+                    return None
+            else:
+                return None
+        else:  # If there are place value words
+            # Remove zeros
+            frankenstein = frankenstein.replace('0', '')
+            # Empty result to which to add each place value
+            numeral = 0
+            # Thousands
+            thousands = frankenstein.split('千')
+            if len(thousands) == 2 and len(thousands[0]) == 0:
+                numeral += 1000
+            elif len(thousands) == 2 and len(thousands[0]) == 1:
+                numeral += 1000 * int(thousands[0])
+            # Hundreds
+            hundreds = thousands[-1].split('百')
+            if len(hundreds) == 2 and len(hundreds[0]) == 0:
+                numeral += 100
+            elif len(hundreds) == 2 and len(hundreds[0]) == 1:
+                numeral += 100 * int(hundreds[0])
+            # Tens
+            tens = hundreds[-1].split('十')
+            if len(tens) == 2 and len(tens[0]) == 0:
+                numeral += 10
+            elif len(tens) == 2 and len(tens[0]) == 1:
+                numeral += 10 * int(tens[0])
+            remainder = tens[-1]
+            # Units
+            try:
+                numeral += int(remainder[0])
+            except (IndexError, ValueError):
+                # If remainder is empty or not a digit, skip it
+                pass
+            return int(numeral)
+
+
+def _format_zh_numeral(x):
+    """
+    Format an integer as a Chinese numeral string (formatter behind numcon).
+    :param x: int
+    :return: str
+    """
+    chinese_numerals = _CHINESE_NUMERALS
+    x = int(x)
+    # Blank string
+    s = ''
+    # Find number of thousands
+    x %= 10000
+    thousands = x // 1000
+    if thousands > 0:
+        if thousands > 1:
+            s += chinese_numerals[thousands]
+        s += '千'
+    # Find number of hundreds
+    x %= 1000
+    hundreds = x // 100
+    if hundreds > 0:
+        if hundreds > 1:
+            s += chinese_numerals[hundreds]
+        s += '百'
+    # Find number of tens
+    x %= 100
+    tens = x // 10
+    if tens > 0:
+        if tens > 1:
+            s += chinese_numerals[tens]
+        s += '十'
+    # Find units
+    rem = int(x % 10)
+    if rem > 0:
+        s += chinese_numerals[rem]
+    return s
+
+
+# Precomputed numeral tables.
+# _INT_TO_ZH[n] is the Chinese spelling of n (0–9999); numcon() reduces larger values mod 10000.
+_INT_TO_ZH = tuple(_format_zh_numeral(n) for n in range(10000))
+_INT_TO_ZH_ARRAY = np.array(_INT_TO_ZH, dtype=object)
+
+
+def _zh_numeral_variants():
+    """
+    Spellings of 1–99 that the tagger emits besides the canonical one
+    (廿/卄/卅/丗/卌 contractions, 十有N, 初N for days, 元 for the first year).
+    """
+    variants = ['元']
+    for n in range(1, 100):
+        canon = _INT_TO_ZH[n]
+        forms = {canon}
+        for full, short in (('二十', '廿'), ('二十', '卄'), ('三十', '卅'), ('三十', '丗'), ('四十', '卌')):
+            if canon.startswith(full):
+                forms.add(short + canon[len(full):])
+        if 10 < n < 20:
+            forms.add('十有' + canon[1:])
+        if n <= 10:
+            forms.add('初' + canon)
+        variants.extend(forms - {canon})
+    return variants
+
+
+# String -> int. Canonical spellings invert _INT_TO_ZH; variants go through the parser so the
+# table always agrees with it. Suffixed forms (年/月/日) are left to callers to strip.
+_ZH_TO_INT = {spelling: n for n, spelling in enumerate(_INT_TO_ZH) if spelling}
+_ZH_TO_INT.update({v: _parse_zh_numeral(v) for v in _zh_numeral_variants()})
+_ZH_TO_INT.update({'正月': 1, '元年': 1})
+
+
+@lru_cache(maxsize=4096)
+def _parse_zh_numeral_cached(x):
+    return _parse_zh_numeral(x)
+
+
 def numcon(x):
     """
     Convert Chinese numerals into arabic numerals (from 9999 down) and from arabic into Chinese (from 99 down)
     :param x: str, int, or float
     :return: int
     """
-    chinese_numerals = '〇一二三四五六七八九'
-    if isinstance(x, str):  # If string
-        if x in ['正月', '元年']:
-            return 1
-        else:
-            # Normalize number string
-            tups = [
-                ('元', '一'),
-                ('廿', '二十'), ('卅', '三十'), ('卌', '四十'), ('兩', '二'),
-                ('初', '〇'), ('無', '〇'), ('卄', '二十'), ('丗', '三十')
-            ]
-            for tup in tups:
-                x = re.sub(tup[0], tup[1], x)
-            # Variables
-            arab_numerals = '0123456789'
-            w_place_values = ['一', '二', '三', '四', '五', '六', '七', '八', '九', '十', '〇', '百', '千', '萬']
-            # Remove all non number characters
-            only_numbers = ''
-            for char in x:
-                if char in w_place_values:
-                    only_numbers += char
-            # Convert to Frankenstein string
-            frankenstein = only_numbers.translate(str.maketrans(chinese_numerals, arab_numerals))
-            # Determine if place value words occur
-            place_values = ['十', '百', '千', '萬']
-            count = 0
-            for i in place_values:
-                if i in frankenstein:
-                    count = 1
-                    break
-            # Logic tree
-            if count == 0:  # If there are no place values
-                # Try to return as integer
-                if frankenstein.strip():  # Only try to convert non-empty strings
-                    try:
-                        return int(frankenstein)
-                    except (ValueError, TypeError):
-                        return None
-                else:
-                    return None
-            else:  # If there are place value words
-                # Remove zeros
-                frankenstein = frankenstein.replace('0', '')
-                # Empty result to which to add each place value
-                numeral = 0
-                # Thousands
-                thousands = frankenstein.split('千')
-                if len(thousands) == 2 and len(thousands[0]) == 0:
-                    numeral += 1000
-                elif len(thousands) == 2 and len(thousands[0]) == 1:
-                    numeral += 1000 * int(thousands[0])
-                # Hundreds
-                hundreds = thousands[-1].split('百')
-                if len(hundreds) == 2 and len(hundreds[0]) == 0:
-                    numeral += 100
-                elif len(hundreds) == 2 and len(hundreds[0]) == 1:
-                    numeral += 100 * int(hundreds[0])
-                # Tens
-                tens = hundreds[-1].split('十')
-                if len(tens) == 2 and len(tens[0]) == 0:
-                    numeral += 10
-                elif len(tens) == 2 and len(tens[0]) == 1:
-                    numeral += 10 * int(tens[0])
-                remainder = tens[-1]
-                # Units
-                try:
-                    numeral += int(remainder[0])
-                except (IndexError, ValueError):
-                    # If remainder is empty or not a digit, skip it
-                    pass
-                return int(numeral)
-    else:  # To convert from integer/float to Chinese
-        x = int(x)
-        # Blank string
-        s = ''
-        # Find number of thousands
-        x %= 10000
-        thousands = x // 1000
-        if thousands > 0:
-            if thousands > 1:
-                s += chinese_numerals[thousands]
-            s += '千'
-        # Find number of hundreds
-        x %= 1000
-        hundreds = x // 100
-        if hundreds > 0:
-            if hundreds > 1:
-                s += chinese_numerals[hundreds]
-            s += '百'
-        # Find number of tens
-        x %= 100
-        tens = x // 10
-        if tens > 0:
-            if tens > 1:
-                s += chinese_numerals[tens]
-            s += '十'
-        # Find units
-        rem = int(x % 10)
-        if rem > 0:
-            s += chinese_numerals[rem]
-        return s
+    if isinstance(x, str):
+        n = _ZH_TO_INT.get(x)
+        if n is not None:
+            return n
+        return _parse_zh_numeral_cached(x)
+    return _INT_TO_ZH[int(x) % 10000]
+
+
+def numcon_series(values) -> pd.Series:
+    """
+    Vectorised numcon for a Series (or list) of numerals, in either direction.
+
+    Strings map to float64 (NaN where numcon would return None); numbers map to
+    Chinese numeral strings (NaN stays NaN). Uses the precomputed tables and only
+    falls back to the parser for spellings outside them.
+    :param values: pd.Series or list-like
+    :return: pd.Series, aligned with the input index
+    """
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        out = pd.Series(np.nan, index=s.index, dtype=object)
+        mask = s.notna().to_numpy()
+        if mask.any():
+            ints = s.to_numpy()[mask].astype('int64') % 10000
+            out[mask] = _INT_TO_ZH_ARRAY[ints]
+        return out
+    if s.empty:
+        return pd.Series(index=s.index, dtype='float64')
+    out = s.map(_ZH_TO_INT).astype(object)
+    miss = out.isna() & s.map(lambda v: isinstance(v, str))
+    if miss.any():
+        out[miss] = s[miss].map(_parse_zh_numeral_cached)
+    return pd.to_numeric(out, errors='coerce').astype('float64')
 
 
 def iso_to_jdn(date_string, proleptic_gregorian=False, gregorian_start=None):
@@ -327,6 +418,48 @@ def jdn_to_iso(jdn, proleptic_gregorian=False, gregorian_start=None):
         return None
 
 
+def jdn_to_ymd_array(jdn, proleptic_gregorian=False, gregorian_start=None):
+    """
+    Vectorised counterpart of jdn_to_iso: convert an array of JDNs to (year, month, day) arrays.
+    Years are astronomical (1 B.C. = 0), as in the strings jdn_to_iso returns.
+
+    :param jdn: array-like of float
+    :param proleptic_gregorian: bool
+    :param gregorian_start: list
+    :return: tuple of three int64 arrays (year, month, day)
+    """
+    # Defaults
+    gregorian_start, civ = normalize_defaults(gregorian_start)
+    gs_str = f"{gregorian_start[0]}-{gregorian_start[1]}-{gregorian_start[2]}"
+    gs_jdn = iso_to_jdn(gs_str, proleptic_gregorian, gregorian_start)
+
+    jdn = np.floor(np.asarray(jdn, dtype='float64') + 0.5).astype('int64')
+    # Gregorian branch
+    a = jdn + 32044
+    b = (4 * a + 3) // 146097
+    c = a - (146097 * b) // 4
+    d = (4 * c + 3) // 1461
+    e = c - (1461 * d) // 4
+    m = (5 * e + 2) // 153
+    g_day = e - (153 * m + 2) // 5 + 1
+    g_month = m + 3 - 12 * (m // 10)
+    g_year = 100 * b + d - 4800 + m // 10
+    if proleptic_gregorian:
+        return g_year, g_month, g_day
+    # Julian branch
+    a = jdn + 32082
+    b = (4 * a + 3) // 1461
+    c = a - (1461 * b) // 4
+    m = (5 * c + 2) // 153
+    j_day = c - (153 * m + 2) // 5 + 1
+    j_month = m + 3 - 12 * (m // 10)
+    j_year = b - 4800 + m // 10
+    is_julian = jdn < gs_jdn
+    return (np.where(is_julian, j_year, g_year),
+            np.where(is_julian, j_month, g_month),
+            np.where(is_julian, j_day, g_day))
+
+
 def jdn_to_ccs(x, by_era=True, proleptic_gregorian=False, gregorian_start=None, lang='en', civ=None):
     """
     Convert Julian Day Number to Chinese calendar string.
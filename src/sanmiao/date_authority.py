@@ -4,12 +4,16 @@ Compact dynasty / ruler / era lookup for LJB date attribute pickers.
 
 from __future__ import annotations
 
+import gzip
+import hashlib
+import json
 import math
+from functools import lru_cache
 from typing import Any
 
 import pandas as pd
 
-from .loaders import prepare_tables
+from .loaders import load_normalisation_map, normalise_for_search, prepare_tables
 
 
 def _optional_int(value) -> int | None:
@@ -30,19 +34,31 @@ def _optional_float(value) -> float | None:
         return None
 
 
-def _pick_ruler_label(
-    person_id,
+def _ruler_labels(
+    person_ids,
     ruler_tag_df: pd.DataFrame,
     ruler_can_names: pd.DataFrame,
-) -> str:
+) -> dict[int, str]:
+    """
+    Display label per ruler, computed for all rulers at once.
+    """
     # Prefer canonical/temple names (高祖) over shorter personal/tag strings (劉邦).
-    can = ruler_can_names.loc[ruler_can_names["person_id"] == person_id, "string"].dropna()
-    if not can.empty:
-        return str(can.iloc[0])
-    tags = ruler_tag_df.loc[ruler_tag_df["person_id"] == person_id, "string"].dropna()
-    if not tags.empty:
-        return str(min(tags, key=lambda s: len(str(s))))
-    return str(person_id)
+    can = ruler_can_names.dropna(subset=["person_id", "string"]).drop_duplicates("person_id", keep="first")
+    tags = ruler_tag_df.dropna(subset=["person_id", "string"])[["person_id", "string"]]
+    tags = (
+        tags.assign(_len=tags["string"].astype(str).str.len())
+        .sort_values("_len", kind="stable")
+        .drop_duplicates("person_id", keep="first")
+    )
+    can_by_id = dict(zip(can["person_id"], can["string"].astype(str)))
+    tag_by_id = dict(zip(tags["person_id"], tags["string"].astype(str)))
+    labels: dict[int, str] = {}
+    for person_id in person_ids:
+        label = can_by_id.get(person_id)
+        if label is None:
+            label = tag_by_id.get(person_id, str(person_id))
+        labels[int(person_id)] = label
+    return labels
 
 
 def list_date_authority(civ=None) -> dict[str, list[dict[str, Any]]]:
@@ -50,27 +66,58 @@ def list_date_authority(civ=None) -> dict[str, list[dict[str, Any]]]:
     Join sanmiao tables into three searchable lists for UI pickers.
 
     Returns JSON-serializable dict with keys ``dynasties``, ``rulers``, ``eras``.
+    Built once per civ selection; each call returns a fresh copy.
     """
+    payload = json.loads(date_authority_payload(civ)["json"])
+    del payload["etag"]
+    return payload
+
+
+def _civ_key(civ) -> tuple:
+    if civ is None:
+        civ = ["c", "j", "k"]
+    if isinstance(civ, str):
+        civ = [civ]
+    return tuple(sorted(civ))
+
+
+def date_authority_payload(civ=None) -> dict[str, Any]:
+    """
+    Ready-to-send date authority for one civ selection, cached.
+
+    Returns a dict with ``etag`` (content hash of the lists), ``json`` (UTF-8 bytes of the
+    lists plus their etag) and ``gzip`` (the same bytes, gzip-compressed). Clients that
+    already hold a payload with the same etag can skip downloading it again.
+    """
+    return _authority_payload(_civ_key(civ))
+
+
+@lru_cache(maxsize=16)
+def _authority_payload(civ_key: tuple) -> dict[str, Any]:
+    lists = _build_date_authority(list(civ_key))
+    body = json.dumps(lists, ensure_ascii=False, separators=(",", ":"))
+    etag = hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]
+    data = ('{"etag":' + json.dumps(etag) + "," + body[1:]).encode("utf-8")
+    return {"etag": etag, "json": data, "gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+
+
+def _build_date_authority(civ) -> dict[str, list[dict[str, Any]]]:
     era_df, dyn_df, ruler_df, _lunar, _dyn_tags, ruler_tag_df, ruler_can_names = prepare_tables(
         civ=civ,
     )
 
     dyn_name_by_id = {
         int(row["dyn_id"]): str(row["dyn_name"])
-        for _, row in dyn_df.iterrows()
+        for row in dyn_df.to_dict("records")
         if pd.notna(row.get("dyn_id")) and pd.notna(row.get("dyn_name"))
     }
 
-    ruler_labels: dict[int, str] = {}
-    for person_id in ruler_df["person_id"].dropna().unique():
-        ruler_labels[int(person_id)] = _pick_ruler_label(
-            person_id, ruler_tag_df, ruler_can_names
-        )
+    ruler_labels = _ruler_labels(ruler_df["person_id"].dropna().unique(), ruler_tag_df, ruler_can_names)
 
     dynasties: list[dict[str, Any]] = []
     if not dyn_df.empty:
         sort_cols = [c for c in ["cal_stream", "dyn_start_year", "dyn_id"] if c in dyn_df.columns]
-        for _, row in dyn_df.sort_values(sort_cols).iterrows():
+        for row in dyn_df.sort_values(sort_cols).to_dict("records"):
             dyn_id = _optional_int(row.get("dyn_id"))
             if dyn_id is None:
                 continue
@@ -87,7 +134,7 @@ def list_date_authority(civ=None) -> dict[str, list[dict[str, Any]]]:
     rulers: list[dict[str, Any]] = []
     if not ruler_df.empty:
         sort_cols = [c for c in ["dyn_id", "emp_start_year", "person_id"] if c in ruler_df.columns]
-        for _, row in ruler_df.sort_values(sort_cols).iterrows():
+        for row in ruler_df.sort_values(sort_cols).to_dict("records"):
             dyn_id = _optional_int(row.get("dyn_id"))
             ruler_id = _optional_int(row.get("person_id"))
             if dyn_id is None or ruler_id is None:
@@ -106,7 +153,7 @@ def list_date_authority(civ=None) -> dict[str, list[dict[str, Any]]]:
     eras: list[dict[str, Any]] = []
     if not era_df.empty:
         sort_col = "era_start_jdn" if "era_start_jdn" in era_df.columns else "era_start_year"
-        for _, row in era_df.sort_values(sort_col).iterrows():
+        for row in era_df.sort_values(sort_col).to_dict("records"):
             era_id = _optional_int(row.get("era_id"))
             dyn_id = _optional_int(row.get("dyn_id"))
             if era_id is None or dyn_id is None:
@@ -131,3 +178,126 @@ def list_date_authority(civ=None) -> dict[str, list[dict[str, Any]]]:
             )
 
     return {"dynasties": dynasties, "rulers": rulers, "eras": eras}
+
+
+_KINDS = {"dynasty": "dynasties", "ruler": "rulers", "era": "eras"}
+_GRAM = 3
+
+
+def _grams(text: str) -> set[str]:
+    """All substrings of text up to _GRAM characters long."""
+    return {text[i:i + n] for n in range(1, _GRAM + 1) for i in range(len(text) - n + 1)}
+
+
+@lru_cache(maxsize=16)
+def _search_index(civ_key: tuple) -> dict[str, Any]:
+    """
+    Substring index over authority labels and their tag / simplified forms, per civ selection.
+
+    Every searchable string is normalised through the fuzzy character map and broken into
+    1- to 3-character grams; each gram maps to the entries containing it. Short queries are a
+    single posting lookup, longer ones intersect their trigrams and verify.
+    """
+    char_map = load_normalisation_map()
+    lists = json.loads(_authority_payload(civ_key)["json"])
+    _era, _dyn, _ruler, _lunar, dyn_tag_df, ruler_tag_df, ruler_can_names = prepare_tables(civ=list(civ_key))
+    dyn_tags = dyn_tag_df.groupby("dyn_id")[["string", "string_simp"]].agg(list)
+    ruler_tags = ruler_tag_df.groupby("person_id")[["string", "string_simp"]].agg(list)
+    can_names = ruler_can_names.groupby("person_id")["string"].agg(list)
+
+    def tag_strings(table, key) -> list:
+        if key not in table.index:
+            return []
+        row = table.loc[key]
+        return [v for col in row for v in (col if isinstance(col, list) else [col])]
+
+    entries: list[tuple[str, dict[str, Any], tuple[str, ...]]] = []
+    for kind, plural in _KINDS.items():
+        for record in lists[plural]:
+            forms = [record.get("label"), record.get("labelSimp")]
+            if kind == "dynasty":
+                forms += tag_strings(dyn_tags, record["dynId"])
+            elif kind == "ruler":
+                forms += tag_strings(ruler_tags, record["rulerId"])
+                forms += can_names.get(record["rulerId"], [])
+            strings = {
+                normalise_for_search(str(f), char_map)
+                for f in forms
+                if isinstance(f, str) and f
+            }
+            entries.append((kind, record, tuple(sorted(strings, key=len))))
+
+    postings: dict[str, list[int]] = {}
+    for entry_id, (_kind, _record, strings) in enumerate(entries):
+        grams = set()
+        for text in strings:
+            grams |= _grams(text)
+        for gram in grams:
+            postings.setdefault(gram, []).append(entry_id)
+    return {"entries": entries, "postings": postings, "char_map": char_map}
+
+
+def search_authority(
+    query: str,
+    civ=None,
+    kind: str | None = None,
+    limit: int = 20,
+) -> list[dict[str, Any]]:
+    """
+    Search dynasty, ruler and era labels (traditional, simplified and tag forms).
+
+    The query is normalised through the fuzzy character map, so traditional, simplified and
+    Japanese forms all match. Results are ranked exact match, then prefix, then substring;
+    ties go to the shorter matching form, then to the earlier start year.
+
+    :param query: str, text to look for
+    :param civ: str ('c', 'j', 'k') or list (['c', 'j', 'k']) to filter by civilization
+    :param kind: str, 'dynasty', 'ruler' or 'era' to restrict results, or None for all
+    :param limit: int, maximum number of results
+    :return: list of authority records (as in list_date_authority) with added ``kind``
+        and ``match`` ('exact', 'prefix' or 'substring') keys
+    """
+    if kind is not None and kind not in _KINDS:
+        raise ValueError(f"kind must be one of {sorted(_KINDS)} or None, not {kind!r}")
+    index = _search_index(_civ_key(civ))
+    q = normalise_for_search((query or "").strip(), index["char_map"])
+    if not q or limit <= 0:
+        return []
+    postings = index["postings"]
+    if len(q) <= _GRAM:
+        candidates = postings.get(q, [])
+    else:
+        grams = sorted((q[i:i + _GRAM] for i in range(len(q) - _GRAM + 1)), key=lambda g: len(postings.get(g, ())))
+        candidates = set(postings.get(grams[0], ()))
+        for gram in grams[1:]:
+            candidates.intersection_update(postings.get(gram, ()))
+            if not candidates:
+                break
+
+    ranked = []
+    entries = index["entries"]
+    for entry_id in candidates:
+        entry_kind, record, strings = entries[entry_id]
+        if kind is not None and entry_kind != kind:
+            continue
+        best = None
+        for text in strings:
+            if text == q:
+                rank = 0
+            elif text.startswith(q):
+                rank = 1
+            elif q in text:
+                rank = 2
+            else:
+                continue
+            if best is None or (rank, len(text)) < best:
+                best = (rank, len(text))
+        if best is not None:
+            start = record.get("startYear")
+            ranked.append((best[0], best[1], start if start is not None else 10 ** 6, entry_id))
+    ranked.sort()
+    labels = ("exact", "prefix", "substring")
+    return [
+        {**entries[entry_id][1], "kind": entries[entry_id][0], "match": labels[rank]}
+        for rank, _len, _start, entry_id in ranked[:limit]
+    ]
@@ -0,0 +1,161 @@
+"""
+Optional day-level index over the lunar tables.
+
+For each cal_stream, an int32 array holds the lunar_table_dump row of the lunation
+containing every day in the stream's range (-1 for gaps), so "which lunation contains
+JDN X" is a direct array lookup. The index can be saved as .npy files and loaded
+memory-mapped for heavy reverse-conversion workloads.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+
+from .loaders import data_dir, load_csv
+
+LUNAR_CSV = 'lunar_table_dump.csv'
+_META_FILE = 'meta.json'
+_EXTRA_FILE = 'extra.npy'
+
+
+def _lunar_csv_digest() -> str:
+    return hashlib.sha256((data_dir / LUNAR_CSV).read_bytes()).hexdigest()
+
+
+def _day_keys(jdn) -> np.ndarray:
+    """
+    Calendar days are numbered floor(JDN + 0.5); lunation boundaries in the tables all fall on .5,
+    so a lunation covers the keys of nmd_jdn through hui_jdn inclusive.
+    """
+    jdn = np.asarray(jdn, dtype='float64')
+    keys = np.full(jdn.shape, -1, dtype='int64')
+    ok = ~np.isnan(jdn)
+    keys[ok] = np.floor(jdn[ok] + 0.5).astype('int64')
+    return keys
+
+
+class DayIndex:
+    """
+    Day -> lunation row lookup, one int32 array per cal_stream.
+
+    :param streams: dict mapping cal_stream to (first day key, int32 row array)
+    :param extra: int64 array of (cal_stream, day key, row) for the few days covered by two lunations
+    :param digest: str, sha256 of the lunar table the index was built from
+    """
+
+    def __init__(self, streams: dict[int, tuple[int, np.ndarray]], extra: np.ndarray, digest: str = ''):
+        self.streams = streams
+        self.extra = extra
+        self.digest = digest
+
+    @classmethod
+    def build(cls) -> 'DayIndex':
+        """
+        Build the index in memory from lunar_table_dump.csv.
+        """
+        lunar_table = load_csv(LUNAR_CSV)
+        rows = np.arange(len(lunar_table), dtype='int64')
+        first = _day_keys(lunar_table['nmd_jdn'])
+        last = _day_keys(lunar_table['hui_jdn'])
+        # Skip rows with missing or inverted bounds (the interval lookup ignores them too)
+        usable = lunar_table['nmd_jdn'].notna().to_numpy() & lunar_table['hui_jdn'].notna().to_numpy() & (last >= first)
+        streams = {}
+        extra = []
+        for cs in sorted(lunar_table['cal_stream'].dropna().unique()):
+            sel = usable & (lunar_table['cal_stream'] == cs).to_numpy()
+            lo, hi, rid = first[sel], last[sel], rows[sel]
+            counts = hi - lo + 1
+            keys = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            owners = np.repeat(rid, counts)
+            base = int(keys.min())
+            # First (lowest) row wins; any further lunation on the same day goes to extra
+            uniq, first_pos = np.unique(keys, return_index=True)
+            arr = np.full(int(keys.max()) - base + 1, -1, dtype='int32')
+            arr[uniq - base] = owners[first_pos]
+            dup = np.ones(len(keys), dtype=bool)
+            dup[first_pos] = False
+            if dup.any():
+                extra.append(np.column_stack([np.full(dup.sum(), int(cs)), keys[dup], owners[dup]]))
+            streams[int(cs)] = (base, arr)
+        extra = np.concatenate(extra) if extra else np.empty((0, 3), dtype='int64')
+        return cls(streams, extra.astype('int64'), _lunar_csv_digest())
+
+    def save(self, directory) -> Path:
+        """
+        Write the index as .npy files plus a small JSON manifest.
+        :param directory: str or Path
+        :return: Path
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for cs, (base, arr) in self.streams.items():
+            np.save(directory / f'stream_{cs}.npy', arr)
+        np.save(directory / _EXTRA_FILE, self.extra)
+        meta = {'digest': self.digest, 'streams': {str(cs): base for cs, (base, arr) in self.streams.items()}}
+        (directory / _META_FILE).write_text(json.dumps(meta), encoding='utf-8')
+        return directory
+
+    @classmethod
+    def load(cls, directory, mmap: bool = True) -> 'DayIndex':
+        """
+        Load a saved index, memory-mapped by default.
+        :param directory: str or Path
+        :param mmap: bool
+        :raises ValueError: if the index was built from a different lunar table
+        """
+        directory = Path(directory)
+        meta = json.loads((directory / _META_FILE).read_text(encoding='utf-8'))
+        if meta.get('digest') != _lunar_csv_digest():
+            raise ValueError(f"Day index in {directory} is stale; rebuild it with DayIndex.build().save()")
+        mode = 'r' if mmap else None
+        streams = {
+            int(cs): (int(base), np.load(directory / f'stream_{cs}.npy', mmap_mode=mode))
+            for cs, base in meta['streams'].items()
+        }
+        return cls(streams, np.load(directory / _EXTRA_FILE), meta['digest'])
+
+    def lookup(self, jdn, cal_streams=None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        All (query position, lunar_table_dump row) pairs whose lunation contains the JDN.
+        :param jdn: array-like of float (NaN never matches)
+        :param cal_streams: iterable of cal_stream numbers to search, or None for all
+        :return: tuple of two int64 arrays, ordered by query position then row
+        """
+        keys = _day_keys(np.atleast_1d(jdn))
+        wanted = None if cal_streams is None else {int(cs) for cs in cal_streams}
+        streams = [cs for cs in self.streams if wanted is None or cs in wanted]
+        # One column per stream, filled by direct indexing; -1 where the day is not covered
+        hits = np.full((len(keys), len(streams)), -1, dtype='int64')
+        for col, cs in enumerate(streams):
+            base, arr = self.streams[cs]
+            off = keys - base
+            inside = np.flatnonzero((keys >= 0) & (off >= 0) & (off < len(arr)))
+            hits[inside, col] = arr[off[inside]]
+        qpos, col = np.nonzero(hits >= 0)
+        rows = hits[qpos, col]
+        extra = self.extra
+        if len(extra) and wanted is not None:
+            extra = extra[np.isin(extra[:, 0], streams)]
+        if len(extra):
+            order = np.argsort(extra[:, 1], kind='stable')
+            ekeys, erows = extra[order, 1], extra[order, 2]
+            lo = np.searchsorted(ekeys, keys, side='left')
+            counts = np.searchsorted(ekeys, keys, side='right') - lo
+            if counts.any():
+                idx = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+                qpos = np.concatenate([qpos, np.repeat(np.arange(len(keys)), counts)])
+                rows = np.concatenate([rows, erows[idx]])
+        # Order by query position, then row (a single int64 key sorts much faster than lexsort)
+        qpos = qpos.astype('int64')
+        sort_key = qpos * (int(rows.max(initial=0)) + 1) + rows
+        if len(sort_key) > 1 and (np.diff(sort_key) < 0).any():
+            order = np.argsort(sort_key, kind='stable')
+            qpos, rows = qpos[order], rows[order]
+        return qpos, rows
+
+    def nbytes(self) -> int:
+        return sum(arr.nbytes for base, arr in self.streams.values()) + self.extra.nbytes
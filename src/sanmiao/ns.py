@@ -9,10 +9,17 @@ when created via lxml inside a namespaced `<date>`, children inherit that namesp
 
 from __future__ import annotations
 
+import copy
+import re
+from functools import lru_cache
+
 import lxml.etree as et
 
 TEI_NS = "http://www.tei-c.org/ns/1.0"
 
+# XPath 1.0 whitespace (normalize-space() leaves U+3000 and friends alone).
+_XML_SPACE = re.compile(r"[ \t\r\n]+")
+
 # Wrapper <date> may inherit namespace from these ancestor local names.
 _WRAPPER_NS_ANCESTORS = frozenset(
     {"TEI", "teiCorpus", "text", "body", "div", "p", "ab", "l", "head", "date"}
@@ -54,6 +61,12 @@ def child_local_names(node: et._Element) -> list[str]:
     return [local_name(c.tag) for c in node]
 
 
+@lru_cache(maxsize=None)
+def _compiled(expr: str) -> et.XPath:
+    """Compiled XPath for an expression string (lxml otherwise recompiles on every .xpath call)."""
+    return et.XPath(expr)
+
+
 def xpath_all(
     root: et._Element,
     local: str,
@@ -61,12 +74,12 @@ def xpath_all(
     require_attr: str | None = None,
     extra_predicate: str = "",
 ) -> list:
-    pred = f'local-name()="{local}"'
+    pred = "local-name()=$local"
     if require_attr:
         pred += f" and @{require_attr}"
     if extra_predicate:
         pred += f" and ({extra_predicate})"
-    return root.xpath(f".//*[{pred}]")
+    return _compiled(f".//*[{pred}]")(root, local=local)
 
 
 def xpath_dates(root: et._Element, *, indexed_only: bool = False, with_gz: bool = False) -> list:
@@ -75,31 +88,64 @@ def xpath_dates(root: et._Element, *, indexed_only: bool = False, with_gz: bool
         pred += " and @index"
     if with_gz:
         pred += ' and .//*[local-name()="gz"]'
-    return root.xpath(f".//*[{pred}]")
+    return _compiled(f".//*[{pred}]")(root)
+
+
+_CHILD_TEXT = et.XPath("normalize-space(string(.//*[local-name()=$local][1]))")
 
 
 def child_text(node: et._Element, local: str) -> str | None:
-    xp = f'normalize-space(string(.//*[local-name()="{local}"][1]))'
-    result = node.xpath(xp)
+    result = _CHILD_TEXT(node, local=local)
     if isinstance(result, str) and result.strip():
         return result
     return None
 
 
 def child_attr(node: et._Element, local: str, attr: str) -> str | None:
-    xp = f'normalize-space(string(.//*[local-name()="{local}"][1]/@{attr}))'
-    result = node.xpath(xp)
+    result = _compiled(f"normalize-space(string(.//*[local-name()=$local][1]/@{attr}))")(node, local=local)
     if isinstance(result, str) and result.strip():
         return result
     return None
 
 
 def has_child(node: et._Element, local: str) -> bool:
-    return bool(node.xpath(f'boolean(.//*[local-name()="{local}"])'))
+    """True if any descendant element has local name ``local`` (stops at the first)."""
+    for el in node.iterdescendants():
+        if isinstance(el.tag, str) and local_name(el.tag) == local:
+            return True
+    return False
+
+
+def normalize_space(text: str) -> str:
+    """XPath normalize-space(): collapse runs of XML whitespace and trim the ends."""
+    return _XML_SPACE.sub(" ", text).strip(" \t\r\n")
+
+
+def string_value(el: et._Element) -> str:
+    """XPath string(): concatenated descendant text, without the element's own tail."""
+    return "".join(el.itertext())
+
+
+def first_descendants(node: et._Element, names: set[str] | frozenset) -> dict[str, et._Element]:
+    """
+    First descendant element, in document order, for each local name in ``names``,
+    collected in one walk (the element ``.//*[local-name()=name][1]`` reads first).
+    """
+    found: dict[str, et._Element] = {}
+    for el in node.iterdescendants():
+        tag = el.tag
+        if not isinstance(tag, str):
+            continue
+        name = local_name(tag)
+        if name in names and name not in found:
+            found[name] = el
+            if len(found) == len(names):
+                break
+    return found
 
 
 def has_ancestor_date(el: et._Element) -> bool:
-    return bool(el.xpath('boolean(ancestor::*[local-name()="date"])'))
+    return any(local_name(a.tag) == "date" for a in el.iterancestors())
 
 
 def detect_wrapper_namespace(root: et._Element) -> str | None:
@@ -116,10 +162,31 @@ def detect_wrapper_namespace(root: et._Element) -> str | None:
     return None
 
 
+def localize_namespaces(root: et._Element) -> list[tuple[et._Element, str]]:
+    """
+    Rename every namespaced element in ``root`` (itself included) to its local name, in place.
+    Namespace declarations stay on the tree, so serialisation matches a stripped copy.
+    Returns (element, original tag) pairs for ``restore_namespaces``.
+    """
+    renamed = []
+    for el in root.iter():
+        tag = el.tag
+        if isinstance(tag, str) and tag.startswith("{"):
+            renamed.append((el, tag))
+            el.tag = local_name(tag)
+    return renamed
+
+
+def restore_namespaces(renamed: list[tuple[et._Element, str]]) -> None:
+    """Undo ``localize_namespaces`` (e.g. before writing a TEI document back out)."""
+    for el, tag in renamed:
+        el.tag = tag
+
+
 def strip_namespaces(root: et._Element) -> et._Element:
     """Return a deep copy with Clark notation removed (for sanmiao-only fragments)."""
-    root = et.fromstring(et.tostring(root))
-    for el in root.iter():
-        if isinstance(el.tag, str) and el.tag.startswith("{"):
-            el.tag = local_name(el.tag)
+    root = copy.deepcopy(root)
+    # The copy is a fragment; text following the element in its document is not part of it
+    root.tail = None
+    localize_namespaces(root)
     return root
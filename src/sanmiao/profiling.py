@@ -0,0 +1,257 @@
+"""
+Opt-in profiling of the date pipeline's hot paths.
+
+``with sanmiao.profile() as prof:`` swaps the functions in HOT_PATHS for timing wrappers
+in every loaded sanmiao module that refers to them, and restores the originals on exit,
+so nothing is wrapped (and nothing is paid) outside the block. It also opens a stage
+collector (see ``stages.py``), which picks up the pipeline's counters such as the
+candidate-row high-water mark. Afterwards ``prof.report()`` gives a text table and
+``prof.chrome_trace()`` a Chrome trace (``chrome://tracing`` / Perfetto) when ``trace=True``.
+
+Setting ``SANMIAO_PROFILE=<path>`` profiles the whole process from ``import sanmiao`` and
+writes the report at exit: a Chrome trace if the path ends in ``.json``, text otherwise.
+
+Only the calling process is measured: chunks run in ``workers=N`` pools are not.
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+import pandas as pd
+
+from .stages import StageStats, _CURRENT
+
+# (module, function name) pairs wrapped while profiling is active
+HOT_PATHS = (
+    ('xml_utils', 'replace_in_text_and_tail'),
+    ('tagging', 'replace_in_text_and_tail'),
+    ('bulk_processing', 'dates_xml_to_df'),
+    ('bulk_processing', 'bulk_resolve_dynasty_ids'),
+    ('bulk_processing', 'bulk_resolve_ruler_ids'),
+    ('bulk_processing', 'bulk_resolve_era_ids'),
+    ('bulk_processing', 'bulk_generate_date_candidates'),
+    ('solving', 'solve_date_simple'),
+    ('solving', 'solve_date_with_year'),
+    ('solving', 'solve_date_with_lunar_constraints'),
+    ('converters', 'jdn_to_iso'),
+    ('reporting', 'generate_report_from_dataframe'),
+)
+
+ENV_VAR = 'SANMIAO_PROFILE'
+_MAX_TRACE_EVENTS = 1_000_000
+
+_active_lock = threading.Lock()
+_active: 'Profile | None' = None
+
+
+class _FuncStats:
+    __slots__ = ('calls', 'total', 'own', 'max', 'rows_max')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.own = 0.0
+        self.max = 0.0
+        self.rows_max = 0
+
+
+class Profile:
+    """
+    Call counts, inclusive/own wall time and DataFrame row high-water marks per wrapped
+    function, plus the stage counters collected while active.
+    """
+
+    def __init__(self, trace: bool = False):
+        self.trace = trace
+        self.funcs: dict[str, _FuncStats] = {}
+        self.stages = StageStats()
+        self.events: list[tuple] = []
+        self.wall = 0.0
+        self._t0 = 0.0
+        self._local = threading.local()
+        self._patched: list[tuple[Any, str, Callable]] = []
+        self._stage_token = None
+
+    def _wrap(self, label: str, fn: Callable) -> Callable:
+        stats = self.funcs.setdefault(label, _FuncStats())
+        local = self._local
+        events = self.events if self.trace else None
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            stack = getattr(local, 'stack', None)
+            if stack is None:
+                stack = local.stack = []
+            stack.append(0.0)
+            t0 = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - t0
+                child = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                stats.calls += 1
+                stats.total += elapsed
+                stats.own += elapsed - child
+                if elapsed > stats.max:
+                    stats.max = elapsed
+                if events is not None and len(events) < _MAX_TRACE_EVENTS:
+                    events.append((label, t0, elapsed, threading.get_ident()))
+            if isinstance(result, pd.DataFrame) and len(result) > stats.rows_max:
+                stats.rows_max = len(result)
+            return result
+
+        wrapper.__sanmiao_profiled__ = fn
+        return wrapper
+
+    def start(self) -> 'Profile':
+        global _active
+        with _active_lock:
+            if _active is not None:
+                raise RuntimeError('A sanmiao profile is already active')
+            _active = self
+        originals = {}
+        for mod_name, name in HOT_PATHS:
+            module = sys.modules.get(f'{__package__}.{mod_name}')
+            fn = getattr(module, name, None) if module is not None else None
+            if fn is not None:
+                originals[id(fn)] = (fn, self._wrap(f'{mod_name}.{name}', fn))
+        # rebind every reference held by a sanmiao module (``from .x import f`` copies)
+        for mod_name, module in list(sys.modules.items()):
+            if module is None or not (mod_name == __package__ or mod_name.startswith(f'{__package__}.')):
+                continue
+            for attr, value in list(vars(module).items()):
+                hit = originals.get(id(value))
+                if hit is not None and hit[0] is value:
+                    self._patched.append((module, attr, value))
+                    setattr(module, attr, hit[1])
+        self._stage_token = _CURRENT.set(self.stages)
+        self._t0 = time.perf_counter()
+        return self
+
+    def stop(self) -> 'Profile':
+        global _active
+        self.wall += time.perf_counter() - self._t0
+        if self._stage_token is not None:
+            _CURRENT.reset(self._stage_token)
+            self._stage_token = None
+        for module, attr, original in reversed(self._patched):
+            setattr(module, attr, original)
+        self._patched.clear()
+        with _active_lock:
+            _active = None
+        return self
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        JSON-ready summary: ``wallMs``, ``functions`` (calls, totalMs, ownMs, maxMs,
+        rowsMax per wrapped function, busiest first) and the stage ``stageMs`` / ``counts``.
+        """
+        functions = {
+            label: {
+                'calls': s.calls,
+                'totalMs': round(s.total * 1000, 3),
+                'ownMs': round(s.own * 1000, 3),
+                'maxMs': round(s.max * 1000, 3),
+                'rowsMax': s.rows_max,
+            }
+            for label, s in sorted(self.funcs.items(), key=lambda kv: -kv[1].total)
+            if s.calls
+        }
+        return {'wallMs': round(self.wall * 1000, 1), 'functions': functions, **self.stages.as_event()}
+
+    def report(self) -> str:
+        """
+        Text table of the wrapped functions (busiest first) followed by the stage counters.
+        """
+        summary = self.as_dict()
+        lines = [
+            f"sanmiao profile: {summary['wallMs']:.1f} ms wall",
+            f"{'function':50} {'calls':>9} {'total ms':>11} {'own ms':>11} {'max ms':>9} {'rows max':>9}",
+        ]
+        for label, f in summary['functions'].items():
+            lines.append(
+                f"{label:50} {f['calls']:>9} {f['totalMs']:>11.1f} {f['ownMs']:>11.1f} "
+                f"{f['maxMs']:>9.2f} {f['rowsMax'] or '-':>9}"
+            )
+        for stage, ms in summary['stageMs'].items():
+            lines.append(f'stage {stage}: {ms:.1f} ms')
+        for name, n in summary['counts'].items():
+            lines.append(f'count {name}: {n}')
+        return '\n'.join(lines)
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """
+        Trace Event Format document ('X' complete events, microseconds from profile start).
+        Requires ``trace=True``; otherwise only the summary metadata is included.
+        """
+        pid = os.getpid()
+        events = [
+            {
+                'name': label,
+                'cat': label.split('.', 1)[0],
+                'ph': 'X',
+                'ts': round((t0 - self._t0) * 1e6, 3),
+                'dur': round(elapsed * 1e6, 3),
+                'pid': pid,
+                'tid': tid,
+            }
+            for label, t0, elapsed, tid in self.events
+        ]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': self.as_dict()}
+
+    def save(self, path) -> None:
+        """
+        Write a Chrome trace if path ends in ``.json``, otherwise the text report.
+        """
+        path = os.fspath(path)
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith('.json'):
+                json.dump(self.chrome_trace(), f, ensure_ascii=False)
+            else:
+                f.write(self.report() + '\n')
+
+
+@contextmanager
+def profile(trace: bool = False, out=None) -> Iterator[Profile]:
+    """
+    Profile the sanmiao hot paths for the duration of the block.
+
+    :param trace: bool, keep one event per wrapped call for ``chrome_trace()``
+    :param out: str or Path, optional file written on exit (see Profile.save)
+    :return: Profile (yielded)
+    """
+    prof = Profile(trace=trace).start()
+    try:
+        yield prof
+    finally:
+        prof.stop()
+        if out is not None:
+            prof.save(out)
+
+
+def _profile_from_env() -> None:
+    """
+    Start a process-wide profile when SANMIAO_PROFILE is set; written at interpreter exit.
+    """
+    path = os.environ.get(ENV_VAR)
+    if not path or _active is not None:
+        return
+    prof = Profile(trace=path.endswith('.json')).start()
+
+    def finish():
+        if _active is prof:
+            prof.stop()
+            prof.save(path)
+
+    atexit.register(finish)
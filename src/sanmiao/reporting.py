@@ -1,10 +1,13 @@
 import re
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 from .converters import (
-    gz_year, ganshu, numcon, iso_to_jdn, jdn_to_iso, jdn_to_gz
+    gz_year, ganshu, numcon, numcon_series, iso_to_jdn, jdn_to_iso, jdn_to_gz, jdn_to_ymd_array
 )
 from .config import (
-    phrase_dic_en, get_phrase_dic
+    phrase_dic_en, get_phrase_dic, DEFAULT_TPQ, DEFAULT_TAQ
 )
 from .loaders import (
     prepare_tables, load_csv
@@ -12,88 +15,19 @@ from .loaders import (
 from .utils import guess_variant
 
 
-def generate_report_from_dataframe(output_df, phrase_dic=phrase_dic_en, jd_out=False, tpq=None, taq=None):
+def format_report_lines(output_df, jd_out=False):
     """
-    Generate human-readable report from processed dataframe.
+    Format the report line (names, era year, sexagenary year, month, day, range or ISO date)
+    for every row of a solved dataframe at once, column by column.
 
-    :param output_df: DataFrame with processed date results (includes error_str, date_string, etc.)
-    :param phrase_dic: Dictionary with UI phrases
-    :param jd_out: Whether to output Julian Day numbers
-    :param tpq: Terminus post quem (earliest date filter)
-    :param taq: Terminus ante quem (latest date filter)
-    :return: Formatted report string
+    :param output_df: DataFrame with solved date rows (missing columns are treated as empty)
+    :param jd_out: Whether to output Julian Day numbers instead of ISO dates
+    :return: Series of str, aligned with output_df's index
     """
-    if output_df.empty:
-        return f'{phrase_dic["ui"]}: {phrase_dic["unknown-date"]}\n{phrase_dic["matches"]}:\n{phrase_dic["no-matches"]}'
-
-    # Add missing columns with NaN values (so they can be used in boolean operations)
-    cols = ["dyn_name", "ruler_name", "era_name", "year", "sex_year", "month", "intercalary", "day", "gz", "lp", "nmd_gz"]
-    for col in cols:
-        if col not in output_df.columns:
-            output_df[col] = pd.NA
-    
-    # Check if any rows have resolved historical entities (dyn_id, ruler_id, or era_id)
-    has_resolved_entities = (
-        ('dyn_id' in output_df.columns and output_df['dyn_id'].notna().any()) or
-        ('ruler_id' in output_df.columns and output_df['ruler_id'].notna().any()) or
-        ('era_id' in output_df.columns and output_df['era_id'].notna().any())
-    )
-
-    if not has_resolved_entities:
-        # Format as a proper report entry
-        if not output_df.empty and 'date_string' in output_df.columns:
-            date_string = output_df['date_string'].iloc[0]
-        else:
-            date_string = "unknown date"
-        return f'{phrase_dic["ui"]}: {date_string}\n{phrase_dic["matches"]}:\n{phrase_dic["insuff-data"]}'
-
-    # Check for too many candidates - filter by tpq/taq if provided
-    if len(output_df) > 15:
-        # Filter by tpq/taq if provided
-        if tpq is not None or taq is not None:
-            # Use ind_year if available, otherwise use era_start_year or era_end_year
-            filter_mask = pd.Series([True] * len(output_df), index=output_df.index)
-            
-            if 'ind_year' in output_df.columns:
-                if tpq is not None:
-                    filter_mask &= output_df['ind_year'].notna() & (output_df['ind_year'] >= tpq)
-                if taq is not None:
-                    filter_mask &= output_df['ind_year'].notna() & (output_df['ind_year'] <= taq)
-            elif 'era_start_year' in output_df.columns:
-                if tpq is not None:
-                    filter_mask &= output_df['era_start_year'].notna() & (output_df['era_start_year'] >= tpq)
-                if taq is not None:
-                    filter_mask &= output_df['era_start_year'].notna() & (output_df['era_start_year'] <= taq)
-            elif 'era_end_year' in output_df.columns:
-                if tpq is not None:
-                    filter_mask &= output_df['era_end_year'].notna() & (output_df['era_end_year'] >= tpq)
-                if taq is not None:
-                    filter_mask &= output_df['era_end_year'].notna() & (output_df['era_end_year'] <= taq)
-            
-            output_df = output_df[filter_mask].copy()
-        
-        # If still too many after filtering, return error message
-        if len(output_df) > 15:
-            date_string = output_df['date_string'].iloc[0] if not output_df.empty and 'date_string' in output_df.columns else "unknown date"
-            return f'{phrase_dic["ui"]}: {date_string}\n{phrase_dic["matches"]}:\n{len(output_df)} {phrase_dic["too-many-cand"]}'
-
-    # Prepare dataframe for vectorized formatting
     df = output_df.copy()
-
-    # If this date has a relative year marker, append a simple warning to error_str
-    # (we keep using existing rel_* columns; no new schema required).
-    if all(c in df.columns for c in ["rel_dir", "rel_unit"]):
-        rel_dir = df["rel_dir"].astype("string").str.strip()
-        rel_unit = df["rel_unit"].astype("string").str.strip()
-        relative_dirs = {"明", "來", "次", "去", "昨", "前", "後"}
-        is_relative_year = rel_unit.isin(["年", "歲"]) & rel_dir.isin(list(relative_dirs))
-        if is_relative_year.any():
-            if "error_str" not in df.columns:
-                df["error_str"] = ""
-            # Avoid duplicating if upstream already added the warning.
-            existing = df.loc[is_relative_year, "error_str"].fillna("")
-            needs = ~existing.str.contains("relative date", regex=False)
-            df.loc[is_relative_year & needs, "error_str"] = existing[needs] + "relative date"
+    for col in ["dyn_name", "ruler_name", "era_name", "year", "sex_year", "month", "intercalary", "day", "gz", "lp", "nmd_gz"]:
+        if col not in df.columns:
+            df[col] = pd.NA
 
     # Ensure strings for concatenation (handle missing columns)
     for col in ["dyn_name", "ruler_name", "era_name"]:
@@ -106,7 +40,7 @@ def generate_report_from_dataframe(output_df, phrase_dic=phrase_dic_en, jd_out=F
     df["year_str"] = ""
     mask = df["year"].notna()
     df.loc[mask & (df["year"] == 1), "year_str"] = "元年"
-    df.loc[mask & (df["year"] != 1), "year_str"] = df.loc[mask & (df["year"] != 1) & df["year"].notna(), "year"].astype(int).map(lambda x: str(numcon(x)) + "年")
+    df.loc[mask & (df["year"] != 1), "year_str"] = numcon_series(df.loc[mask & (df["year"] != 1) & df["year"].notna(), "year"].astype(int)) + "年"
     
     # Format month strings
     df["month_str"] = ""
@@ -114,7 +48,7 @@ def generate_report_from_dataframe(output_df, phrase_dic=phrase_dic_en, jd_out=F
     df.loc[m & (df["month"] == 1), "month_str"] = "正月"
     df.loc[m & (df["month"] == 13), "month_str"] = "臘月"
     df.loc[m & (df["month"] == 14), "month_str"] = "一月"
-    df.loc[m & ~df["month"].isin([1, 13, 14]), "month_str"] = df.loc[m & ~df["month"].isin([1, 13, 14]), "month"].astype(int).map(lambda x: str(numcon(x)) + "月")
+    df.loc[m & ~df["month"].isin([1, 13, 14]), "month_str"] = numcon_series(df.loc[m & ~df["month"].isin([1, 13, 14]), "month"].astype(int)) + "月"
 
     # Intercalary marker
     df["int_str"] = ""
@@ -123,7 +57,7 @@ def generate_report_from_dataframe(output_df, phrase_dic=phrase_dic_en, jd_out=F
     # Day strings
     df["day_str"] = ""
     d = (df["day"].notna()) & (df["lp"] != 0)
-    df.loc[d, "day_str"] = df.loc[d & df["day"].notna(), "day"].astype(int).map(lambda x: str(numcon(x)) + "日")
+    df.loc[d, "day_str"] = numcon_series(df.loc[d & df["day"].notna(), "day"].astype(int)) + "日"
 
     # Sexagenary day
     df["gz_str"] = ""
@@ -162,7 +96,9 @@ def generate_report_from_dataframe(output_df, phrase_dic=phrase_dic_en, jd_out=F
     if all(col in df.columns for col in ["nmd_gz", "ISO_Date_Start", "start_gz", "ISO_Date_End", "end_gz"]):
         lunar_range_mask = (
             df["month"].notna() & df["day"].isna() & df["gz"].isna() & df["lp"].isna() &
-            df["nmd_gz"].notna() & df["ISO_Date_Start"].notna()
+            df["nmd_gz"].notna() & df["ISO_Date_Start"].notna() &
+            # Rows from other dates can bring these columns in; a row without them gets no range
+            df["start_gz"].notna() & df["ISO_Date_End"].notna() & df["end_gz"].notna()
         )
         if jd_out:
             df.loc[lunar_range_mask, "range_str"] = (
@@ -204,14 +140,107 @@ def generate_report_from_dataframe(output_df, phrase_dic=phrase_dic_en, jd_out=F
         sex_year_mask = df["ind_year"].notna()
         df.loc[sex_year_mask, "sex_year_str"] = df.loc[sex_year_mask & df["ind_year"].notna(), "ind_year"].astype(int).map(lambda y: f"（歲在{ganshu(gz_year(y))}）")
 
-    # Combine all components into report_line
-    df["report_line"] = (
+    # Combine all components into one line per row
+    return (
         df["dyn_name"] + df["ruler_name"] + df["era_name"] +
         df["year_str"] + df["sex_year_str"] + df["int_str"] + df["month_str"] +
         df["day_str"] + df["gz_str"] + df["lp_str"] +
         df["range_str"] + df["jdn_str"]
     )
 
+
+def generate_report_from_dataframe(output_df, phrase_dic=phrase_dic_en, jd_out=False, tpq=None, taq=None):
+    """
+    Generate human-readable report from processed dataframe.
+
+    :param output_df: DataFrame with processed date results (includes error_str, date_string, etc.)
+    :param phrase_dic: Dictionary with UI phrases
+    :param jd_out: Whether to output Julian Day numbers
+    :param tpq: Terminus post quem (earliest date filter)
+    :param taq: Terminus ante quem (latest date filter)
+    :return: Formatted report string
+    """
+    if output_df.empty:
+        return f'{phrase_dic["ui"]}: {phrase_dic["unknown-date"]}\n{phrase_dic["matches"]}:\n{phrase_dic["no-matches"]}'
+
+    # Add missing columns with NaN values (so they can be used in boolean operations)
+    cols = ["dyn_name", "ruler_name", "era_name", "year", "sex_year", "month", "intercalary", "day", "gz", "lp", "nmd_gz"]
+    for col in cols:
+        if col not in output_df.columns:
+            output_df[col] = pd.NA
+    
+    # Check if any rows have resolved historical entities (dyn_id, ruler_id, or era_id)
+    has_resolved_entities = (
+        ('dyn_id' in output_df.columns and output_df['dyn_id'].notna().any()) or
+        ('ruler_id' in output_df.columns and output_df['ruler_id'].notna().any()) or
+        ('era_id' in output_df.columns and output_df['era_id'].notna().any())
+    )
+
+    # Candidate expansion stopped by the memory budget (see budget.py)
+    if 'error_str' in output_df.columns:
+        over_budget = output_df['error_str'].astype('string').str.contains(phrase_dic['too-many-cand'], regex=False).fillna(False)
+        if over_budget.any():
+            row = output_df[over_budget.to_numpy()].iloc[0]
+            return f'{phrase_dic["ui"]}: {row.get("date_string", "unknown date")}\n{phrase_dic["matches"]}:\n{row["error_str"]}'
+
+    if not has_resolved_entities:
+        # Format as a proper report entry
+        if not output_df.empty and 'date_string' in output_df.columns:
+            date_string = output_df['date_string'].iloc[0]
+        else:
+            date_string = "unknown date"
+        return f'{phrase_dic["ui"]}: {date_string}\n{phrase_dic["matches"]}:\n{phrase_dic["insuff-data"]}'
+
+    # Check for too many candidates - filter by tpq/taq if provided
+    if len(output_df) > 15:
+        # Filter by tpq/taq if provided
+        if tpq is not None or taq is not None:
+            # Use ind_year if available, otherwise use era_start_year or era_end_year
+            filter_mask = pd.Series([True] * len(output_df), index=output_df.index)
+            
+            if 'ind_year' in output_df.columns:
+                if tpq is not None:
+                    filter_mask &= output_df['ind_year'].notna() & (output_df['ind_year'] >= tpq)
+                if taq is not None:
+                    filter_mask &= output_df['ind_year'].notna() & (output_df['ind_year'] <= taq)
+            elif 'era_start_year' in output_df.columns:
+                if tpq is not None:
+                    filter_mask &= output_df['era_start_year'].notna() & (output_df['era_start_year'] >= tpq)
+                if taq is not None:
+                    filter_mask &= output_df['era_start_year'].notna() & (output_df['era_start_year'] <= taq)
+            elif 'era_end_year' in output_df.columns:
+                if tpq is not None:
+                    filter_mask &= output_df['era_end_year'].notna() & (output_df['era_end_year'] >= tpq)
+                if taq is not None:
+                    filter_mask &= output_df['era_end_year'].notna() & (output_df['era_end_year'] <= taq)
+            
+            output_df = output_df[filter_mask].copy()
+        
+        # If still too many after filtering, return error message
+        if len(output_df) > 15:
+            date_string = output_df['date_string'].iloc[0] if not output_df.empty and 'date_string' in output_df.columns else "unknown date"
+            return f'{phrase_dic["ui"]}: {date_string}\n{phrase_dic["matches"]}:\n{len(output_df)} {phrase_dic["too-many-cand"]}'
+
+    # Prepare dataframe for vectorized formatting
+    df = output_df.copy()
+
+    # If this date has a relative year marker, append a simple warning to error_str
+    # (we keep using existing rel_* columns; no new schema required).
+    if all(c in df.columns for c in ["rel_dir", "rel_unit"]):
+        rel_dir = df["rel_dir"].astype("string").str.strip()
+        rel_unit = df["rel_unit"].astype("string").str.strip()
+        relative_dirs = {"明", "來", "次", "去", "昨", "前", "後"}
+        is_relative_year = rel_unit.isin(["年", "歲"]) & rel_dir.isin(list(relative_dirs))
+        if is_relative_year.any():
+            if "error_str" not in df.columns:
+                df["error_str"] = ""
+            # Avoid duplicating if upstream already added the warning.
+            existing = df.loc[is_relative_year, "error_str"].fillna("")
+            needs = ~existing.str.contains("relative date", regex=False)
+            df.loc[is_relative_year & needs, "error_str"] = existing[needs] + "relative date"
+
+    df["report_line"] = format_report_lines(df, jd_out)
+
     # Group by date_index and combine lines
     # Deduplicate report_line values to avoid showing the same line multiple times
     lines_by_date = (
@@ -382,6 +411,233 @@ def jdn_to_ccs(x, by_era=True, proleptic_gregorian=False, gregorian_start=None,
         return None
 
 
+def _build_interval_index(starts, ends):
+    """
+    Index half-open intervals [start, end) for "which intervals contain x" queries.
+    The number line is cut at every endpoint; each elementary segment lists the
+    intervals covering it (CSR layout, row ids in ascending order).
+    :param starts: array-like of float
+    :param ends: array-like of float
+    :return: tuple (breakpoints, indptr, rows)
+    """
+    starts = np.asarray(starts, dtype='float64')
+    ends = np.asarray(ends, dtype='float64')
+    ok = ~(np.isnan(starts) | np.isnan(ends)) & (ends > starts)
+    row_ids = np.flatnonzero(ok)
+    bp = np.unique(np.concatenate([starts[ok], ends[ok]]))
+    lo = np.searchsorted(bp, starts[ok])
+    hi = np.searchsorted(bp, ends[ok])
+    counts = hi - lo
+    rows = np.repeat(row_ids, counts)
+    segs = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    order = np.argsort(segs, kind='stable')
+    indptr = np.zeros(max(len(bp), 1), dtype='int64')
+    indptr[1:] = np.cumsum(np.bincount(segs, minlength=len(bp) - 1))
+    return bp, indptr, rows[order]
+
+
+def _query_interval_index(index, x):
+    """
+    All (query position, interval row) pairs such that the interval contains x.
+    :param index: tuple from _build_interval_index
+    :param x: array of float (NaN never matches)
+    :return: tuple of two int64 arrays (query positions, interval rows)
+    """
+    bp, indptr, rows = index
+    seg = np.searchsorted(bp, x, side='right') - 1
+    valid = (seg >= 0) & (seg < len(bp) - 1) & ~np.isnan(x)
+    pos = np.flatnonzero(valid)
+    seg = seg[valid]
+    counts = indptr[seg + 1] - indptr[seg]
+    qpos = np.repeat(pos, counts)
+    first = np.repeat(indptr[seg] - np.cumsum(counts) + counts, counts)
+    return qpos, rows[first + np.arange(counts.sum())]
+
+
+@lru_cache(maxsize=8)
+def _ccs_batch_tables(civ_key):
+    """
+    Tables and interval indexes used by jdn_to_ccs_batch, cached per civilisation set.
+    :param civ_key: tuple of civilisation codes
+    :return: dict
+    """
+    era_df, dyn_df, ruler_df, lunar_table, dyn_tag_df, ruler_tag_df, ruler_can_names = prepare_tables(civ=list(civ_key))
+    if not ruler_df.empty:
+        ruler_tag_df = ruler_tag_df[ruler_tag_df['person_id'].isin(ruler_df['person_id'].unique())]
+    # Keep lunar_table_dump row numbers so a DayIndex can be mapped onto this filtered table
+    lunar_rows = pd.Index(lunar_table.index)
+    lunar_table = lunar_table.reset_index(drop=True)
+    era_df = era_df.reset_index(drop=True)
+    return {
+        'era_df': era_df,
+        'dyn_df': dyn_df,
+        'ruler_df': ruler_df,
+        'lunar_table': lunar_table,
+        'lunar_rows': lunar_rows,
+        'ruler_tag_df': ruler_tag_df,
+        'ruler_can_names': ruler_can_names,
+        'lunar_index': _build_interval_index(lunar_table['nmd_jdn'], lunar_table['hui_jdn'] + 1),
+        'era_index': _build_interval_index(era_df['era_start_jdn'], era_df['era_end_jdn']),
+    }
+
+
+def jdn_to_ccs_batch(xs, by_era=True, proleptic_gregorian=False, gregorian_start=None, civ=None, strings=True,
+                     day_index=None):
+    """
+    Convert many Julian Day Numbers (or ISO date strings) to Chinese calendar dates at once.
+
+    Same matching rules as jdn_to_ccs, but lunations and eras are found with sorted-array
+    lookups over the whole input instead of masking the tables once per date. Inputs
+    that fall outside every lunation produce no rows.
+    :param xs: list-like of float (Julian Day Number) and/or str (ISO date string Y-M-D)
+    :param by_era: bool (filter from era JDN vs index year)
+    :param proleptic_gregorian: bool
+    :param gregorian_start: list
+    :param civ: str ('c', 'j', 'k') or list (['c', 'j', 'k']) to filter by civilization
+    :param strings: bool, add a ccs column with the jdn_to_ccs display line
+    :param day_index: DayIndex, optional day-level index used instead of searching for lunations
+    :return: pd.DataFrame, one row per (input, era) match, with input_index pointing into xs
+    """
+    # Defaults
+    if gregorian_start is None:
+        gregorian_start = [1582, 10, 15]
+    if civ is None:
+        civ = ['c', 'j', 'k']
+    if isinstance(civ, str):
+        civ = [civ]
+    tables = _ccs_batch_tables(tuple(sorted(civ)))
+    lunar_table = tables['lunar_table']
+
+    # Normalise inputs to JDN; ISO strings are parsed once per distinct value
+    values = pd.Series(list(xs) if not isinstance(xs, pd.Series) else xs.to_list(), dtype=object)
+    is_str = values.map(lambda v: isinstance(v, str))
+    jdns = pd.Series(np.nan, index=values.index, dtype='float64')
+    if is_str.any():
+        parsed = {v: iso_to_jdn(v, proleptic_gregorian, gregorian_start) for v in values[is_str].unique()}
+        jdns[is_str] = values[is_str].map(parsed).astype('float64')
+    if (~is_str).any():
+        jdns[~is_str] = pd.to_numeric(values[~is_str], errors='coerce')
+    jdn = jdns.to_numpy()
+
+    # Lunations containing each JDN
+    if day_index is not None:
+        qpos, raw_rows = day_index.lookup(jdn, cal_streams=lunar_table['cal_stream'].unique())
+        lrows = tables['lunar_rows'].get_indexer(raw_rows)
+        qpos, lrows = qpos[lrows >= 0], lrows[lrows >= 0]
+    else:
+        qpos, lrows = _query_interval_index(tables['lunar_index'], jdn)
+    hits = lunar_table.iloc[lrows].reset_index(drop=True)
+    hits.insert(0, 'jdn', jdn[qpos])
+    hits.insert(0, 'input_index', qpos)
+
+    if by_era:
+        era_df = tables['era_df']
+        epos, erows = _query_interval_index(tables['era_index'], jdn)
+        df = era_df.iloc[erows][['dyn_id', 'cal_stream', 'era_id', 'ruler_id', 'era_name', 'era_start_year']].reset_index(drop=True)
+        df.insert(0, 'input_index', epos)
+        df = df.drop_duplicates(subset=['input_index', 'era_id'])
+        df = df.rename(columns={'ruler_id': 'person_id'})
+        # Get ruler names
+        df = df.merge(tables['ruler_can_names'], how='left', on='person_id')
+        df = df.rename(columns={'person_id': 'ruler_id', 'string': 'ruler_name'})
+        # Get dynasty names
+        df = df.merge(tables['dyn_df'][['dyn_id', 'dyn_name']], how='left', on='dyn_id')
+        # Attach the lunation in the era's calendar stream
+        df = df.merge(hits, how='inner', on=['input_index', 'cal_stream'])
+        # Add ruler start year, just to be safe
+        temp = tables['ruler_df'][['person_id', 'emp_start_year']].rename(columns={'person_id': 'ruler_id'})
+        df = df.merge(temp, how='left', on='ruler_id')
+    else:
+        dyn_df = tables['dyn_df']
+        df = hits.merge(dyn_df, how='left', on='cal_stream')
+        # Filter by index year
+        df = df[(df['dyn_start_year'] <= df['ind_year']) & (df['dyn_end_year'] > df['ind_year'])]
+        df = df.drop(columns=['dyn_start_year', 'dyn_end_year'])
+        # Merge rulers and ruler tags
+        ruler_df = tables['ruler_df'].drop(columns=['cal_stream', 'max_year'])
+        df = df.merge(ruler_df, how='left', on='dyn_id')
+        df = df.merge(tables['ruler_tag_df'], how='left', on='person_id')
+        df = df.rename(columns={'person_id': 'ruler_id', 'string': 'ruler_name'})
+        df = df[(df['emp_start_year'] <= df['ind_year']) & (df['emp_end_year'] > df['ind_year'])]
+        df = df.drop(columns=['emp_end_year'])
+        # Merge eras
+        era_df = tables['era_df'].drop(columns=['max_year']).drop_duplicates(subset=['era_id'])
+        df = df.merge(era_df, how='left', on=['dyn_id', 'cal_stream', 'ruler_id'])
+        df = df[(df['era_start_year'] <= df['ind_year']) & (df['era_end_year'] > df['ind_year'])]
+
+    df = df.sort_values(by=['input_index', 'cal_stream', 'dyn_id'], kind='stable')
+    df = df.drop_duplicates(subset=['input_index', 'era_id']).reset_index(drop=True)
+
+    # Numeric fields
+    jdn = df['jdn'].to_numpy(dtype='float64')
+    year, month, day = jdn_to_ymd_array(jdn, proleptic_gregorian, gregorian_start)
+    start = df['era_start_year'].where(df['era_start_year'].notna(), df['emp_start_year'])
+    day_floor = np.trunc(jdn - .5) + .5
+    nmd = df['nmd_jdn'].to_numpy(dtype='float64')
+    hui = df['hui_jdn'].to_numpy(dtype='float64')
+    gz = (np.trunc(jdn - 9.5).astype('int64') % 60)
+    out = pd.DataFrame({
+        'input_index': df['input_index'].to_numpy(),
+        'jdn': jdn,
+        'iso_year': year,
+        'iso_month': month,
+        'iso_day': day,
+        'cal_stream': df['cal_stream'].to_numpy(),
+        'dyn_id': df['dyn_id'].to_numpy(),
+        'dyn_name': df['dyn_name'].to_numpy(),
+        'ruler_id': df['ruler_id'].to_numpy(),
+        'ruler_name': df['ruler_name'].to_numpy(),
+        'era_id': df['era_id'].to_numpy(),
+        'era_name': df['era_name'].to_numpy(),
+        'year': (year - start.to_numpy(dtype='float64') + 1),
+        'sex_year': df['year_gz'].to_numpy(),
+        'intercalary': df['intercalary'].to_numpy(),
+        'month': df['month'].to_numpy(),
+        'day': np.trunc(jdn - nmd) + 1,
+        'lp': np.where(day_floor == nmd, 0, np.where(day_floor == hui, -1, np.nan)),
+        'gz': np.where(gz == 0, 60, gz),
+        'nmd_jdn': nmd,
+        'hui_jdn': hui,
+    })
+    if strings:
+        out['iso'] = _format_iso(out['iso_year'], out['iso_month'], out['iso_day'])
+        out['ccs'] = _format_ccs_lines(out)
+    return out
+
+
+def _format_iso(year, month, day):
+    """
+    Format year/month/day columns the way jdn_to_iso does.
+    """
+    return [
+        f"-{abs(y):04d}-{m:02d}-{d:02d}" if y <= 0 else f"{y:04d}-{m:02d}-{d:02d}"
+        for y, m, d in zip(year, month, day)
+    ]
+
+
+def _format_ccs_lines(df):
+    """
+    Build jdn_to_ccs display lines from the structured columns of jdn_to_ccs_batch.
+    """
+    gz_names = {n: ganshu(n) for n in range(1, 61)}
+    year_str = numcon_series(df['year'].astype('int64')) + '年'
+    year_str = year_str.where(year_str != '一年', '元年')
+    month_str = numcon_series(df['month'].astype('int64')) + '月'
+    month_str = month_str.mask(df['month'] == 1, '正月').mask(df['month'] == 13, '臘月').mask(df['month'] == 14, '一月')
+    day_str = numcon_series(df['day'].astype('int64')) + '日'
+    hui_len = numcon_series((df['hui_jdn'] - df['nmd_jdn'] + 1).astype('int64')) + '日'
+    day_str = day_str.mask(df['lp'] == -1, '晦（' + hui_len + '）').mask(df['lp'] == 0, '朔')
+    era_name = df['era_name'].where(df['era_name'].map(lambda v: isinstance(v, str)), '')
+    lines = (
+        df['dyn_name'].fillna('').astype(str) + df['ruler_name'].fillna('').astype(str)
+        + era_name + year_str
+        + '（歲在' + df['sex_year'].map(gz_names) + '）'
+        + np.where(df['intercalary'] == 1, '閏', '') + month_str + day_str
+        + df['gz'].map(gz_names)
+    )
+    return lines.to_list()
+
+
 def jy_to_ccs(y, lang='en', civ=None):
     """
     Convert Western year to Chinese calendar string.
@@ -425,69 +681,132 @@ def jy_to_ccs(y, lang='en', civ=None):
         else:
             fill = f"{int(abs(y)) + 1} B.C."  # Default to English
     output_string = f'{phrase_dic.get("ui")}: {y} ({fill})\n{phrase_dic.get("matches")}:\n'
-    # Load CSV tables
-    era_df, dyn_df, ruler_df, lunar_table, dyn_tag_df, ruler_tag_df, ruler_can_names = prepare_tables(civ=civ)
+    lines = _year_concordance_slice(int(y), civ)['ccs']
+    if not lines.empty:
+        return output_string + '\n'.join(lines)
+    else:
+        return None
+
+
+def _build_year_concordance(civ_key, start_year, end_year):
+    """
+    Active (dynasty, ruler, era) tuples for every year in [start_year, end_year], with the same
+    matching and deduplication rules jy_to_ccs has always used.
+    :param civ_key: tuple of civilisation codes
+    :param start_year: int
+    :param end_year: int
+    :return: pd.DataFrame sorted by year, with a ccs display line per row
+    """
+    era_df, dyn_df, ruler_df, lunar_table, dyn_tag_df, ruler_tag_df, ruler_can_names = prepare_tables(civ=list(civ_key))
     # Filter ruler_tag_df by filtered rulers
     if not ruler_df.empty:
         valid_person_ids = ruler_df['person_id'].unique()
         ruler_tag_df = ruler_tag_df[ruler_tag_df['person_id'].isin(valid_person_ids)]
     ruler_tag_df = ruler_tag_df[['person_id', 'string']]
-    # Filter dynasties by year
-    df = dyn_df[(dyn_df['dyn_start_year'] <= y) & (dyn_df['dyn_end_year'] >= y)]
-    cols = ['dyn_id', 'dyn_name', 'cal_stream']
-    df = df[cols]
-    # Merge rulers
-    del ruler_df['cal_stream']
-    df = df.merge(ruler_df, how='left', on=['dyn_id'])
-    # Filter by year
-    df = df[(df['emp_start_year'] <= y) & (df['emp_end_year'] >= y)]
-    # Merge ruler strings
+    # Year-independent dynasty -> ruler -> era join
+    df = dyn_df[['dyn_id', 'dyn_name', 'cal_stream', 'dyn_start_year', 'dyn_end_year']]
+    df = df.merge(ruler_df.drop(columns=['cal_stream']), how='left', on=['dyn_id'])
     df = df.merge(ruler_tag_df, how='left', on='person_id')
     df = df.rename(columns={'person_id': 'ruler_id', 'string': 'ruler_name'})
-    cols = ['dyn_id', 'dyn_name', 'cal_stream', 'ruler_id', 'emp_start_year', 'ruler_name']
-    df = df[cols]
-    # Merge era
-    era_df = era_df[['era_id', 'ruler_id', 'era_name', 'era_start_year', 'era_end_year']]
-    df = df.merge(era_df, how='left', on='ruler_id')
-    # Filter by year
-    df = df[(df['era_start_year'] <= y) & (df['era_end_year'] >= y)].sort_values(by=['cal_stream', 'dyn_id'])
-    # Filter duplicates
-    try:
-        df['variant_rank'] = df['era_name'].apply(guess_variant)
-        df = (
-            df.sort_values(by='variant_rank')
-            .drop_duplicates(subset=['ruler_id', 'era_id'], keep="first")
-            .drop(columns="variant_rank")
-        )
-    except TypeError:
-        df = df.drop_duplicates(subset=['ruler_id', 'era_id'], keep="first")
-    if not df.empty:
-        # Create strings
-        for index, row in df.iterrows():
-            # Output dynasty and ruler name
-            output_string += f"{row['dyn_name']}{row['ruler_name']}"
-            # Convert to era or ruler year
-            if isinstance(row['era_name'], str):
-                output_string += f"{row['era_name']}"
-                # Find era year
-                era_year = y - row['era_start_year'] + 1
-                era_year = numcon(era_year) + '年'
-                if era_year == "一年":
-                    era_year = "元年"
-                output_string += era_year
-            else:
-                ruler_year = y - row['emp_start_year'] + 1
-                ruler_year = numcon(ruler_year) + '年'
-                if ruler_year == "一年":
-                    ruler_year = "元年"
-                output_string += ruler_year
-            # Sexegesimal year
-            sex_year = ganshu(gz_year(y))
-            output_string += f"（歲在{sex_year}）"
-            # Line break
-            output_string += '\n'
-        output_string = output_string[:-1]
-        # Output
-        return output_string
-    else:
-        return None
\ No newline at end of file
+    era_cols = era_df[['era_id', 'ruler_id', 'era_name', 'era_start_year', 'era_end_year']]
+    df = df.merge(era_cols, how='left', on='ruler_id').reset_index(drop=True)
+    # Each joined row is active over the intersection of its dynasty, reign and era years
+    lo = np.maximum.reduce([df[c].to_numpy(dtype='float64') for c in ('dyn_start_year', 'emp_start_year', 'era_start_year')])
+    hi = np.minimum.reduce([df[c].to_numpy(dtype='float64') for c in ('dyn_end_year', 'emp_end_year', 'era_end_year')])
+    lo = np.maximum(lo, start_year)
+    hi = np.minimum(hi, end_year)
+    ok = lo <= hi
+    counts = np.where(ok, hi - lo + 1, 0).astype('int64')
+    rows = np.repeat(np.arange(len(df)), counts)
+    years = np.repeat(np.where(ok, lo, 0).astype('int64') - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    df = df.iloc[rows].reset_index(drop=True)
+    df.insert(0, 'year', years)
+    df = df.sort_values(by=['year', 'cal_stream', 'dyn_id'], kind='stable')
+    # Filter duplicates, preferring traditional era names (unless a year has an unnamed era)
+    is_named = df['era_name'].map(lambda v: isinstance(v, str))
+    rank = df['era_name'].where(is_named, '').map(guess_variant)
+    has_unnamed = (~is_named).groupby(df['year']).transform('any')
+    df['variant_rank'] = rank.where(~has_unnamed, '')
+    df = (
+        df.sort_values(by=['year', 'variant_rank'], kind='stable')
+        .drop_duplicates(subset=['year', 'ruler_id', 'era_id'], keep='first')
+        .drop(columns='variant_rank')
+        .reset_index(drop=True)
+    )
+    # Era (or reign) year and sexagenary year
+    is_named = df['era_name'].map(lambda v: isinstance(v, str))
+    start = df['era_start_year'].where(is_named, df['emp_start_year'])
+    df['era_year'] = (df['year'] - start + 1).astype('int64')
+    df['sex_year'] = df['year'].map(gz_year)
+    year_str = numcon_series(df['era_year']) + '年'
+    year_str = year_str.where(year_str != '一年', '元年')
+    df['ccs'] = (
+        df['dyn_name'].astype(str) + df['ruler_name'].astype(str)
+        + df['era_name'].where(is_named, '') + year_str
+        + '（歲在' + df['sex_year'].map(ganshu) + '）'
+    )
+    return df[['year', 'dyn_id', 'dyn_name', 'cal_stream', 'ruler_id', 'ruler_name',
+               'era_id', 'era_name', 'era_year', 'sex_year', 'ccs']]
+
+
+@lru_cache(maxsize=8)
+def _year_concordance(civ_key):
+    """
+    Year concordance for the default range (DEFAULT_TPQ to DEFAULT_TAQ), cached per civilisation set.
+    :param civ_key: tuple of civilisation codes
+    :return: tuple (concordance DataFrame, sorted year array)
+    """
+    df = _build_year_concordance(civ_key, DEFAULT_TPQ, DEFAULT_TAQ)
+    return df, df['year'].to_numpy()
+
+
+def _year_concordance_slice(y, civ):
+    """
+    Concordance rows for one year; years outside the precomputed range are built on demand.
+    """
+    if isinstance(civ, str):
+        civ = [civ]
+    civ_key = tuple(sorted(civ))
+    if DEFAULT_TPQ <= y <= DEFAULT_TAQ:
+        df, years = _year_concordance(civ_key)
+        lo, hi = np.searchsorted(years, [y, y + 1])
+        return df.iloc[lo:hi]
+    return _build_year_concordance(civ_key, y, y)
+
+
+def jy_to_ccs_batch(years, civ=None, strings=True):
+    """
+    Look up many Western (astronomical) years at once in the year concordance.
+    :param years: list-like of int
+    :param civ: str ('c', 'j', 'k') or list (['c', 'j', 'k']) to filter by civilization
+    :param strings: bool, keep the ccs column with the jy_to_ccs display line
+    :return: pd.DataFrame, one row per (input, era) match, with input_index pointing into years
+    """
+    if civ is None:
+        civ = ['c', 'j', 'k']
+    if isinstance(civ, str):
+        civ = [civ]
+    ys = pd.to_numeric(pd.Series(list(years), dtype=object), errors='coerce').to_numpy(dtype='float64')
+    parts = []
+    inside = (ys >= DEFAULT_TPQ) & (ys <= DEFAULT_TAQ)
+    if inside.any():
+        df, conc_years = _year_concordance(tuple(sorted(civ)))
+        pos = np.flatnonzero(inside)
+        lo = np.searchsorted(conc_years, ys[pos])
+        hi = np.searchsorted(conc_years, ys[pos] + 1)
+        counts = hi - lo
+        rows = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        part = df.iloc[rows].reset_index(drop=True)
+        part.insert(0, 'input_index', np.repeat(pos, counts))
+        parts.append(part)
+    for pos in np.flatnonzero(~inside & ~np.isnan(ys)):
+        part = _year_concordance_slice(int(ys[pos]), civ).reset_index(drop=True)
+        part.insert(0, 'input_index', pos)
+        parts.append(part)
+    if not parts:
+        return pd.DataFrame(columns=['input_index', 'year', 'dyn_id', 'dyn_name', 'cal_stream', 'ruler_id', 'ruler_name',
+                                     'era_id', 'era_name', 'era_year', 'sex_year'] + (['ccs'] if strings else []))
+    out = pd.concat(parts, ignore_index=True).sort_values(by='input_index', kind='stable').reset_index(drop=True)
+    if not strings:
+        out = out.drop(columns='ccs')
+    return out
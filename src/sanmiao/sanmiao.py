@@ -2,17 +2,147 @@ import pandas as pd
 import re
 import lxml.etree as et
 # Import modules
+from .converters import jdn_to_iso
 from .loaders import prepare_tables, normalise_for_search, load_normalisation_map
 from .config import (
     DEFAULT_TPQ, DEFAULT_TAQ, DEFAULT_GREGORIAN_START,
     get_phrase_dic
 )
 from .xml_utils import remove_lone_tags, strip_text
-from .reporting import jdn_to_ccs, jy_to_ccs, generate_report_from_dataframe
+from .reporting import jdn_to_ccs, jdn_to_ccs_batch, jy_to_ccs, jy_to_ccs_batch, generate_report_from_dataframe
 from .tagging import tag_date_elements, consolidate_date, index_date_nodes
 from .bulk_processing import extract_date_table_bulk, add_can_names_bulk, dates_xml_to_df
 
-def cjk_date_interpreter(ui, lang='en', jd_out=False, pg=False, gs=None, tpq=DEFAULT_TPQ, taq=DEFAULT_TAQ, civ=None, sequential=True, fuzzy=True):
+OUTPUT_FORMATS = ('text', 'records', 'dataframe', 'json')
+
+# Column order of the structured (non-text) output of cjk_date_interpreter
+STRUCTURED_COLUMNS = (
+    'input_index', 'input', 'input_type', 'date_index', 'date_string', 'error_code', 'error_str',
+    'cal_stream', 'dyn_id', 'dyn_name', 'ruler_id', 'ruler_name', 'era_id', 'era_name',
+    'year', 'sex_year', 'intercalary', 'month', 'day', 'gz', 'lp', 'ind_year',
+    'jdn', 'iso', 'nmd_jdn', 'hui_jdn', 'iso_start', 'iso_end',
+)
+
+_STRUCTURED_INT_COLUMNS = (
+    'input_index', 'date_index', 'cal_stream', 'dyn_id', 'ruler_id', 'era_id',
+    'year', 'sex_year', 'intercalary', 'month', 'day', 'gz', 'lp', 'ind_year',
+)
+
+_STRUCTURED_RENAMES = {'ISO_Date': 'iso', 'ISO_Date_Start': 'iso_start', 'ISO_Date_End': 'iso_end'}
+
+
+def _unmatched_row(n, user_input, input_type, error_code='no-matches'):
+    return {'input_index': n, 'input': user_input, 'input_type': input_type, 'date_index': 0,
+            'date_string': user_input, 'error_code': error_code}
+
+
+def _structured_ccs_rows(output_df, n, user_input, phrase_dic):
+    """
+    Structured rows for one Chinese-character input line. Each date's rows are flagged
+    with the phrase key generate_report_from_dataframe would have reported for them
+    (error_code); rows that are identical after the projection are dropped, as the
+    report drops duplicate lines.
+    """
+    if output_df.empty:
+        return pd.DataFrame([_unmatched_row(n, user_input, 'ccs')])
+    df = output_df.rename(columns=_STRUCTURED_RENAMES)
+    if 'year_gz' in df.columns:
+        # Solved rows carry the sexagenary year of the resolved year
+        df['sex_year'] = df['year_gz'].where(df['year_gz'].notna(), df.get('sex_year'))
+    # Flag each date_index the way the report treats its rows
+    keys = df['date_index'] if 'date_index' in df.columns else pd.Series(0, index=df.index)
+    resolved = pd.Series(False, index=df.index)
+    for col in ('dyn_id', 'ruler_id', 'era_id'):
+        if col in df.columns:
+            resolved |= df[col].notna()
+    if 'error_str' in df.columns:
+        over_budget = df['error_str'].astype('string').str.contains(phrase_dic['too-many-cand'], regex=False).fillna(False).astype(bool)
+    else:
+        over_budget = pd.Series(False, index=df.index)
+    over_budget = over_budget.groupby(keys).transform('any')
+    resolved = resolved.groupby(keys).transform('any')
+    df['error_code'] = pd.Series([
+        'too-many-cand' if budget else (None if ok else 'insuff-data')
+        for budget, ok in zip(over_budget, resolved)
+    ], index=df.index, dtype=object)
+    df = df[[c for c in STRUCTURED_COLUMNS if c in df.columns]].drop_duplicates()
+    df['input_index'] = n
+    df['input'] = user_input
+    df['input_type'] = 'ccs'
+    return df
+
+
+def _structured_jdn_rows(pending, pg, gs, civ):
+    """
+    Structured rows for the Julian Day Number / ISO input lines, matched in one batch.
+    """
+    parts = []
+    batch = jdn_to_ccs_batch([item for _, _, _, item in pending], proleptic_gregorian=pg,
+                             gregorian_start=gs, civ=civ, strings=False)
+    for pos, (n, user_input, input_type, item) in enumerate(pending):
+        df = batch[batch['input_index'] == pos]
+        if df.empty:
+            parts.append(pd.DataFrame([_unmatched_row(n, user_input, input_type)]))
+            continue
+        df = df.drop(columns=['iso_year', 'iso_month', 'iso_day'])
+        df['iso'] = jdn_to_iso(df['jdn'].iloc[0], pg, gs)
+        df['input_index'] = n
+        df['input'] = user_input
+        df['input_type'] = input_type
+        df['date_index'] = 0
+        df['date_string'] = user_input
+        df['error_code'] = None
+        parts.append(df)
+    return parts
+
+
+def _structured_year_rows(pending, civ):
+    """
+    Structured rows for the Western year input lines, looked up in one batch.
+    """
+    parts = []
+    batch = jy_to_ccs_batch([item for _, _, item in pending], civ=civ, strings=False)
+    for pos, (n, user_input, item) in enumerate(pending):
+        df = batch[batch['input_index'] == pos]
+        if df.empty:
+            parts.append(pd.DataFrame([_unmatched_row(n, user_input, 'year')]))
+            continue
+        # The concordance year is the index year; era_year is the year within the era
+        df = df.rename(columns={'year': 'ind_year', 'era_year': 'year'})
+        df['input_index'] = n
+        df['input'] = user_input
+        df['input_type'] = 'year'
+        df['date_index'] = 0
+        df['date_string'] = user_input
+        df['error_code'] = None
+        parts.append(df)
+    return parts
+
+
+def _structured_output(parts, format):
+    """
+    Concatenate structured rows in input order and return them in the requested format.
+    """
+    if parts:
+        df = pd.concat(parts, ignore_index=True)
+        df = df.reindex(columns=list(STRUCTURED_COLUMNS))
+        df = df.sort_values('input_index', kind='stable', ignore_index=True)
+    else:
+        df = pd.DataFrame(columns=list(STRUCTURED_COLUMNS))
+    for col in _STRUCTURED_INT_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
+    for col in ('jdn', 'nmd_jdn', 'hui_jdn'):
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    for col in df.columns.difference(_STRUCTURED_INT_COLUMNS + ('jdn', 'nmd_jdn', 'hui_jdn'), sort=False):
+        df[col] = df[col].astype(object)
+    if format == 'dataframe':
+        return df
+    if format == 'json':
+        return df.to_json(orient='records', force_ascii=False)
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def cjk_date_interpreter(ui, lang='en', jd_out=False, pg=False, gs=None, tpq=DEFAULT_TPQ, taq=DEFAULT_TAQ, civ=None, sequential=True, fuzzy=True, format='text'):
     """
     Main Chinese calendar date interpreter that processes various input formats.
 
@@ -28,8 +158,17 @@ def cjk_date_interpreter(ui, lang='en', jd_out=False, pg=False, gs=None, tpq=DEF
     :param fuzzy: bool, if True, normalize input to simplified Chinese before tagging and use
         simplified dynasty, era, and ruler tag columns for matching. Enables cross-script input
         (traditional, simplified, or Japanese character forms). Defaults to True.
-    :return: str, formatted interpretation report
+    :param format: str, one of OUTPUT_FORMATS. 'text' (default) returns the report; 'records'
+        (list of dicts), 'dataframe' and 'json' (str) return the matched rows of every input
+        line in STRUCTURED_COLUMNS without building report strings (and without the report's
+        15-candidate cutoff). Lines without matches get
+        one row whose error_code is the phrase key the report would show ('no-matches',
+        'insuff-data', 'too-many-cand').
+    :return: str, formatted interpretation report, or the structured rows for other formats
     """
+    if format not in OUTPUT_FORMATS:
+        raise ValueError(f"format must be one of {OUTPUT_FORMATS}, got {format!r}")
+    structured = format != 'text'
     # Defaults
     if gs is None:
         gs = DEFAULT_GREGORIAN_START
@@ -46,6 +185,8 @@ def cjk_date_interpreter(ui, lang='en', jd_out=False, pg=False, gs=None, tpq=DEF
     ui = re.sub(r'[,;]', r'\n', ui)
     items = re.split(r'\n', ui)
     output_string = ''
+    parts, pending_jdn, pending_years = [], [], []
+    n = -1
     
     # Initialize implied state (moved from extract_date_table_bulk)
     implied = {
@@ -64,6 +205,8 @@ def cjk_date_interpreter(ui, lang='en', jd_out=False, pg=False, gs=None, tpq=DEF
     
     for item in items:
         if item != '':
+            n += 1
+            raw_item = item
             # Determine input type
             # Find Chinese characters
             is_ccs = bool(re.search(r'[\u4e00-\u9fff]', item))
@@ -90,7 +233,14 @@ def cjk_date_interpreter(ui, lang='en', jd_out=False, pg=False, gs=None, tpq=DEF
                 pass
             
             # Proceed according to input type
-            if is_jdn or is_iso:
+            if structured and (is_jdn or is_iso):
+                # Matched in one batch after the loop
+                pending_jdn.append((n, raw_item, 'jdn' if is_jdn else 'iso', item))
+                continue
+            elif structured and is_y:
+                pending_years.append((n, raw_item, item))
+                continue
+            elif is_jdn or is_iso:
                 report = jdn_to_ccs(item, proleptic_gregorian=pg, gregorian_start=gs, lang=lang, civ=civ)
             elif is_y:
                 report = jy_to_ccs(item, lang=lang, civ=civ)
@@ -145,10 +295,21 @@ def cjk_date_interpreter(ui, lang='en', jd_out=False, pg=False, gs=None, tpq=DEF
                 if not output_df.empty:
                     output_df = add_can_names_bulk(output_df, ruler_can_names, dyn_df, era_df)
                 
+                if structured:
+                    parts.append(_structured_ccs_rows(output_df, n, user_input, phrase_dic))
+                    continue
                 # Generate report from dataframe
                 report = generate_report_from_dataframe(output_df, phrase_dic, jd_out, tpq=tpq, taq=taq)
             else:
+                if structured:
+                    parts.append(pd.DataFrame([_unmatched_row(n, raw_item, None)]))
                 continue
             output_string += report + '\n\n'
-    
+
+    if structured:
+        if pending_jdn:
+            parts.extend(_structured_jdn_rows(pending_jdn, pg, gs, civ))
+        if pending_years:
+            parts.extend(_structured_year_rows(pending_years, civ))
+        return _structured_output(parts, format)
     return output_string
\ No newline at end of file
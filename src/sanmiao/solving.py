@@ -1,6 +1,8 @@
 # Date solving algorithms for sanmiao
 
+import numpy as np
 import pandas as pd
+from .budget import frame_row_bytes
 from .config import DEFAULT_TPQ, DEFAULT_TAQ, phrase_dic_en
 from .converters import ganshu, jdn_to_iso, gz_year
 
@@ -18,66 +20,33 @@ def preference_filtering_bulk(table, implied):
     """
     if table.shape[0] < 2:
         return table
-    
-    
-    bu = table.copy()
-    
-    # Filter by implied era_id list
-    era_id_ls = implied.get('era_id_ls', [])
-    if 'era_id' in table.columns and len(era_id_ls) > 0:
-        table = table[table['era_id'].isin(era_id_ls)]
-        if table.empty:
-            table = bu.copy()
-        else:
-            bu = table.copy()
-    
-    # Filter by implied ruler_id list
-    ruler_id_ls = implied.get('ruler_id_ls', [])
-    if 'ruler_id' in table.columns and len(ruler_id_ls) > 0:
-        table = table[table['ruler_id'].isin(ruler_id_ls)]
-        if table.empty:
-            table = bu.copy()
-        else:
-            bu = table.copy()
-    
-    # Filter by implied dyn_id list
-    dyn_id_ls = implied.get('dyn_id_ls', [])
-    if 'dyn_id' in table.columns and len(dyn_id_ls) > 0:
-        table = table[table['dyn_id'].isin(dyn_id_ls)]
-        if table.empty:
-            table = bu.copy()
-        else:
-            bu = table.copy()
-    
+
+    # Each step narrows a row mask; a step that would leave nothing keeps the previous
+    # mask. Rows are selected once at the end.
+    keep = np.ones(table.shape[0], dtype=bool)
+
+    # Filter by implied era_id, ruler_id and dyn_id lists
+    for col, key in (('era_id', 'era_id_ls'), ('ruler_id', 'ruler_id_ls'), ('dyn_id', 'dyn_id_ls')):
+        ids = implied.get(key, [])
+        if col in table.columns and len(ids) > 0:
+            narrowed = keep & table[col].isin(ids).to_numpy()
+            if narrowed.any():
+                keep = narrowed
+
     # DO NOT filter by implied cal_stream list
 
-    # Filter by implied month
-    mn = implied.get('month')
-    if 'month' in table.columns and mn is not None:
-        if table.shape[0] > 1:
-            mos = table.dropna(subset=['month'])['month'].unique()
-            if len(mos) > 1:
-                table = table[table['month'] == mn]
-            if table.empty:
-                table = bu.copy()
-            else:
-                bu = table.copy()
-    
-    # Filter by implied intercalary
-    inter = implied.get('intercalary')
-    bu = table.copy()
-    if 'intercalary' in table.columns and inter is not None:
-        if table.shape[0] > 1:
-            intercalarys = table.dropna(subset=['intercalary'])['intercalary'].unique()
-            if len(intercalarys) > 1:
-                table = table[table['intercalary'] == inter]
-            if table.empty:
-                table = bu.copy()
-            else:
-                bu = table.copy()
-    
-    table = table.drop_duplicates()
-    return table.copy()
+    # Filter by implied month, then intercalary, when the remaining rows disagree on it
+    for col in ('month', 'intercalary'):
+        value = implied.get(col)
+        if col in table.columns and value is not None and keep.sum() > 1:
+            if table[col][keep].nunique(dropna=True) > 1:
+                narrowed = keep & (table[col] == value).to_numpy(dtype=bool, na_value=False)
+                if narrowed.any():
+                    keep = narrowed
+
+    if not keep.all():
+        table = table[keep]
+    return table.drop_duplicates()
 
 
 def solve_date_simple(g, implied, phrase_dic=phrase_dic_en, tpq=DEFAULT_TPQ, taq=DEFAULT_TAQ):
@@ -98,7 +67,7 @@ def solve_date_simple(g, implied, phrase_dic=phrase_dic_en, tpq=DEFAULT_TPQ, taq
         return pd.DataFrame(), f"{phrase_dic.get('ui')}: (empty)\n{phrase_dic.get('matches')}:\nNo matches", implied.copy()
 
     # Apply preference filtering
-    df = preference_filtering_bulk(g.copy(), implied)
+    df = preference_filtering_bulk(g, implied)
     
     # Update implied state.
     #
@@ -197,7 +166,7 @@ def solve_date_simple(g, implied, phrase_dic=phrase_dic_en, tpq=DEFAULT_TPQ, taq
     return df, updated_implied
 
 
-def solve_date_with_year(g, implied, era_df, phrase_dic=phrase_dic_en, tpq=DEFAULT_TPQ, taq=DEFAULT_TAQ, has_month=False, has_day=False, has_gz=False, has_lp=False):
+def solve_date_with_year(g, implied, era_df, phrase_dic=phrase_dic_en, tpq=DEFAULT_TPQ, taq=DEFAULT_TAQ, has_month=False, has_day=False, has_gz=False, has_lp=False, budget=None):
     """
     Solve dates that have year constraints (numeric or sexagenary).
 
@@ -216,6 +185,7 @@ def solve_date_with_year(g, implied, era_df, phrase_dic=phrase_dic_en, tpq=DEFAU
     :param has_day: whether date has day constraint
     :param has_gz: whether date has sexagenary day constraint
     :param has_lp: whether date has lunar phase constraint
+    :param budget: Optional CandidateBudget; a sexagenary-year expansion over budget returns no rows
     :return: tuple (df, updated_implied)
     """
     if g.empty:
@@ -325,6 +295,14 @@ def solve_date_with_year(g, implied, era_df, phrase_dic=phrase_dic_en, tpq=DEFAU
             # Get all index years (every 60 years)
             ind_years = [i for i in range(last_instance, int(era_max) + 1, 60)]
             
+            if budget is not None and len(ind_years) > 0:
+                years = np.array(ind_years)
+                n_rows = (np.searchsorted(years, df['era_end_year'].to_numpy(), side='right')
+                          - np.searchsorted(years, df['era_start_year'].to_numpy(), side='left')).clip(0).sum()
+                date_index = df['date_index'].iloc[0] if 'date_index' in df.columns else None
+                if not budget.allow_rows(date_index, n_rows, frame_row_bytes(df), 'sexagenary year expansion'):
+                    return df.iloc[0:0], implied
+
             # Filter eras to those that contain these index years
             if len(ind_years) > 0:
                 # Expand rows for each matching index year
@@ -419,7 +397,7 @@ def solve_date_with_year(g, implied, era_df, phrase_dic=phrase_dic_en, tpq=DEFAU
 
 def solve_date_with_lunar_constraints(g, implied, lunar_table, phrase_dic=phrase_dic_en,
                                       month=None, day=None, gz=None, lp=None, nmd_gz=None, intercalary=None,
-                                      tpq=DEFAULT_TPQ, taq=DEFAULT_TAQ, pg=False, gs=None):
+                                      tpq=DEFAULT_TPQ, taq=DEFAULT_TAQ, pg=False, gs=None, budget=None):
     """
     Solve dates with month/day/sexagenary day/lunar phase constraints.
 
@@ -436,6 +414,7 @@ def solve_date_with_lunar_constraints(g, implied, lunar_table, phrase_dic=phrase
     :param taq: terminus ante quem
     :param pg: proleptic Gregorian flag
     :param gs: Gregorian start date
+    :param budget: Optional CandidateBudget; a lunar-table merge over budget returns no rows
     :return: tuple (df, updated_implied)
     """
     if g.empty or 'ind_year' not in g.columns:
@@ -498,6 +477,10 @@ def solve_date_with_lunar_constraints(g, implied, lunar_table, phrase_dic=phrase
     # Merge lunar table with candidate dataframe
     cols = [col for col in g.columns if col not in lunar_filtered.columns] + ['cal_stream', 'ind_year']
     g = g[cols]
+    if budget is not None:
+        date_index = g['date_index'].iloc[0] if 'date_index' in g.columns else None
+        if not budget.allow_merge(date_index, g, lunar_filtered, ['cal_stream', 'ind_year'], 'lunar constraints'):
+            return pd.DataFrame(), implied.copy()
     g = g.merge(lunar_filtered, how='left', on=['cal_stream', 'ind_year'])
     df = g.copy()
     # For intercalary months, we already filtered lunar table to intercalary entries,
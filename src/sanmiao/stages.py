@@ -0,0 +1,105 @@
+"""
+Per-stage timings and counters for progress events.
+
+A StageStats collector is made current with ``collect_stages()``; pipeline code then
+calls ``stage_time`` / ``stage_count`` / ``stage_max``, which do nothing when no
+collector is active. The collector is held in a context variable, so nested helpers
+(e.g. the tagger's regex passes) can report without extra parameters. A nested
+collector adds its totals to the enclosing one when it closes, so an outer collector
+(e.g. ``sanmiao.profile()``) still sees work done under per-chunk collectors.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+_CURRENT: ContextVar['StageStats | None'] = ContextVar('sanmiao_stage_stats', default=None)
+
+
+class StageStats:
+    """
+    Accumulated milliseconds per stage plus named counters.
+    """
+
+    def __init__(self):
+        self.ms: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        self._max_keys: set[str] = set()
+
+    def add_time(self, stage: str, ms: float) -> None:
+        self.ms[stage] = self.ms.get(stage, 0.0) + ms
+
+    def add_count(self, name: str, n: int = 1) -> None:
+        self.counts[name] = self.counts.get(name, 0) + int(n)
+
+    def set_max(self, name: str, n: int) -> None:
+        self._max_keys.add(name)
+        self.counts[name] = max(self.counts.get(name, 0), int(n))
+
+    def merge(self, other: 'StageStats') -> None:
+        """
+        Add another collector's times and counts (high-water marks are maxed, not summed).
+        """
+        for stage, ms in other.ms.items():
+            self.add_time(stage, ms)
+        for name, n in other.counts.items():
+            if name in other._max_keys:
+                self.set_max(name, n)
+            else:
+                self.add_count(name, n)
+
+    def as_event(self) -> dict[str, Any]:
+        """
+        Event fields: ``stageMs`` (rounded to 0.1 ms) and ``counts``.
+        """
+        return {
+            'stageMs': {stage: round(ms, 1) for stage, ms in self.ms.items()},
+            'counts': dict(self.counts),
+        }
+
+
+@contextmanager
+def collect_stages(enabled: bool = True) -> Iterator[StageStats | None]:
+    """
+    Make a fresh StageStats current for the duration of the block.
+    :param enabled: bool, when False nothing is collected and None is yielded
+    """
+    if not enabled:
+        yield None
+        return
+    stats = StageStats()
+    token = _CURRENT.set(stats)
+    try:
+        yield stats
+    finally:
+        _CURRENT.reset(token)
+        parent = _CURRENT.get()
+        if parent is not None:
+            parent.merge(stats)
+
+
+def stage_time(stage: str, since: float) -> float:
+    """
+    Charge the time elapsed since ``since`` (a perf_counter value) to a stage.
+    :return: float, the current perf_counter value, to chain into the next stage
+    """
+    now = time.perf_counter()
+    stats = _CURRENT.get()
+    if stats is not None:
+        stats.add_time(stage, (now - since) * 1000)
+    return now
+
+
+def stage_count(name: str, n: int = 1) -> None:
+    stats = _CURRENT.get()
+    if stats is not None:
+        stats.add_count(name, n)
+
+
+def stage_max(name: str, n: int) -> None:
+    stats = _CURRENT.get()
+    if stats is not None:
+        stats.set_max(name, n)
@@ -0,0 +1,407 @@
+"""
+Synthetic date corpora with known answers, drawn from the bundled tables.
+
+Each generated date picks a real era, year and lunation from the era and lunar tables,
+renders it at the requested precision (era + year, + month, + ganzhi day, numeric day,
+leap month, 朔/晦, sexagenary year, or a relative 明年 date after an anchor), and records
+the expected era/ruler/dynasty ids, year, month and JDN alongside. Dates are embedded in
+annals-style filler sentences and can be written as plain text, as TEI (optionally with
+the dates pre-tagged) and as an expected-answers JSONL file.
+
+Usage::
+
+    python -m sanmiao.synthetic --dates 2000 --out corpus/ --tei --seed 1
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+from .config import DEFAULT_TAQ, DEFAULT_TPQ
+from .converters import ganshu, numcon
+from .loaders import prepare_tables
+from .ns import TEI_NS
+
+PRECISIONS = ('year', 'month', 'gz', 'day', 'leap', 'lp', 'sex_year', 'relative')
+
+DEFAULT_MIX = {
+    'year': 1, 'month': 2, 'gz': 3, 'day': 1, 'leap': 1, 'lp': 1, 'sex_year': 1, 'relative': 1,
+}
+
+FILLER_EVENTS = (
+    '大赦', '日有食之', '雨雹', '大雪', '地震', '詔減租賦', '遣使朝貢', '立皇太子', '車駕幸離宮',
+    '以司徒為太尉', '旱', '大風拔木', '築城', '詔舉賢良', '有星孛于東方', '蝗', '大閱於郊',
+)
+
+FILLER_PROSE = (
+    '是時天下初定，百姓安業。', '群臣上表稱賀。', '議者以為不可。', '帝嘉之，賜以金帛。',
+)
+
+
+def _month_label(month: int, intercalary: int) -> tuple[str, str]:
+    """Surface text and tagged XML for a (possibly leap) month."""
+    label = '正月' if month == 1 else f'{numcon(month)}月'
+    if intercalary:
+        return f'閏{label}', f'<int>閏</int><month>{label}</month>'
+    return label, f'<month>{label}</month>'
+
+
+def _year_label(year: int) -> str:
+    return '元年' if year == 1 else f'{numcon(year)}年'
+
+
+class _Sampler:
+    """Table views and random draws for one civ selection."""
+
+    def __init__(self, civ, tpq: int, taq: int, rng: np.random.Generator):
+        era_df, dyn_df, ruler_df, lunar_table, dyn_tag_df, ruler_tag_df, _ = prepare_tables(civ=civ)
+        self.rng = rng
+        eras = era_df[
+            era_df['ruler_id'].notna()
+            & era_df['cal_stream'].notna()
+            & era_df['era_name'].notna()
+            & (era_df['era_start_year'] >= tpq)
+            & (era_df['era_end_year'] <= taq)
+        ].copy()
+        eras['max_year'] = eras['max_year'].fillna(eras['era_end_year'] - eras['era_start_year'] + 1)
+        self.eras = eras[eras['max_year'] >= 1].reset_index(drop=True)
+        self.name_counts = era_df['era_name'].value_counts()
+        lunar = lunar_table.dropna(subset=['nmd_jdn', 'hui_jdn', 'year_gz', 'nmd_gz', 'max_day'])
+        self.lunar = {cs: g.reset_index(drop=True) for cs, g in lunar.groupby('cal_stream')}
+        self.dyn_tags = dyn_tag_df.groupby('dyn_id')['string'].agg(list).to_dict()
+        self.ruler_tags = ruler_tag_df.groupby('person_id')['string'].agg(list).to_dict()
+
+    def lunations(self, era: pd.Series, year: int) -> pd.DataFrame:
+        """Lunations of one era year that lie inside the era's JDN range."""
+        lt = self.lunar.get(era['cal_stream'])
+        if lt is None:
+            return pd.DataFrame()
+        ind_year = int(era['era_start_year']) + year - 1
+        sel = (
+            (lt['ind_year'] == ind_year)
+            & (lt['nmd_jdn'] >= era['era_start_jdn'])
+            & (lt['hui_jdn'] <= era['era_end_jdn'])
+        )
+        return lt[sel.to_numpy()]
+
+    def pick(self, items):
+        return items[int(self.rng.integers(len(items)))]
+
+
+def _render(sampler: _Sampler, precision: str, *, dyn_prefix: float, ruler_prefix: float) -> list[dict[str, Any]] | None:
+    """
+    One draw at the given precision: a list of date records (two for 'relative': the
+    anchor and the 明年 date), or None when the drawn era/year cannot support it.
+    """
+    rng = sampler.rng
+    era = sampler.eras.iloc[int(rng.integers(len(sampler.eras)))]
+    max_year = int(era['max_year'])
+    year = int(rng.integers(1, max_year + 1))
+    if precision == 'relative':
+        if max_year < 2:
+            return None
+        year = min(year, max_year - 1)
+    lunations = sampler.lunations(era, year)
+    if lunations.empty:
+        return None
+    if precision == 'leap':
+        lunations = lunations[lunations['intercalary'] == 1]
+        if lunations.empty:
+            return None
+    lun = lunations.iloc[int(rng.integers(len(lunations)))]
+
+    prefix_text, prefix_xml = '', ''
+    dyn_tags = sampler.dyn_tags.get(era['dyn_id'])
+    if dyn_tags and rng.random() < dyn_prefix:
+        tag = sampler.pick(dyn_tags)
+        prefix_text, prefix_xml = tag, f'<dyn>{escape(tag)}</dyn>'
+    ruler_tags = sampler.ruler_tags.get(era['ruler_id'])
+    if ruler_tags and rng.random() < ruler_prefix:
+        tag = sampler.pick(ruler_tags)
+        prefix_text, prefix_xml = prefix_text + tag, prefix_xml + f'<ruler>{escape(tag)}</ruler>'
+
+    era_name = str(era['era_name'])
+    text = prefix_text + era_name + _year_label(year)
+    xml = prefix_xml + f'<era>{escape(era_name)}</era><year>{_year_label(year)}</year>'
+    expected: dict[str, Any] = {
+        'era_id': int(era['era_id']),
+        'ruler_id': int(era['ruler_id']),
+        'dyn_id': int(era['dyn_id']),
+        'cal_stream': int(era['cal_stream']),
+        'year': year,
+        'ind_year': int(era['era_start_year']) + year - 1,
+    }
+
+    if precision == 'sex_year':
+        sex = ganshu(int(lun['year_gz']))
+        text += f'歲次{sex}'
+        xml += f'<filler>歲次</filler><sexYear>{sex}</sexYear>'
+        expected['sex_year'] = int(lun['year_gz'])
+    elif precision != 'year':
+        month, intercalary = int(lun['month']), int(lun['intercalary'])
+        if precision == 'relative':
+            # 明年 stays in the same lunar month slot of the following era year
+            nxt = sampler.lunations(era, year + 1)
+            nxt = nxt[(nxt['month'] == month) & (nxt['intercalary'] == 0)]
+            if nxt.empty or intercalary:
+                return None
+        m_text, m_xml = _month_label(month, intercalary)
+        text += m_text
+        xml += m_xml
+        expected.update(month=month, intercalary=intercalary)
+        nmd_jdn, max_day, nmd_gz = float(lun['nmd_jdn']), int(lun['max_day']), int(lun['nmd_gz'])
+        if precision in ('gz', 'day', 'lp', 'leap'):
+            if precision == 'lp':
+                day = 1 if rng.random() < 0.5 else max_day
+            else:
+                day = int(rng.integers(1, max_day + 1))
+            gz = ganshu((nmd_gz + day - 2) % 60 + 1)
+            if precision == 'day':
+                text += f'{numcon(day)}日'
+                xml += f'<day>{numcon(day)}日</day>'
+            elif precision == 'lp':
+                lp = '朔' if day == 1 else '晦'
+                text += gz + lp
+                xml += f'<gz>{gz}</gz><lp>{lp}</lp>'
+            else:
+                text += gz
+                xml += f'<gz>{gz}</gz>'
+            expected.update(day=day, jdn=nmd_jdn + day - 1)
+        else:
+            expected.update(jdn_start=nmd_jdn, jdn_end=float(lun['hui_jdn']))
+
+    record = {
+        'text': text,
+        'xml': f'<date>{xml}</date>',
+        'precision': precision,
+        'unique_era_name': bool(sampler.name_counts.get(era_name, 0) == 1),
+        'expected': expected,
+    }
+    if precision != 'relative':
+        return [record]
+
+    record['precision'] = 'anchor'
+    nxt = nxt.iloc[0]
+    m_text, m_xml = _month_label(month, 0)
+    follow = {
+        'text': f'明年{m_text}',
+        'xml': f'<date><rel dir="明" unit="年">明年</rel>{m_xml}</date>',
+        'precision': 'relative',
+        'unique_era_name': record['unique_era_name'],
+        'expected': {
+            **{k: expected[k] for k in ('era_id', 'ruler_id', 'dyn_id', 'cal_stream')},
+            'year': year + 1,
+            'ind_year': expected['ind_year'] + 1,
+            'month': month,
+            'intercalary': 0,
+            'jdn_start': float(nxt['nmd_jdn']),
+            'jdn_end': float(nxt['hui_jdn']),
+        },
+    }
+    return [record, follow]
+
+
+def generate_dates(
+    n: int,
+    *,
+    civ=None,
+    mix: dict[str, float] | None = None,
+    seed: int = 0,
+    tpq: int = DEFAULT_TPQ,
+    taq: int = DEFAULT_TAQ,
+    dyn_prefix: float = 0.5,
+    ruler_prefix: float = 0.2,
+) -> list[list[dict[str, Any]]]:
+    """
+    Draw n date groups with known answers.
+
+    :param n: int, number of groups (a 'relative' group holds an anchor and its 明年 date)
+    :param civ: str or list, civilization filter
+    :param mix: dict, relative weights per precision (keys from PRECISIONS); DEFAULT_MIX if None
+    :param seed: int, random seed (same seed and tables give the same corpus)
+    :param tpq: int, earliest era start year
+    :param taq: int, latest era end year
+    :param dyn_prefix: float, share of dates prefixed with a dynasty tag
+    :param ruler_prefix: float, share of dates prefixed with a ruler tag
+    :return: list of groups; each date record has text, xml, precision, unique_era_name and expected
+    """
+    mix = DEFAULT_MIX if mix is None else mix
+    unknown = set(mix) - set(PRECISIONS)
+    if unknown:
+        raise ValueError(f'Unknown precision(s) {sorted(unknown)}; expected some of {PRECISIONS}')
+    kinds = [k for k in PRECISIONS if mix.get(k, 0) > 0]
+    weights = np.array([mix[k] for k in kinds], dtype='float64')
+    rng = np.random.default_rng(seed)
+    sampler = _Sampler(civ, tpq, taq, rng)
+    groups: list[list[dict[str, Any]]] = []
+    attempts = 0
+    while len(groups) < n:
+        attempts += 1
+        if attempts > 50 * n + 100:
+            raise RuntimeError('Could not draw enough dates; widen tpq/taq or the precision mix')
+        precision = kinds[int(rng.choice(len(kinds), p=weights / weights.sum()))]
+        group = _render(sampler, precision, dyn_prefix=dyn_prefix, ruler_prefix=ruler_prefix)
+        if group is not None:
+            groups.append(group)
+    return groups
+
+
+def generate_corpus(
+    n_dates: int,
+    *,
+    dates_per_paragraph: int = 4,
+    prose_share: float = 0.2,
+    seed: int = 0,
+    **kwargs,
+) -> list[dict[str, Any]]:
+    """
+    Embed generated dates in annals-style paragraphs.
+
+    Each date opens a clause followed by a filler event; a share of clauses is followed by
+    date-free prose.
+
+    :param n_dates: int, number of date groups (see generate_dates)
+    :param dates_per_paragraph: int, date groups per paragraph
+    :param prose_share: float, share of clauses followed by a date-free sentence
+    :param seed: int, random seed
+    :param kwargs: passed on to generate_dates (civ, mix, tpq, taq, dyn_prefix, ruler_prefix)
+    :return: list of paragraphs: {'text', 'xml', 'dates'} where xml has the dates pre-tagged
+    """
+    groups = generate_dates(n_dates, seed=seed, **kwargs)
+    rng = np.random.default_rng(seed + 1)
+    paragraphs = []
+    for start in range(0, len(groups), max(1, dates_per_paragraph)):
+        text, xml, dates = [], [], []
+        for group in groups[start:start + dates_per_paragraph]:
+            for record in group:
+                event = FILLER_EVENTS[int(rng.integers(len(FILLER_EVENTS)))]
+                text.append(f"{record['text']}，{event}。")
+                xml.append(f"{record['xml']}，{event}。")
+                dates.append(record)
+            if rng.random() < prose_share:
+                prose = FILLER_PROSE[int(rng.integers(len(FILLER_PROSE)))]
+                text.append(prose)
+                xml.append(prose)
+        paragraphs.append({'text': ''.join(text), 'xml': ''.join(xml), 'dates': dates})
+    return paragraphs
+
+
+def corpus_to_tei(paragraphs: list[dict[str, Any]], tagged: bool = False) -> str:
+    """
+    Wrap paragraphs in a minimal TEI document.
+    :param tagged: bool, emit the dates as <date> elements (for resolve_dates_batch) instead of plain text
+    """
+    body = '\n'.join(
+        f"        <p>{p['xml'] if tagged else escape(p['text'])}</p>" for p in paragraphs
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<TEI xmlns="{TEI_NS}">\n'
+        '  <teiHeader><fileDesc><titleStmt><title>sanmiao synthetic corpus</title></titleStmt>'
+        '<publicationStmt><p>Generated test data.</p></publicationStmt>'
+        '<sourceDesc><p>sanmiao.synthetic</p></sourceDesc></fileDesc></teiHeader>\n'
+        '  <text>\n    <body>\n      <div type="annals">\n'
+        f'{body}\n'
+        '      </div>\n    </body>\n  </text>\n</TEI>\n'
+    )
+
+
+def write_corpus(directory, paragraphs: list[dict[str, Any]], tei: bool = False) -> Path:
+    """
+    Write corpus.txt (one paragraph per line) and expected.jsonl (one paragraph's dates
+    per line), plus corpus.tei.xml and corpus.tagged.tei.xml when tei is set.
+    :param directory: str or Path
+    :return: Path
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / 'corpus.txt').write_text(''.join(p['text'] + '\n' for p in paragraphs), encoding='utf-8')
+    with open(directory / 'expected.jsonl', 'w', encoding='utf-8') as f:
+        for p in paragraphs:
+            f.write(json.dumps(p['dates'], ensure_ascii=False) + '\n')
+    if tei:
+        (directory / 'corpus.tei.xml').write_text(corpus_to_tei(paragraphs), encoding='utf-8')
+        (directory / 'corpus.tagged.tei.xml').write_text(corpus_to_tei(paragraphs, tagged=True), encoding='utf-8')
+    return directory
+
+
+def _candidate_matches(attrs: dict[str, str], expected: dict[str, Any]) -> bool:
+    if attrs.get('era_id') is None or int(attrs['era_id']) != expected['era_id']:
+        return False
+    if attrs.get('year') is not None and int(attrs['year']) != expected['year']:
+        return False
+    if 'jdn' in expected:
+        return attrs.get('jdn') is not None and float(attrs['jdn']) == expected['jdn']
+    if 'month' in expected and attrs.get('month') is not None:
+        return int(attrs['month']) == expected['month'] and int(attrs.get('intercalary', 0)) == expected['intercalary']
+    return True
+
+
+def check_proposals(dates: list[dict[str, Any]], proposals: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Score proposals for one paragraph (propose_dates_batch output) against its expected dates.
+
+    Proposals are paired with dates in order by surface text. A date counts as ``unique``
+    when it was solved to exactly the expected answer, ``ambiguous`` when the expected
+    answer is among several candidates, ``wrong`` when it is not among them, and
+    ``missing`` when no proposal has its surface text.
+
+    :return: dict of counts plus ``failures`` (text, precision, displayLines) for wrong/missing dates
+    """
+    counts = {'dates': len(dates), 'unique': 0, 'ambiguous': 0, 'wrong': 0, 'missing': 0, 'failures': []}
+    queue = list(proposals)
+    for record in dates:
+        pos = next((i for i, p in enumerate(queue) if p.get('date_string') == record['text']), None)
+        if pos is None:
+            counts['missing'] += 1
+            counts['failures'].append({'text': record['text'], 'precision': record['precision'], 'displayLines': []})
+            continue
+        proposal = queue.pop(pos)
+        candidates = proposal.get('candidates') or []
+        hits = [c for c in candidates if _candidate_matches(c.get('attrs') or {}, record['expected'])]
+        if hits and proposal.get('status') == 'unique':
+            counts['unique'] += 1
+        elif hits:
+            counts['ambiguous'] += 1
+        else:
+            counts['wrong'] += 1
+            counts['failures'].append({
+                'text': record['text'],
+                'precision': record['precision'],
+                'displayLines': [c.get('displayLine') for c in candidates],
+            })
+    return counts
+
+
+def cli_main(argv: list[str] | None = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m sanmiao.synthetic')
+    parser.add_argument('--dates', type=int, default=1000, help='number of date groups (default: 1000)')
+    parser.add_argument('--out', required=True, metavar='DIR', help='output directory')
+    parser.add_argument('--per-paragraph', type=int, default=4, help='date groups per paragraph (default: 4)')
+    parser.add_argument('--civ', default='c,j,k', help='civilisations (default: c,j,k)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tei', action='store_true', help='also write TEI (plain and pre-tagged)')
+    parser.add_argument('--mix', metavar='JSON', help='precision weights, e.g. \'{"gz": 3, "relative": 1}\'')
+    args = parser.parse_args(argv)
+
+    paragraphs = generate_corpus(
+        args.dates,
+        dates_per_paragraph=args.per_paragraph,
+        seed=args.seed,
+        civ=[c for c in args.civ.split(',') if c],
+        mix=json.loads(args.mix) if args.mix else None,
+    )
+    out = write_corpus(args.out, paragraphs, tei=args.tei)
+    print(f'{sum(len(p["dates"]) for p in paragraphs)} dates in {len(paragraphs)} paragraphs -> {out}')
+
+
+if __name__ == '__main__':
+    cli_main()
@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 from typing import Optional
 import lxml.etree as et
 from .loaders import (
@@ -9,6 +10,7 @@ from .ns import (
     child_local_names,
     detect_wrapper_namespace,
     find_child,
+    has_ancestor_date,
     is_tag,
     make_element,
     tag_in,
@@ -17,6 +19,7 @@ from .ns import (
 from .xml_utils import (
     strip_ws_in_text_nodes, clean_attributes, replace_in_text_and_tail
 )
+from .stages import stage_count
 
 SKIP = {"date","year","month","day","gz","sexYear","era","ruler","dyn","suffix","int","lp",
         "nmdgz","lp_filler","filler","season","gy","rel","meta","pb","text","body"}  # adjust tags you want to skip
@@ -99,6 +102,7 @@ def replace_in_text_and_tail(
         if not changed:
             break
         changed = False
+        stage_count('regexPasses')
         
         # Collect all elements to process in this pass
         # Use list() to create snapshot, but we'll re-scan if changes occur
@@ -449,6 +453,70 @@ def attach_suffixes(xml_root: et.Element) -> et.Element:
     return xml_root
 
 
+def _civ_key(civ) -> tuple:
+    """
+    Hashable, order-independent key for a civ argument (None means all civilisations).
+    """
+    if civ is None:
+        civ = ['c', 'j', 'k']
+    if isinstance(civ, str):
+        civ = [civ]
+    return tuple(sorted(civ))
+
+
+def _alternation(strings) -> Optional[re.Pattern]:
+    """
+    Compile a longest-first alternation of literal strings, or return None if there are none.
+    """
+    strings = [s for s in strings if isinstance(s, str) and s]
+    if not strings:
+        return None
+    strings.sort(key=len, reverse=True)
+    return re.compile("(" + "|".join(map(re.escape, strings)) + ")")
+
+
+@lru_cache(maxsize=32)
+def _tag_patterns(civ_key: tuple, fuzzy: bool) -> dict:
+    """
+    Compiled era, ruler and dynasty name patterns for tag_date_elements.
+
+    Built from the tag tables once per (civ, fuzzy) pair so repeated calls (batch and
+    server use) skip reloading the tables and rebuilding the alternations.
+    :param civ_key: tuple of civilisation codes, from _civ_key()
+    :param fuzzy: bool, use the simplified tag columns
+    :return: dict with 'era', 'era_prefix_ruler', 'ruler' and 'dyn' patterns (None when empty)
+    """
+    # Column names
+    if fuzzy:
+        era_tag_column = 'era_name_simp'
+        tag_column = 'string_simp'
+    else:
+        era_tag_column = 'era_name'
+        tag_column = 'string'
+    civ = list(civ_key)
+    era_tag_df = load_csv('era_table.csv')
+    # Filter era_tag_df by cal_stream
+    cal_streams = get_cal_streams_from_civ(civ)
+    if cal_streams is not None:
+        era_tag_df = era_tag_df[era_tag_df['cal_stream'].notna()]
+        # Convert cal_stream to float for comparison to avoid int/float mismatch
+        era_tag_df = era_tag_df[era_tag_df['cal_stream'].astype(float).isin(cal_streams)]
+    dyn_tag_df, ruler_tag_df = load_tag_tables(civ=civ)
+    # Split ruler tags into regular and era_prefix_only
+    if 'era_prefix_only' in ruler_tag_df.columns:
+        era_prefix_ruler_tags = ruler_tag_df[ruler_tag_df['era_prefix_only'] == True][tag_column].unique()
+        regular_ruler_tags = ruler_tag_df[ruler_tag_df['era_prefix_only'] != True][tag_column].unique()
+    else:
+        era_prefix_ruler_tags = []
+        regular_ruler_tags = ruler_tag_df[tag_column].unique()
+    return {
+        'era': _alternation(era_tag_df[era_tag_column].unique()),
+        'era_prefix_ruler': _alternation(era_prefix_ruler_tags),
+        'ruler': _alternation(regular_ruler_tags),
+        'dyn': _alternation(dyn_tag_df[tag_column].unique()),
+    }
+
+
 def tag_date_elements(text, civ=None, fuzzy=False):
     """
     Tag and clean Chinese string containing date with relevant elements for extraction. Each date element remains
@@ -460,14 +528,6 @@ def tag_date_elements(text, civ=None, fuzzy=False):
         when building dynasty, era, and ruler regex lists; if False, use traditional forms
     :return: str (XML)
     """
-    # Column names
-    if fuzzy:
-        era_tag_column = 'era_name_simp'
-        tag_column = 'string_simp'
-    else:
-        era_tag_column = 'era_name'
-        tag_column = 'string'
-    
     global _wrapper_ns
     # Test if input is XML, if not, wrap in <root> tags to make it XML
     try:
@@ -526,27 +586,8 @@ def tag_date_elements(text, civ=None, fuzzy=False):
     replace_in_text_and_tail(xml_root, REL_RE_MING, make_rel, skip_text_tags=SKIP_TEXT_ONLY, skip_all_tags=SKIP_ALL)
     replace_in_text_and_tail(xml_root, REL_RE_OTHER, make_rel, skip_text_tags=SKIP_TEXT_ONLY, skip_all_tags=SKIP_ALL)
 
-    # Retrieve tag tables
-    era_tag_df = load_csv('era_table.csv')
-    # Filter era_tag_df by cal_stream
-    cal_streams = get_cal_streams_from_civ(civ)
-    if cal_streams is not None:
-        era_tag_df = era_tag_df[era_tag_df['cal_stream'].notna()]
-        # Convert cal_stream to float for comparison to avoid int/float mismatch
-        era_tag_df = era_tag_df[era_tag_df['cal_stream'].astype(float).isin(cal_streams)]
-    dyn_tag_df, ruler_tag_df = load_tag_tables(civ=civ)
-    # Reduce to lists
-    era_tag_list = era_tag_df[era_tag_column].unique()
-    dyn_tag_list = dyn_tag_df[tag_column].unique()
-    
-    # Split ruler tags into regular and era_prefix_only
-    if 'era_prefix_only' in ruler_tag_df.columns:
-        era_prefix_ruler_tags = ruler_tag_df[ruler_tag_df['era_prefix_only'] == True][tag_column].unique()
-        regular_ruler_tags = ruler_tag_df[ruler_tag_df['era_prefix_only'] != True][tag_column].unique()
-    else:
-        era_prefix_ruler_tags = []
-        regular_ruler_tags = ruler_tag_df[tag_column].unique()
-    ruler_tag_list = list(regular_ruler_tags) + list(era_prefix_ruler_tags)  # Keep for backward compatibility
+    # Retrieve compiled tag patterns (built once per civ / fuzzy combination)
+    patterns = _tag_patterns(_civ_key(civ), fuzzy)
     # Normal dates #####################################################################################################
     # Tag 改元 first so later passes don't mis-tag the 元 inside it (e.g. as a dynasty).
     def make_gy(match):
@@ -562,11 +603,8 @@ def tag_date_elements(text, civ=None, fuzzy=False):
     # NM date
     xml_root = promote_nmdgz(xml_root)
     # Era names ########################################################################################################
-    # Reduce list
-    era_tag_list = [s for s in era_tag_list if isinstance(s, str) and s]
-    if era_tag_list:
-        era_tag_list.sort(key=len, reverse=True)
-        era_pattern = re.compile("(" + "|".join(map(re.escape, era_tag_list)) + ")")
+    era_pattern = patterns['era']
+    if era_pattern is not None:
 
         def make_era(match):
             d = _new_date()
@@ -642,86 +680,80 @@ def tag_date_elements(text, civ=None, fuzzy=False):
 
     # Ruler Names ######################################################################################################
     # First pass: Tag era_prefix_only ruler tags immediately before era elements
-    if len(era_prefix_ruler_tags) > 0:
-        era_prefix_ruler_list = [s for s in era_prefix_ruler_tags if isinstance(s, str) and s]
-        if era_prefix_ruler_list:
-            era_prefix_ruler_list.sort(key=len, reverse=True)
-            era_prefix_ruler_pattern = re.compile("(" + "|".join(map(re.escape, era_prefix_ruler_list)) + ")")
-
-            def make_ruler(match):
-                d = _new_date()
-                e = et.SubElement(d, "ruler")
-                e.text = match.group(1)
-                return d
-
-            def tag_era_prefix_rulers_before_eras(xml_root, pattern, make_element):
-                """Tag era_prefix_only ruler names that occur immediately before <date> elements containing eras."""
-                changed = True
-                max_passes = 10
-                for _ in range(max_passes):
-                    if not changed:
-                        break
-                    changed = False
-                    
-                    # Find all date elements that contain era elements
-                    date_elements_with_era = []
-                    for date_el in xpath_dates(xml_root):
-                        # Check if this date element contains an era
-                        if find_child(date_el, "era") is not None:
-                            # Skip if nested inside another date element
-                            parent = date_el.getparent()
-                            if parent is not None and is_tag(parent, "date"):
-                                continue
-                            date_elements_with_era.append(date_el)
-                    
-                    for date_el in date_elements_with_era:
+    era_prefix_ruler_pattern = patterns['era_prefix_ruler']
+    if era_prefix_ruler_pattern is not None:
+        def make_ruler(match):
+            d = _new_date()
+            e = et.SubElement(d, "ruler")
+            e.text = match.group(1)
+            return d
+
+        def tag_era_prefix_rulers_before_eras(xml_root, pattern, make_element):
+            """Tag era_prefix_only ruler names that occur immediately before <date> elements containing eras."""
+            changed = True
+            max_passes = 10
+            for _ in range(max_passes):
+                if not changed:
+                    break
+                changed = False
+                
+                # Find all date elements that contain era elements
+                date_elements_with_era = []
+                for date_el in xpath_dates(xml_root):
+                    # Check if this date element contains an era
+                    if find_child(date_el, "era") is not None:
+                        # Skip if nested inside another date element
                         parent = date_el.getparent()
-                        if parent is None:
+                        if parent is not None and is_tag(parent, "date"):
                             continue
-                        
-                        idx = parent.index(date_el)
-                        text_to_check = None
+                        date_elements_with_era.append(date_el)
+                
+                for date_el in date_elements_with_era:
+                    parent = date_el.getparent()
+                    if parent is None:
+                        continue
+                    
+                    idx = parent.index(date_el)
+                    text_to_check = None
+                    is_tail = False
+                    target_element = None
+                    
+                    # Check the tail of the previous sibling (if exists)
+                    if idx > 0:
+                        prev_sibling = parent[idx - 1]
+                        if prev_sibling.tail:
+                            text_to_check = prev_sibling.tail
+                            is_tail = True
+                            target_element = prev_sibling
+                    # Otherwise check parent's text before this date element
+                    elif parent.text:
+                        text_to_check = parent.text
                         is_tail = False
-                        target_element = None
-                        
-                        # Check the tail of the previous sibling (if exists)
-                        if idx > 0:
-                            prev_sibling = parent[idx - 1]
-                            if prev_sibling.tail:
-                                text_to_check = prev_sibling.tail
-                                is_tail = True
-                                target_element = prev_sibling
-                        # Otherwise check parent's text before this date element
-                        elif parent.text:
-                            text_to_check = parent.text
-                            is_tail = False
-                            target_element = parent
-                        
-                        if text_to_check:
-                            # Use regex to find all matches ending at the end of the text
-                            matches_at_end = [m for m in pattern.finditer(text_to_check) if m.end() == len(text_to_check)]
-                            if matches_at_end:
-                                # Take the longest match
-                                match = matches_at_end[0]
-                                new_el = make_element(match)
-                                
-                                if is_tail:
-                                    target_element.tail = text_to_check[:match.start()]
-                                    parent.insert(idx, new_el)
-                                else:
-                                    target_element.text = text_to_check[:match.start()]
-                                    parent.insert(0, new_el)
-                                changed = True
-                                # Break to restart iteration with updated structure
-                                break
-            
-            tag_era_prefix_rulers_before_eras(xml_root, era_prefix_ruler_pattern, make_ruler)
-    
+                        target_element = parent
+                    
+                    if text_to_check:
+                        # Use regex to find all matches ending at the end of the text
+                        matches_at_end = [m for m in pattern.finditer(text_to_check) if m.end() == len(text_to_check)]
+                        if matches_at_end:
+                            # Take the longest match
+                            match = matches_at_end[0]
+                            new_el = make_element(match)
+                            
+                            if is_tail:
+                                target_element.tail = text_to_check[:match.start()]
+                                parent.insert(idx, new_el)
+                            else:
+                                target_element.text = text_to_check[:match.start()]
+                                parent.insert(0, new_el)
+                            changed = True
+                            # Break to restart iteration with updated structure
+                            break
+        
+        tag_era_prefix_rulers_before_eras(xml_root, era_prefix_ruler_pattern, make_ruler)
+
     # Second pass: Tag regular ruler tags anywhere (exclude era_prefix_only tags)
-    regular_ruler_list = [s for s in regular_ruler_tags if isinstance(s, str) and s]
-    if regular_ruler_list:
-        regular_ruler_list.sort(key=len, reverse=True)
-        ruler_pattern = re.compile("(" + "|".join(map(re.escape, regular_ruler_list)) + ")")
+    ruler_pattern = patterns['ruler']
+    if ruler_pattern is not None:
 
         def make_ruler(match):
             d = _new_date()
@@ -732,11 +764,8 @@ def tag_date_elements(text, civ=None, fuzzy=False):
         replace_in_text_and_tail(xml_root, ruler_pattern, make_ruler, skip_text_tags=SKIP_TEXT_ONLY, skip_all_tags=SKIP_ALL)
         
     # Dynasty Names ####################################################################################################
-    # Reduce list
-    dyn_tag_list = [s for s in dyn_tag_list if isinstance(s, str) and s]
-    if dyn_tag_list:
-        dyn_tag_list.sort(key=len, reverse=True)
-        dyn_pattern = re.compile("(" + "|".join(map(re.escape, dyn_tag_list)) + ")")
+    dyn_pattern = patterns['dyn']
+    if dyn_pattern is not None:
 
         def make_dyn(match):
             d = _new_date()
@@ -853,7 +882,7 @@ def tag_date_elements(text, civ=None, fuzzy=False):
 
     for rel in list(xml_root.xpath(".//rel")):
         # Skip rel already inside a date
-        if rel.xpath("boolean(ancestor::*[local-name()=\"date\"])"):
+        if has_ancestor_date(rel):
             continue
 
         parent = rel.getparent()
@@ -8,24 +8,30 @@ need no TEI namespace; use extract_date_fragment() to read existing <date> nodes
 
 from __future__ import annotations
 
+import copy
+import hashlib
 import inspect
+import io
 import json
 import sys
 import time
+from collections import OrderedDict
 from typing import Any, Callable, Optional
 
 import lxml.etree as et
+import numpy as np
 import pandas as pd
 
 from .config import DEFAULT_GREGORIAN_START, DEFAULT_TAQ, DEFAULT_TPQ, normalize_defaults
 from .converters import jdn_to_iso
 from .loaders import load_normalisation_map, normalise_for_search, prepare_tables
-from .reporting import generate_report_from_dataframe
-from .date_authority import list_date_authority
+from .reporting import format_report_lines, generate_report_from_dataframe
+from .date_authority import date_authority_payload, search_authority
 from .tagging import consolidate_date, index_date_nodes, tag_date_elements
 from .xml_utils import remove_lone_tags, strip_text
 from .bulk_processing import extract_date_table_bulk, add_can_names_bulk
-from .ns import is_tag, strip_namespaces, xpath_dates
+from .ns import has_child, is_tag, localize_namespaces, strip_namespaces, xpath_dates
+from .stages import collect_stages, stage_time
 from .config import get_phrase_dic
 
 
@@ -86,6 +92,83 @@ def row_to_tei_attrs(
     return out
 
 
+_TEI_ID_KEYS = (
+    "era_id", "dyn_id", "ruler_id", "cal_stream",
+    "year", "month", "intercalary", "day", "gz", "nmd_gz", "lp",
+    "ind_year", "sex_year",
+)
+
+
+def _attr_strings(values) -> list[str | None]:
+    """row_to_tei_attrs' number formatting over a column (None where missing)."""
+    out = []
+    for val in values:
+        if val is None or (isinstance(val, float) and pd.isna(val)):
+            out.append(None)
+        else:
+            out.append(str(int(val)) if isinstance(val, (int, float)) and float(val).is_integer() else str(val))
+    return out
+
+
+def tei_attrs_frame(df: pd.DataFrame, *, pg: bool = False, gs: list | None = None) -> list[dict[str, str]]:
+    """
+    row_to_tei_attrs for every row of a dataframe, built column by column.
+    ISO conversions are computed once per distinct JDN.
+    """
+    gs, _ = normalize_defaults(gs, None)
+    n = len(df)
+    records = {c: df[c].tolist() for c in df.columns}
+    iso_cache: dict[float, str | None] = {}
+
+    def iso(jdn) -> str | None:
+        try:
+            key = float(jdn)
+        except (TypeError, ValueError):
+            return None
+        if key not in iso_cache:
+            try:
+                iso_cache[key] = jdn_to_iso(key, pg, gs)
+            except (TypeError, ValueError):
+                iso_cache[key] = None
+        return iso_cache[key]
+
+    def present(val) -> bool:
+        return val is not None and not (isinstance(val, float) and pd.isna(val))
+
+    columns = [(key, _attr_strings(records[key])) for key in _TEI_ID_KEYS if key in records]
+    dila = records.get("dila_id", [None] * n)
+    jdn = records.get("jdn", [None] * n)
+    iso_date = records.get("ISO_Date", [None] * n)
+    hui = records.get("hui_jdn")
+    end_alt = records.get("jdn_end", [None] * n)
+    nmd = records.get("nmd_jdn", [None] * n)
+
+    out = []
+    for i in range(n):
+        attrs = {key: values[i] for key, values in columns if values[i] is not None}
+        if present(dila[i]):
+            attrs["key"] = str(dila[i])
+        if present(jdn[i]):
+            attrs["jdn"] = str(jdn[i])
+            when = str(iso_date[i]) if present(iso_date[i]) else iso(jdn[i])
+            if when is not None:
+                attrs["when"] = when
+        # row.get("hui_jdn") or row.get("jdn_end"): a missing hui_jdn (NaN) still wins
+        end = (hui[i] if hui is not None else None) or end_alt[i]
+        if present(end):
+            if "jdn" in attrs:
+                attrs["jdnEnd"] = str(end)
+            not_after = iso(end)
+            if not_after is not None:
+                attrs["notAfter"] = not_after
+        if present(nmd[i]):
+            not_before = iso(nmd[i])
+            if not_before is not None:
+                attrs["notBefore"] = not_before
+        out.append(attrs)
+    return out
+
+
 def _collect_parse_inner_by_index(xml_root: et._Element) -> dict[int, str]:
     """Inner XML (sanmiao children) for each indexed <date>, keyed by date_index."""
     out: dict[int, str] = {}
@@ -153,6 +236,7 @@ def _inner_xml(date_el: et._Element) -> str:
 
 
 def _candidate_from_row(row: pd.Series, phrase_dic: dict, pg: bool, gs: list) -> dict[str, Any]:
+    """One candidate via the full report path; the per-row reference that _candidates_from_frame must match."""
     line_df = pd.DataFrame([row])
     try:
         report = generate_report_from_dataframe(line_df, phrase_dic, jd_out=False)
@@ -172,6 +256,91 @@ def _candidate_from_row(row: pd.Series, phrase_dic: dict, pg: bool, gs: list) ->
     }
 
 
+_RELATIVE_YEAR_DIRS = {"明", "來", "次", "去", "昨", "前", "後"}
+
+
+def _missing(val) -> bool:
+    return val is None or val is pd.NA or (isinstance(val, float) and pd.isna(val))
+
+
+def _display_line(line: str, err, date_string: str, phrase_dic: dict) -> str:
+    """
+    Last meaningful line of a one-row report (header, match line, error), as
+    generate_report_from_dataframe would print it; soft warnings are skipped.
+    """
+    if err is None:
+        err = ""
+    elif not isinstance(err, str):
+        # NaN/NA error_str breaks the report's string assembly; the old path fell back too
+        return date_string
+    lines = [f'{phrase_dic["ui"]}: {date_string}', f'{phrase_dic["matches"]}:']
+    if line:
+        lines.append(line)
+    lines.extend(ln.strip() for ln in err.splitlines() if ln.strip())
+    while lines and _is_soft_error_str(lines[-1]):
+        lines.pop()
+    return lines[-1] if lines else date_string
+
+
+def _candidates_from_frame(output_df: pd.DataFrame, phrase_dic: dict, pg: bool, gs: list) -> list[dict[str, Any]]:
+    """
+    Candidate dicts (displayLine, attrs, ids, error_str) for every row of output_df, in
+    row order. Equivalent to _candidate_from_row on each row, but the report lines and
+    TEI attrs are formatted column-wise in one pass.
+    """
+    df = output_df.reset_index(drop=True)
+    n = len(df)
+    if n == 0:
+        return []
+    report_lines = format_report_lines(df).fillna("").astype(str).tolist()
+    attrs = tei_attrs_frame(df, pg=pg, gs=gs)
+
+    def column(name):
+        return df[name].tolist() if name in df.columns else [None] * n
+
+    def ids(name):
+        values = df[name] if name in df.columns else pd.Series(np.nan, index=df.index)
+        return [None if pd.isna(v) else int(v) for v in values]
+
+    date_strings = ["" if v is None else str(v) for v in column("date_string")]
+    errors = column("error_str")
+    era_ids, dyn_ids = ids("era_id"), ids("dyn_id")
+    resolved = np.zeros(n, dtype=bool)
+    for name in ("dyn_id", "ruler_id", "era_id"):
+        if name in df.columns:
+            resolved |= df[name].notna().to_numpy()
+    too_many = phrase_dic["too-many-cand"]
+    if "rel_dir" in df.columns and "rel_unit" in df.columns:
+        rel_dir = df["rel_dir"].astype("string").str.strip()
+        rel_unit = df["rel_unit"].astype("string").str.strip()
+        relative = (rel_unit.isin(["年", "歲"]) & rel_dir.isin(list(_RELATIVE_YEAR_DIRS))).fillna(False).to_numpy()
+    else:
+        relative = np.zeros(n, dtype=bool)
+
+    out = []
+    for i in range(n):
+        err = errors[i]
+        ds = date_strings[i]
+        if isinstance(err, str) and too_many in err:
+            display = _display_line("", err, ds, phrase_dic)
+        elif not resolved[i]:
+            display = phrase_dic["insuff-data"]
+        else:
+            if relative[i]:
+                err = "" if _missing(err) else err
+                if "relative date" not in err:
+                    err += "relative date"
+            display = _display_line(report_lines[i], err, ds, phrase_dic)
+        out.append({
+            "displayLine": display,
+            "attrs": attrs[i],
+            "era_id": era_ids[i],
+            "dyn_id": dyn_ids[i],
+            "error_str": None if _missing(errors[i]) else str(errors[i]),
+        })
+    return out
+
+
 # Informational solve notes — must not mark an otherwise unique row unresolved.
 _SOFT_ERROR_MARKERS = ("relative date",)
 
@@ -215,11 +384,13 @@ def propose_dates_from_xml_root(
     original_text: str | None = None,
     normalized_text: str | None = None,
     implied=None,
+    isolate_dates: bool = False,
 ) -> tuple[list[dict[str, Any]], dict | None]:
     """Tag + solve on an lxml root (plain <root> or TEI subtree).
 
     Returns (proposals, implied). Pass implied from a prior chunk to preserve
-    sequential context across paragraph boundaries.
+    sequential context across paragraph boundaries. ``isolate_dates`` solves each
+    date as if it were its own chunk (see extract_date_table_bulk).
     """
     gs, civ = normalize_defaults(gs, civ)
     phrase_dic = get_phrase_dic(lang or "en")
@@ -243,7 +414,9 @@ def propose_dates_from_xml_root(
         attributes=attributes,
         original_text=original_text,
         normalized_text=normalized_text,
+        isolate_dates=isolate_dates,
     )
+    t_report = time.perf_counter()
 
     if tables is None:
         tables = prepare_tables(civ=civ)
@@ -254,6 +427,8 @@ def propose_dates_from_xml_root(
     if output_df.empty or "date_index" not in output_df.columns:
         return [], implied
 
+    output_df = output_df.reset_index(drop=True)
+    candidates = _candidates_from_frame(output_df, phrase_dic, pg, gs)
     proposals = []
     for date_index, group in output_df.groupby("date_index", sort=True):
         status = _status_for_group(group)
@@ -262,7 +437,7 @@ def propose_dates_from_xml_root(
             "date_index": int(date_index),
             "date_string": str(first.get("date_string", "")),
             "status": status,
-            "candidates": [_candidate_from_row(r, phrase_dic, pg, gs) for _, r in group.iterrows()],
+            "candidates": [candidates[i] for i in group.index],
         }
         if status == "unique" and proposal["candidates"]:
             proposal["attrs"] = proposal["candidates"][0]["attrs"]
@@ -273,6 +448,7 @@ def propose_dates_from_xml_root(
             proposal["parseInnerXml"] = restore_original_markup(inner, norm_ds, orig_ds)
         proposals.append(proposal)
 
+    stage_time("report", t_report)
     return proposals, implied
 
 
@@ -298,6 +474,191 @@ def propose_dates(
                                fuzzy=fuzzy, tpq=tpq, taq=taq, pg=pg, gs=gs, lang=lang)[0]
 
 
+def _propose_chunk(
+    text: str,
+    implied,
+    *,
+    tables,
+    char_map,
+    civ,
+    sequential: bool,
+    proliferate: bool,
+    fuzzy: bool,
+    tpq: int,
+    taq: int,
+    pg: bool,
+    gs: list,
+    lang: str,
+) -> tuple[list[dict[str, Any]] | None, Any]:
+    """
+    Tag + solve one paragraph. Returns (proposals, implied); proposals is None for a
+    blank chunk, which leaves implied untouched.
+    """
+    if not text or not str(text).strip():
+        return None, implied
+
+    original = str(text).replace(" ", "")
+    work = original
+    if fuzzy and char_map is not None:
+        work = normalise_for_search(work, char_map)
+
+    t_stage = time.perf_counter()
+    xml_string = tag_date_elements(work, civ=civ, fuzzy=fuzzy)
+    t_stage = stage_time("tag", t_stage)
+    xml_string = consolidate_date(xml_string)
+    xml_root = remove_lone_tags(xml_string)
+    xml_root = strip_text(xml_root)
+    stage_time("consolidate", t_stage)
+
+    return propose_dates_from_xml_root(
+        xml_root,
+        civ=civ,
+        sequential=sequential,
+        proliferate=proliferate,
+        fuzzy=fuzzy,
+        tpq=tpq,
+        taq=taq,
+        pg=pg,
+        gs=gs,
+        lang=lang,
+        tables=tables,
+        original_text=original if fuzzy else None,
+        normalized_text=work if fuzzy else None,
+        implied=implied if sequential else None,
+    )
+
+
+# Per-process tables for pool workers, keyed by (civ, fuzzy)
+_WORKER_TABLES: dict[tuple, tuple] = {}
+
+
+def _propose_segment(chunks: list[str], opts: dict[str, Any], stage_timings: bool = False) -> list[tuple]:
+    """
+    Pool worker: run a run of chunks serially from a fresh implied state.
+    Returns one (proposals, implied, ms, stages) tuple per chunk; stages is None
+    unless stage_timings is set.
+    """
+    key = (tuple(opts["civ"]), opts["fuzzy"])
+    if key not in _WORKER_TABLES:
+        _WORKER_TABLES[key] = (
+            prepare_tables(civ=opts["civ"]),
+            load_normalisation_map() if opts["fuzzy"] else None,
+        )
+    tables, char_map = _WORKER_TABLES[key]
+    out = []
+    implied = None
+    for text in chunks:
+        t0 = time.perf_counter()
+        with collect_stages(stage_timings) as stats:
+            proposals, implied = _propose_chunk(text, implied, tables=tables, char_map=char_map, **opts)
+        stages = stats.as_event() if stats is not None else None
+        # extract_date_table_bulk updates implied in place while solving the next chunk
+        out.append((proposals, copy.deepcopy(implied), round((time.perf_counter() - t0) * 1000), stages))
+    return out
+
+
+def _same(a: Any, b: Any) -> bool:
+    """Structural equality for proposals / implied state (NaN equals NaN)."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) and isinstance(b, float) and a != a and b != b:
+        return True
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+
+def _opens_with_anchor(text: str, *, civ, fuzzy: bool, char_map) -> bool:
+    """
+    True if the chunk's first date names a dynasty, ruler or era together with a year,
+    i.e. it is likely to re-anchor implied state on its own.
+    """
+    if not text or not str(text).strip():
+        return False
+    work = str(text).replace(" ", "")
+    if fuzzy and char_map is not None:
+        work = normalise_for_search(work, char_map)
+    root = et.fromstring(consolidate_date(tag_date_elements(work, civ=civ, fuzzy=fuzzy)).encode("utf-8"))
+    dates = xpath_dates(root)
+    if not dates:
+        return False
+    first = dates[0]
+    return (has_child(first, "year") and not has_child(first, "rel")
+            and any(has_child(first, name) for name in ("dyn", "ruler", "era")))
+
+
+def _segment_starts(chunks: list[str], workers: int, sequential: bool, *, civ, fuzzy: bool, char_map) -> list[int]:
+    """
+    Chunk indexes where parallel segments begin. Without sequential state any index will do;
+    with it, segments only start at chunks that open with an anchoring date.
+    """
+    total = len(chunks)
+    target = max(1, -(-total // (workers * 2)))
+    if not sequential:
+        return list(range(0, total, target))
+    starts = [0]
+    for index in range(1, total):
+        if index - starts[-1] >= target and _opens_with_anchor(chunks[index], civ=civ, fuzzy=fuzzy, char_map=char_map):
+            starts.append(index)
+    return starts
+
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serialisable")
+
+
+class ProposalCache:
+    """
+    Session-scoped memo for propose_dates_batch, for editors that resubmit a whole
+    document after each edit.
+
+    Entries are keyed on (chunk text hash, incoming implied state, options), so an
+    unchanged chunk is reused only when the state flowing into it is also unchanged.
+    After an edited paragraph the state usually converges again within a chunk or two,
+    and from there on every chunk is a hit.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+    @staticmethod
+    def key(text: str, implied: Any, opts: dict[str, Any]) -> tuple:
+        digest = hashlib.sha1(str(text or "").encode("utf-8")).hexdigest()
+        state = json.dumps(implied, sort_keys=True, default=_json_default)
+        options = json.dumps(opts, sort_keys=True, default=_json_default)
+        return digest, state, options
+
+    def get(self, key: tuple) -> tuple | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return copy.deepcopy(entry)
+
+    def put(self, key: tuple, proposals: list | None, implied: Any) -> None:
+        self._entries[key] = copy.deepcopy((proposals, implied))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 def propose_dates_batch(
     chunks: list[str],
     *,
@@ -311,12 +672,28 @@ def propose_dates_batch(
     gs: list | None = None,
     lang: str = "en",
     on_chunk: Optional[Callable[[dict[str, Any]], None]] = None,
+    workers: int = 1,
+    cache: ProposalCache | None = None,
+    stage_timings: bool = False,
 ) -> list[list[dict[str, Any]]]:
     """
     Tag + solve multiple text fragments in one call (loads lookup tables once).
 
     Sequential implied state carries from each chunk to the next when sequential=True.
     Optional on_chunk(event) fires after each paragraph with timing stats.
+
+    With workers > 1 the chunks are spread over a process pool. In sequential mode the
+    batch is only split where a chunk opens with an anchoring date (dynasty/ruler/era
+    plus year); each segment's first chunk is then re-checked against the real incoming
+    state and the segment is redone serially if it differs, so results always match
+    the serial run.
+
+    Pass a ProposalCache to reuse results for chunks whose text and incoming implied
+    state are unchanged since an earlier call.
+
+    With stage_timings=True each chunk event also carries ``stageMs`` (tag, consolidate,
+    extract, resolve, candidates, solve, report) and ``counts`` (regexPasses, dateNodes,
+    rowsResolved, candidateRows, candidateRowsMax, rowsSolved); cache hits carry neither.
     """
     if gs is None:
         gs = DEFAULT_GREGORIAN_START
@@ -330,6 +707,8 @@ def propose_dates_batch(
     results: list[list[dict[str, Any]]] = []
     implied = None
     total = len(chunks)
+    opts = dict(civ=civ, sequential=sequential, proliferate=proliferate, fuzzy=fuzzy,
+                tpq=tpq, taq=taq, pg=pg, gs=gs, lang=lang)
 
     if on_chunk:
         on_chunk({
@@ -338,65 +717,72 @@ def propose_dates_batch(
             "tablesMs": tables_ms,
         })
 
-    for index, text in enumerate(chunks):
-        t0 = time.perf_counter()
-        chars = len(text or "")
-
-        if not text or not str(text).strip():
-            results.append([])
-            if on_chunk:
-                on_chunk({
-                    "type": "chunk",
-                    "index": index,
-                    "done": index + 1,
-                    "total": total,
-                    "ms": round((time.perf_counter() - t0) * 1000),
-                    "chars": chars,
-                    "proposals": 0,
-                    "skipped": True,
-                })
-            continue
-
-        original = str(text).replace(" ", "")
-        work = original
-        if fuzzy and char_map is not None:
-            work = normalise_for_search(work, char_map)
-
-        xml_string = tag_date_elements(work, civ=civ, fuzzy=fuzzy)
-        xml_string = consolidate_date(xml_string)
-        xml_root = remove_lone_tags(xml_string)
-        xml_root = strip_text(xml_root)
-
-        proposals, implied = propose_dates_from_xml_root(
-            xml_root,
-            civ=civ,
-            sequential=sequential,
-            proliferate=proliferate,
-            fuzzy=fuzzy,
-            tpq=tpq,
-            taq=taq,
-            pg=pg,
-            gs=gs,
-            lang=lang,
-            tables=tables,
-            original_text=original if fuzzy else None,
-            normalized_text=work if fuzzy else None,
-            implied=implied if sequential else None,
-        )
-        results.append(proposals)
-
+    def report(index: int, proposals: list | None, ms: int, cached: bool = False, stages: dict | None = None) -> None:
         if on_chunk:
-            on_chunk({
+            event = {
                 "type": "chunk",
                 "index": index,
                 "done": index + 1,
                 "total": total,
-                "ms": round((time.perf_counter() - t0) * 1000),
-                "chars": chars,
-                "proposals": len(proposals),
-                "skipped": False,
-            })
-
+                "ms": ms,
+                "chars": len(chunks[index] or ""),
+                "proposals": len(proposals or []),
+                "skipped": proposals is None,
+            }
+            if cache is not None:
+                event["cached"] = cached
+            if stages is not None:
+                event.update(stages)
+            on_chunk(event)
+
+    def run_serial(index: int, implied):
+        t0 = time.perf_counter()
+        key = cache.key(chunks[index], implied if sequential else None, opts) if cache is not None else None
+        hit = cache.get(key) if key is not None else None
+        stats = None
+        if hit is not None:
+            proposals, implied = hit
+        else:
+            with collect_stages(stage_timings) as stats:
+                proposals, implied = _propose_chunk(chunks[index], implied, tables=tables, char_map=char_map, **opts)
+            if key is not None:
+                cache.put(key, proposals, implied)
+        results.append(proposals or [])
+        report(index, proposals, round((time.perf_counter() - t0) * 1000), cached=hit is not None,
+               stages=stats.as_event() if stats is not None else None)
+        return proposals, implied
+
+    starts = _segment_starts(chunks, workers, sequential, civ=civ, fuzzy=fuzzy, char_map=char_map) if workers > 1 and total > 1 else [0]
+    if len(starts) < 2:
+        for index in range(total):
+            _, implied = run_serial(index, implied)
+        return results
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    bounds = list(zip(starts, starts[1:] + [total]))
+    with ProcessPoolExecutor(max_workers=min(workers, len(bounds))) as pool:
+        futures = [pool.submit(_propose_segment, chunks[lo:hi], opts, stage_timings) for lo, hi in bounds]
+        for seg, (lo, hi) in enumerate(bounds):
+            segment = futures[seg].result()
+            if seg > 0 and sequential:
+                # The worker started from a fresh state; accept it only if the first chunk
+                # comes out the same under the real incoming state
+                proposals, checked = run_serial(lo, implied)
+                if not (_same(proposals, segment[0][0]) and _same(checked, segment[0][1])):
+                    implied = checked
+                    for index in range(lo + 1, hi):
+                        _, implied = run_serial(index, implied)
+                    continue
+                implied = checked
+                segment = segment[1:]
+                lo += 1
+            for offset, (proposals, implied_out, ms, stages) in enumerate(segment):
+                if cache is not None:
+                    cache.put(cache.key(chunks[lo + offset], implied if sequential else None, opts), proposals, implied_out)
+                implied = implied_out
+                results.append(proposals or [])
+                report(lo + offset, proposals, ms, stages=stages)
     return results
 
 
@@ -463,11 +849,14 @@ def tag_dates_batch(
     fuzzy: bool = True,
     lang: str = "en",
     on_chunk: Optional[Callable[[dict[str, Any]], None]] = None,
+    stage_timings: bool = False,
 ) -> list[list[dict[str, Any]]]:
     """
     Tag-only pass: find date spans and parse structure, no calendar solve.
 
     Returns proposals with status ``tagged``, parseInnerXml set, empty candidates.
+    With stage_timings=True chunk events carry ``stageMs`` (tag, consolidate, report)
+    and ``counts`` (regexPasses).
     """
     if civ is None:
         civ = ["c", "j", "k"]
@@ -503,21 +892,26 @@ def tag_dates_batch(
         if fuzzy and char_map is not None:
             work = normalise_for_search(work, char_map)
 
-        xml_string = tag_date_elements(work, civ=civ, fuzzy=fuzzy)
-        xml_string = consolidate_date(xml_string)
-        xml_root = remove_lone_tags(xml_string)
-        xml_root = strip_text(xml_root)
-
-        proposals = _tag_proposals_from_root(
-            xml_root,
-            original_text=original if fuzzy else None,
-            normalized_text=work if fuzzy else None,
-            fuzzy=fuzzy,
-        )
+        with collect_stages(stage_timings) as stats:
+            t_stage = time.perf_counter()
+            xml_string = tag_date_elements(work, civ=civ, fuzzy=fuzzy)
+            t_stage = stage_time("tag", t_stage)
+            xml_string = consolidate_date(xml_string)
+            xml_root = remove_lone_tags(xml_string)
+            xml_root = strip_text(xml_root)
+            t_stage = stage_time("consolidate", t_stage)
+
+            proposals = _tag_proposals_from_root(
+                xml_root,
+                original_text=original if fuzzy else None,
+                normalized_text=work if fuzzy else None,
+                fuzzy=fuzzy,
+            )
+            stage_time("report", t_stage)
         results.append(proposals)
 
         if on_chunk:
-            on_chunk({
+            event = {
                 "type": "chunk",
                 "index": index,
                 "done": index + 1,
@@ -526,7 +920,10 @@ def tag_dates_batch(
                 "chars": chars,
                 "proposals": len(proposals),
                 "skipped": False,
-            })
+            }
+            if stats is not None:
+                event.update(stats.as_event())
+            on_chunk(event)
 
     return results
 
@@ -544,12 +941,21 @@ def resolve_dates_batch(
     gs: list | None = None,
     lang: str = "en",
     on_progress: Optional[Callable[[dict[str, Any]], None]] = None,
+    one_pass: bool = False,
+    stage_timings: bool = False,
 ) -> list[dict[str, Any] | None]:
     """
     Resolve existing ``<date>`` XML strings in document order.
 
     Returns one proposal dict per input element (or ``None`` when unsolved).
     Sequential implied state carries forward when ``sequential=True``.
+
+    With ``one_pass=True`` all elements are parsed into a single indexed ``<root>`` and
+    ID resolution and candidate generation run once for the whole batch; only the final
+    solving loop walks the dates in order, with the same per-element semantics.
+
+    With stage_timings=True progress events carry ``stageMs`` and ``counts`` as in
+    propose_dates_batch (in one-pass mode, on the last event, for the whole batch).
     """
     if gs is None:
         gs = DEFAULT_GREGORIAN_START
@@ -566,6 +972,23 @@ def resolve_dates_batch(
     if on_progress:
         on_progress({"type": "init", "total": total, "tablesMs": tables_ms})
 
+    if one_pass:
+        return _resolve_dates_one_pass(
+            date_elements,
+            civ=civ,
+            sequential=sequential,
+            proliferate=proliferate,
+            fuzzy=fuzzy,
+            tpq=tpq,
+            taq=taq,
+            pg=pg,
+            gs=gs,
+            lang=lang,
+            tables=tables,
+            on_progress=on_progress,
+            stage_timings=stage_timings,
+        )
+
     for index, date_xml in enumerate(date_elements):
         t0 = time.perf_counter()
         if not date_xml or not str(date_xml).strip():
@@ -583,25 +1006,28 @@ def resolve_dates_batch(
                 })
             continue
 
-        frag = extract_date_fragment(date_xml)
-        proposals, implied = propose_dates_from_xml_root(
-            frag,
-            civ=civ,
-            sequential=sequential,
-            proliferate=proliferate,
-            fuzzy=fuzzy,
-            tpq=tpq,
-            taq=taq,
-            pg=pg,
-            gs=gs,
-            lang=lang,
-            tables=tables,
-            implied=implied if sequential else None,
-        )
+        with collect_stages(stage_timings) as stats:
+            t_stage = time.perf_counter()
+            frag = extract_date_fragment(date_xml)
+            stage_time("parse", t_stage)
+            proposals, implied = propose_dates_from_xml_root(
+                frag,
+                civ=civ,
+                sequential=sequential,
+                proliferate=proliferate,
+                fuzzy=fuzzy,
+                tpq=tpq,
+                taq=taq,
+                pg=pg,
+                gs=gs,
+                lang=lang,
+                tables=tables,
+                implied=implied if sequential else None,
+            )
         results.append(proposals[0] if proposals else None)
 
         if on_progress:
-            on_progress({
+            event = {
                 "type": "chunk",
                 "index": index,
                 "done": index + 1,
@@ -610,23 +1036,97 @@ def resolve_dates_batch(
                 "chars": len(str(date_xml)),
                 "proposals": 1 if proposals else 0,
                 "skipped": False,
-            })
+            }
+            if stats is not None:
+                event.update(stats.as_event())
+            on_progress(event)
 
     return results
 
 
+def _dates_root(date_elements: list[str]) -> tuple[et._Element, list[int]]:
+    """
+    Parse non-empty ``<date>`` strings into one namespace-free ``<root>``.
+
+    Returns the root and, for each of its children, the position of the input it came from.
+    The strings are parsed in a single call; if that fails (e.g. one carries an XML
+    declaration) each is parsed on its own so the error points at the bad element.
+    """
+    positions = [i for i, d in enumerate(date_elements) if d and str(d).strip()]
+    try:
+        root = et.fromstring(("<root>" + "".join(str(date_elements[i]) for i in positions) + "</root>").encode("utf-8"))
+        if len(root) != len(positions):
+            raise ValueError("date strings do not map one-to-one onto elements")
+    except (et.XMLSyntaxError, ValueError):
+        root = et.Element("root")
+        for i in positions:
+            root.append(et.fromstring(str(date_elements[i]).encode("utf-8")))
+    localize_namespaces(root)
+    for child in root:
+        if not is_tag(child, "date"):
+            raise ValueError("expected a <date> element")
+    return root, positions
+
+
+def _resolve_dates_one_pass(
+    date_elements: list[str],
+    *,
+    on_progress: Optional[Callable[[dict[str, Any]], None]],
+    stage_timings: bool = False,
+    **opts,
+) -> list[dict[str, Any] | None]:
+    """resolve_dates_batch(one_pass=True): one bulk pipeline run over all elements."""
+    t0 = time.perf_counter()
+    total = len(date_elements)
+    proposals = []
+    with collect_stages(stage_timings) as stats:
+        root, positions = _dates_root(date_elements)
+        stage_time("parse", t0)
+        if positions:
+            proposals, _implied = propose_dates_from_xml_root(root, isolate_dates=True, **opts)
+    # index_date_nodes numbers the children 0..n-1 in order, so date_index is a child position
+    by_index = {p["date_index"]: p for p in proposals}
+    results: list[dict[str, Any] | None] = [None] * total
+    for k, pos in enumerate(positions):
+        results[pos] = by_index.get(k)
+
+    if on_progress:
+        ms = round((time.perf_counter() - t0) * 1000)
+        for index, date_xml in enumerate(date_elements):
+            skipped = not date_xml or not str(date_xml).strip()
+            event = {
+                "type": "chunk",
+                "index": index,
+                "done": index + 1,
+                "total": total,
+                "ms": ms if index == total - 1 else 0,
+                "chars": 0 if skipped else len(str(date_xml)),
+                "proposals": 0 if results[index] is None else 1,
+                "skipped": skipped,
+            }
+            if stats is not None and index == total - 1:
+                event.update(stats.as_event())
+            on_progress(event)
+    return results
+
+
 def extract_date_fragment(date_element: et._Element | str) -> et._Element:
     """
     Wrap a TEI (or sanmiao) <date> element in <root> for re-resolution.
     Strips namespaces so internal sanmiao paths match legacy behaviour.
+
+    A string is parsed and normalised in place; an element is copied first (without its
+    tail), so the document it belongs to is left untouched.
     """
     if isinstance(date_element, str):
         date_element = et.fromstring(date_element.encode("utf-8"))
+        localize_namespaces(date_element)
+    else:
+        date_element = strip_namespaces(date_element)
     if not is_tag(date_element, "date"):
         raise ValueError("expected a <date> element")
     frag = et.Element("root")
-    inner = strip_namespaces(date_element)
-    frag.append(inner)
+    frag.append(date_element)
     return frag
 
 
@@ -652,67 +1152,276 @@ def _kwargs_for(fn, opts: dict[str, Any]) -> dict[str, Any]:
     return {k: v for k, v in opts.items() if k in allowed}
 
 
-def cli_main() -> None:
+class _RawJSON:
+    """Already-serialised JSON, spliced verbatim into responses by _dumps."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+def _dumps(obj: Any) -> str:
+    if isinstance(obj, _RawJSON):
+        return obj.text
+    if isinstance(obj, dict) and any(isinstance(v, _RawJSON) for v in obj.values()):
+        return "{" + ", ".join(f"{json.dumps(k)}: {_dumps(v)}" for k, v in obj.items()) + "}"
+    return json.dumps(obj, ensure_ascii=False)
+
+
+# Server-side ProposalCache per editor session (requests carrying "session": "<name>"),
+# least recently used sessions dropped beyond _MAX_SESSIONS
+_MAX_SESSIONS = 32
+_SESSIONS: "OrderedDict[str, ProposalCache]" = OrderedDict()
+
+
+def _session_cache(name: str) -> ProposalCache:
+    cache = _SESSIONS.get(name)
+    if cache is None:
+        cache = _SESSIONS[name] = ProposalCache()
+    _SESSIONS.move_to_end(name)
+    while len(_SESSIONS) > _MAX_SESSIONS:
+        _SESSIONS.popitem(last=False)
+    return cache
+
+
+def handle_request(
+    req: dict[str, Any],
+    emit: Optional[Callable[[dict[str, Any]], None]] = None,
+) -> Any:
     """
-    Read JSON from stdin, write proposals JSON to stdout.
+    Answer one CLI request (see cli_main for the request shapes).
 
-    Request shape::
-        {"text": "...", "civ": ["c","j","k"], ...}
-        {"chunks": ["para1", "para2", ...], "civ": ["c"], ...}
-        {"mode": "tag", "chunks": [...], ...}  — tag-only (parse, no solve)
-        {"mode": "resolve", "dates": ["<date>...</date>", ...], ...}
-        {"mode": "authority", "civ": ["c","j","k"], ...}  — lookup lists for UI pickers
-        {"chunks": [...], "stream": true, ...}  — NDJSON progress lines, then result
+    Streaming requests send their progress events to ``emit`` and return the final
+    ``{"type": "result", "results": ...}`` event; other requests return the payload.
+    Authority payloads come back as pre-serialised JSON (write them with _dumps), or
+    as ``{"notModified": true, "etag": ...}`` when ``ifNoneMatch`` matches.
     """
-    req = json.load(sys.stdin)
-    opts = {k: v for k, v in req.items() if k not in ("text", "chunks", "dates", "stream", "mode")}
+    opts = {k: v for k, v in req.items() if k not in ("text", "chunks", "dates", "stream", "mode", "id", "session", "timings")}
+    if req.get("timings"):
+        opts["stage_timings"] = True
     mode = req.get("mode", "propose")
 
     if mode == "authority":
-        json.dump(list_date_authority(civ=opts.get("civ")), sys.stdout, ensure_ascii=False)
-        return
+        payload = date_authority_payload(civ=opts.get("civ"))
+        if req.get("ifNoneMatch") == payload["etag"]:
+            return {"notModified": True, "etag": payload["etag"]}
+        return _RawJSON(payload["json"].decode("utf-8"))
+    if mode == "search":
+        return search_authority(
+            req.get("query", ""),
+            civ=opts.get("civ"),
+            kind=opts.get("kind"),
+            limit=int(opts.get("limit", 20)),
+        )
     chunks = req.get("chunks")
     stream = bool(req.get("stream"))
 
     if mode == "tag" and chunks is not None:
         tag_opts = _kwargs_for(tag_dates_batch, opts)
         if stream:
-            def emit(event: dict[str, Any]) -> None:
-                print(json.dumps(event, ensure_ascii=False), flush=True)
-
-            results = tag_dates_batch(chunks, on_chunk=emit, **tag_opts)
-            print(json.dumps({"type": "result", "results": results}, ensure_ascii=False), flush=True)
-            return
-        json.dump(tag_dates_batch(chunks, **tag_opts), sys.stdout, ensure_ascii=False)
-        return
+            return {"type": "result", "results": tag_dates_batch(chunks, on_chunk=emit, **tag_opts)}
+        return tag_dates_batch(chunks, **tag_opts)
 
     if mode == "resolve":
         dates = req.get("dates") or []
         resolve_opts = _kwargs_for(resolve_dates_batch, opts)
         if stream:
-            def emit_resolve(event: dict[str, Any]) -> None:
-                print(json.dumps(event, ensure_ascii=False), flush=True)
-
-            results = resolve_dates_batch(dates, on_progress=emit_resolve, **resolve_opts)
-            print(json.dumps({"type": "result", "results": results}, ensure_ascii=False), flush=True)
-            return
-        json.dump(resolve_dates_batch(dates, **resolve_opts), sys.stdout, ensure_ascii=False)
-        return
+            return {"type": "result", "results": resolve_dates_batch(dates, on_progress=emit, **resolve_opts)}
+        return resolve_dates_batch(dates, **resolve_opts)
 
     if chunks is not None:
         propose_opts = _kwargs_for(propose_dates_batch, opts)
+        if req.get("session") is not None:
+            propose_opts["cache"] = _session_cache(str(req["session"]))
         if stream:
+            return {"type": "result", "results": propose_dates_batch(chunks, on_chunk=emit, **propose_opts)}
+        return propose_dates_batch(chunks, **propose_opts)
+    text = req.get("text", "")
+    return propose_dates(text, **_kwargs_for(propose_dates, opts))
+
+
+def _is_stream_request(req: dict[str, Any]) -> bool:
+    mode = req.get("mode", "propose")
+    if mode in ("authority", "search") or not req.get("stream"):
+        return False
+    return mode == "resolve" or req.get("chunks") is not None
+
+
+def warm_up(civ: list | str | None = None, fuzzy: bool = True) -> int:
+    """
+    Load calendar tables, the normalisation map and compiled tag patterns ahead of the
+    first request. Returns the time taken in ms.
+    """
+    t0 = time.perf_counter()
+    prepare_tables(civ=civ)
+    load_normalisation_map()
+    tag_date_elements("元年", civ=civ, fuzzy=fuzzy)
+    return round((time.perf_counter() - t0) * 1000)
+
+
+def serve_ndjson(infile, outfile, defaults: dict[str, Any] | None = None) -> None:
+    """
+    Serve requests as NDJSON: one JSON request per input line, answered with one or more
+    JSON lines. Every answer ends with a ``result`` (or ``error``) line; streaming requests
+    emit their progress events first. A request ``id`` is echoed on every line it produces.
+    ``defaults`` are merged under every request (e.g. ``{"timings": True}``).
+    """
+    def write(event: dict[str, Any]) -> None:
+        outfile.write(_dumps(event) + "\n")
+        outfile.flush()
+
+    for line in infile:
+        line = line.strip()
+        if not line:
+            continue
+        req_id = None
+        try:
+            req = json.loads(line)
+            if not isinstance(req, dict):
+                raise ValueError("request must be a JSON object")
+            req = {**(defaults or {}), **req}
+            req_id = req.get("id")
+
             def emit(event: dict[str, Any]) -> None:
-                print(json.dumps(event, ensure_ascii=False), flush=True)
+                write({**event, "id": req_id} if req_id is not None else event)
+
+            answer = handle_request(req, emit=emit)
+            if not _is_stream_request(req):
+                answer = {"type": "result", "results": answer}
+            emit(answer)
+        except Exception as e:  # keep serving after a bad request
+            error = {"type": "error", "error": f"{type(e).__name__}: {e}"}
+            write({**error, "id": req_id} if req_id is not None else error)
+
+
+def _serve_unix_socket(path: str, defaults: dict[str, Any] | None = None) -> None:
+    import os
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            infile = io.TextIOWrapper(self.rfile, encoding="utf-8")
+            outfile = io.TextIOWrapper(self.wfile, encoding="utf-8", write_through=True)
+            serve_ndjson(infile, outfile, defaults)
+
+    if os.path.exists(path):
+        os.unlink(path)
+    with socketserver.UnixStreamServer(path, Handler) as server:
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(path)
+
+
+def _serve_http(host: str, port: int, defaults: dict[str, Any] | None = None) -> None:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            # GET /authority?civ=c,j : cached payload with ETag / If-None-Match and gzip
+            url = urlparse(self.path)
+            if url.path.rstrip("/") != "/authority":
+                self.send_error(404)
+                return
+            civ = [c for c in parse_qs(url.query).get("civ", ["c,j,k"])[0].split(",") if c]
+            payload = date_authority_payload(civ=civ)
+            etag = f'"{payload["etag"]}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            use_gzip = "gzip" in (self.headers.get("Accept-Encoding") or "")
+            body = payload["gzip"] if use_gzip else payload["json"]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            if use_gzip:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length).decode("utf-8")
+            try:
+                # A single (possibly pretty-printed) request; otherwise treat the body as NDJSON
+                body = json.dumps(json.loads(body), ensure_ascii=False)
+            except ValueError:
+                pass
+            out = io.StringIO()
+            serve_ndjson(io.StringIO(body + "\n"), out, defaults)
+            payload = out.getvalue().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    with HTTPServer((host, port), Handler) as server:
+        server.serve_forever()
 
-            results = propose_dates_batch(chunks, on_chunk=emit, **propose_opts)
-            print(json.dumps({"type": "result", "results": results}, ensure_ascii=False), flush=True)
-            return
-        json.dump(propose_dates_batch(chunks, **propose_opts), sys.stdout, ensure_ascii=False)
+
+def cli_main(argv: list[str] | None = None) -> None:
+    """
+    Read JSON from stdin, write proposals JSON to stdout.
+
+    Request shape::
+        {"text": "...", "civ": ["c","j","k"], ...}
+        {"chunks": ["para1", "para2", ...], "civ": ["c"], ...}
+        {"mode": "tag", "chunks": [...], ...}  — tag-only (parse, no solve)
+        {"mode": "resolve", "dates": ["<date>...</date>", ...], ...}  — "one_pass": true for large batches
+        {"mode": "authority", "civ": ["c","j","k"], ...}  — lookup lists for UI pickers
+        {"mode": "authority", "ifNoneMatch": "<etag>"}  — {"notModified": true} if unchanged
+        {"mode": "search", "query": "贞观", "kind": "era", "limit": 20}  — ranked label search
+        {"chunks": [...], "stream": true, ...}  — NDJSON progress lines, then result
+        {"chunks": [...], "session": "doc-1", ...}  — reuse results from earlier requests (server mode)
+        {"chunks": [...], "stream": true, "timings": true, ...}  — per-stage ms and counters on chunk events
+
+    With ``--serve`` the process stays up with tables and taggers warm and answers
+    NDJSON requests (same shapes, optional ``id``) on stdin/stdout, or on a local
+    Unix socket (``--socket PATH``) or HTTP listener (``--http [HOST:]PORT``, POST).
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m sanmiao.tei_bridge")
+    parser.add_argument("--serve", action="store_true", help="serve NDJSON requests until EOF")
+    parser.add_argument("--socket", metavar="PATH", help="serve NDJSON on a Unix socket")
+    parser.add_argument("--http", metavar="[HOST:]PORT", help="serve POST requests over HTTP")
+    parser.add_argument("--civ", default="c,j,k", help="civilisations to warm up (default: c,j,k)")
+    parser.add_argument("--timings", action="store_true", help="add per-stage timings to progress events")
+    args = parser.parse_args(argv)
+    defaults = {"timings": True} if args.timings else {}
+
+    if args.serve or args.socket or args.http:
+        civ = [c for c in args.civ.split(",") if c]
+        ms = warm_up(civ=civ)
+        ready = {"type": "ready", "ms": ms}
+        if args.socket:
+            print(json.dumps({**ready, "socket": args.socket}), file=sys.stderr, flush=True)
+            _serve_unix_socket(args.socket, defaults)
+        elif args.http:
+            host, _, port = args.http.rpartition(":")
+            print(json.dumps({**ready, "http": args.http}), file=sys.stderr, flush=True)
+            _serve_http(host or "127.0.0.1", int(port), defaults)
+        else:
+            print(json.dumps(ready), flush=True)
+            serve_ndjson(sys.stdin, sys.stdout, defaults)
         return
-    text = req.get("text", "")
-    proposals = propose_dates(text, **_kwargs_for(propose_dates, opts))
-    json.dump(proposals, sys.stdout, ensure_ascii=False)
+
+    req = {**defaults, **json.load(sys.stdin)}
+    if _is_stream_request(req):
+        def emit(event: dict[str, Any]) -> None:
+            print(json.dumps(event, ensure_ascii=False), flush=True)
+
+        emit(handle_request(req, emit=emit))
+        return
+    sys.stdout.write(_dumps(handle_request(req)))
 
 
 if __name__ == "__main__":
@@ -4,7 +4,7 @@ import re
 import lxml.etree as et
 from typing import Callable, Any
 
-from .ns import child_local_names, is_tag, local_name, tag_in, xpath_dates
+from .ns import child_local_names, is_tag, tag_in, xpath_dates
 
 # Regex patterns for XML processing
 WS_RE = re.compile(r"\s+")
@@ -42,20 +42,14 @@ def clean_attributes(xml_string: str) -> str:
     return xml_string
 
 
-def remove_lone_tags(xml_string: str) -> et._Element:
+def _strip_lone_dates(xml_root: et._Element) -> list:
     """
-    Remove lone date tags that don't contain meaningful content.
+    Unwrap lone date tags in place (see remove_lone_tags).
 
-    :param xml_string: XML string
-    :return: XML element with lone tags removed
+    :param xml_root: XML root element
+    :return: list of the <date> elements that were kept
     """
-    # Parse XML
-    try:
-        xml_root = et.fromstring(xml_string.encode('utf-8'))
-    except et.ParseError:
-        # Return a dummy element if parsing fails
-        return et.Element("root")
-
+    kept = []
     for node in xpath_dates(xml_root):
         # Common false positives from prose (e.g. "一年", "一月", "一日")
         # that don't carry enough information to resolve as dates.
@@ -87,40 +81,51 @@ def remove_lone_tags(xml_string: str) -> et._Element:
             for child in node:
                 child.tag = 'to_remove'
             node.tag = 'to_remove'
-    
-    et.strip_tags(xml_root, 'to_remove')    
-    
+
+        if node.tag != 'to_remove':
+            kept.append(node)
+
+    et.strip_tags(xml_root, 'to_remove')
+    return kept
+
+
+def remove_lone_tags(xml_string: str) -> et._Element:
+    """
+    Remove lone date tags that don't contain meaningful content.
+
+    :param xml_string: XML string
+    :return: XML element with lone tags removed
+    """
+    # Parse XML
+    try:
+        xml_root = et.fromstring(xml_string.encode('utf-8'))
+    except et.ParseError:
+        # Return a dummy element if parsing fails
+        return et.Element("root")
+
+    _strip_lone_dates(xml_root)
     return xml_root
 
 
-def fix_dynasty_mismatch_xml(xml_string: str, mismatch_date_indices: set) -> str:
+def fix_dynasty_mismatch_tree(xml_root: et._Element, mismatch_date_indices: set) -> set:
     """
     For date elements whose index is in mismatch_date_indices, move <dyn> content
     out of the <date> (so the dynasty text becomes preceding sibling text), then
-    run remove_lone_tags so that dates left with only era/ruler get stripped.
+    strip lone date tags so that dates left with only era/ruler are unwrapped.
+    Works on the live tree.
 
     Used when dynasty-restricted resolution found no valid era_id/ruler_id:
     the dynasty string (e.g. 清) is moved out so the leftover <date> can be
-    removed by remove_lone_tags, and the table rows for these indices are
-    dropped by the caller.
+    removed, and the table rows for these indices are dropped by the caller.
 
-    :param xml_string: Full document XML string
+    :param xml_root: XML root element (modified in place)
     :param mismatch_date_indices: Set of date_index values (int or str) to fix
-    :return: Modified XML string
+    :return: Set of numeric date @index values still present afterwards
     """
-    if not mismatch_date_indices:
-        return xml_string
-    try:
-        root = et.fromstring(xml_string.encode('utf-8'))
-    except et.ParseError:
-        return xml_string
-
     # Normalise to set of strings for attribute comparison (XML @index is often string)
     mismatch_str = {str(i) for i in mismatch_date_indices}
 
-    for node in root.iter():
-        if not is_tag(node, 'date'):
-            continue
+    for node in xpath_dates(xml_root):
         idx = node.get('index')
         if idx is None or str(idx) not in mismatch_str:
             continue
@@ -145,9 +150,44 @@ def fix_dynasty_mismatch_xml(xml_string: str, mismatch_date_indices: set) -> str
         dyn.tail = None
         node.remove(dyn)
 
-    new_str = et.tostring(root, encoding='unicode', method='xml')
-    root2 = remove_lone_tags(new_str)
-    return et.tostring(root2, encoding='unicode', method='xml')
+    out = set()
+    for node in _strip_lone_dates(xml_root):
+        idx = _index_number(node.get('index'))
+        if idx is not None:
+            out.add(idx)
+    return out
+
+
+def fix_dynasty_mismatch_xml(xml_string: str, mismatch_date_indices: set) -> str:
+    """
+    String form of fix_dynasty_mismatch_tree: parse, fix, serialise.
+
+    :param xml_string: Full document XML string
+    :param mismatch_date_indices: Set of date_index values (int or str) to fix
+    :return: Modified XML string
+    """
+    if not mismatch_date_indices:
+        return xml_string
+    try:
+        root = et.fromstring(xml_string.encode('utf-8'))
+    except et.ParseError:
+        return xml_string
+    fix_dynasty_mismatch_tree(root, mismatch_date_indices)
+    return et.tostring(root, encoding='unicode', method='xml')
+
+
+def _index_number(idx):
+    """@index as int, else float, else None (NaN included)."""
+    if idx is None:
+        return None
+    try:
+        return int(idx)
+    except (ValueError, TypeError):
+        try:
+            value = float(idx)
+        except (ValueError, TypeError):
+            return None
+        return None if value != value else value
 
 
 def date_indices_in_xml_string(xml_string: str) -> set:
@@ -0,0 +1,56 @@
+"""Bulk extraction and solver kernel tests."""
+
+import lxml.etree as et
+import pandas as pd
+import pytest
+
+from sanmiao import index_date_nodes, tag_date_elements
+from sanmiao.ns import xpath_dates
+
+
+def test_array_solver_kernel_matches_frame_kernel():
+    import copy
+
+    from sanmiao.loaders import prepare_tables
+    from sanmiao.bulk_processing import extract_date_table_bulk
+    from sanmiao import consolidate_date, remove_lone_tags, strip_text
+
+    text = "宋元嘉三年四月晦，大赦。明年正月，旱。貞觀三年，四月甲子。建安十八年五月丙申。唐甲子年。開元十年正月朔。"
+    tables = prepare_tables(civ=["c", "j"])
+    root = index_date_nodes(strip_text(remove_lone_tags(consolidate_date(tag_date_elements(text, civ=["c", "j"])))))
+    _, frame_df, frame_implied, _ = extract_date_table_bulk(copy.deepcopy(root), civ=["c", "j"], tables=tables, solver_kernel="frame")
+    _, array_df, array_implied, _ = extract_date_table_bulk(copy.deepcopy(root), civ=["c", "j"], tables=tables, solver_kernel="array")
+    pd.testing.assert_frame_equal(array_df, frame_df)
+    assert frame_implied["era_id_ls"] and array_implied == frame_implied
+    with pytest.raises(ValueError):
+        extract_date_table_bulk(copy.deepcopy(root), civ=["c", "j"], tables=tables, solver_kernel="numba")
+
+
+def test_assemble_date_results_schema_and_dedup():
+    from sanmiao.bulk_processing import assemble_date_results
+
+    a = pd.DataFrame({"era_id": [1.0, None], "ruler_id": [10.0, None], "dyn_id": [5, 5], "note": ["x", "y"], "date_index": 1})
+    b = pd.DataFrame({"era_id": [2.0, 3.0], "ruler_id": [20.0, 20.0], "dyn_id": [6, 6], "intercalary": [0, 0], "date_index": 0})
+    c = pd.DataFrame({"era_id": [None], "ruler_id": [None], "dyn_id": [7], "intercalary": pd.Series([1.0], dtype=object), "date_index": 2})
+    out = assemble_date_results([a, pd.DataFrame(), b, c])
+    assert list(out.columns) == ["era_id", "ruler_id", "dyn_id", "note", "intercalary", "date_index"]
+    assert out["date_index"].tolist() == [0, 1, 2]
+    assert out["era_id"].tolist()[:2] == [2.0, 1.0]
+    assert out["note"].dtype == object and out["note"].iloc[2] is pd.NA
+    assert out["intercalary"].dtype == "float64"
+    assert assemble_date_results([pd.DataFrame()]).empty
+
+
+def test_dynasty_mismatch_fix_edits_live_tree():
+    from sanmiao.loaders import prepare_tables
+    from sanmiao.bulk_processing import extract_date_table_bulk
+    from sanmiao import consolidate_date, remove_lone_tags
+
+    text = "清貞觀三年四月。宋元嘉三年。唐永平元年。"
+    root = index_date_nodes(remove_lone_tags(consolidate_date(tag_date_elements(text, civ=["c", "j", "k"]))))
+    xml_string, df, _, modified = extract_date_table_bulk(root, civ=["c", "j", "k"], tables=prepare_tables(civ=["c", "j", "k"]))
+    assert modified
+    assert [d.findtext("dyn") for d in xpath_dates(root)] == [None, "宋", None]
+    assert xml_string.startswith("<root>清<date") and "。唐<date" in xml_string
+    assert et.tostring(root, encoding="unicode") == xml_string
+    assert sorted(df["date_index"].unique()) == [0, 1, 2]
@@ -0,0 +1,35 @@
+"""Numeral conversion tests."""
+
+import pandas as pd
+
+from sanmiao import numcon, numcon_series
+from sanmiao.converters import _ZH_TO_INT, _parse_zh_numeral
+
+
+def test_numcon_round_trip():
+    for n in range(1, 10000):
+        assert numcon(numcon(n)) == n
+
+
+def test_numcon_table_matches_parser():
+    for spelling, n in _ZH_TO_INT.items():
+        assert _parse_zh_numeral(spelling) == n, spelling
+
+
+def test_numcon_variants():
+    assert numcon("廿三") == 23
+    assert numcon("卅") == 30
+    assert numcon("十有二") == 12
+    assert numcon("元") == 1
+    assert numcon("正月") == 1
+
+
+def test_numcon_series_matches_numcon():
+    strs = ["廿三", "十有二", "元", "三載", "二千五", None, "x"]
+    got = numcon_series(pd.Series(strs)).tolist()
+    for s, g in zip(strs, got):
+        want = numcon(s) if s is not None else None
+        assert (pd.isna(g) and want is None) or g == want, s
+    assert numcon_series(pd.Series(["三", "x"])).isna().tolist() == [False, True]
+    ints = [1, 23, 300, 12345]
+    assert numcon_series(pd.Series(ints)).tolist() == [numcon(i) for i in ints]
@@ -1,4 +1,8 @@
-from sanmiao.date_authority import list_date_authority
+import gzip
+import json
+
+from sanmiao.date_authority import date_authority_payload, list_date_authority, search_authority
+from sanmiao.tei_bridge import _dumps, handle_request
 
 
 def test_list_date_authority_has_song_dynasty():
@@ -12,3 +16,32 @@ def test_list_date_authority_has_song_dynasty():
 
     song_rulers = [r for r in data["rulers"] if r["dynId"] == 119]
     assert len(song_rulers) > 0
+
+
+def test_date_authority_payload_is_cached_and_conditional():
+    payload = date_authority_payload(civ=["c"])
+    assert date_authority_payload(civ="c") is payload
+    assert gzip.decompress(payload["gzip"]) == payload["json"]
+    body = json.loads(payload["json"])
+    assert body["etag"] == payload["etag"]
+    assert {k: v for k, v in body.items() if k != "etag"} == list_date_authority(civ=["c"])
+
+    fresh = json.loads(_dumps(handle_request({"mode": "authority", "civ": ["c"]})))
+    assert fresh["etag"] == payload["etag"]
+    unchanged = handle_request({"mode": "authority", "civ": ["c"], "ifNoneMatch": payload["etag"]})
+    assert unchanged == {"notModified": True, "etag": payload["etag"]}
+
+
+def test_search_authority_ranks_and_normalises():
+    results = search_authority("贞观", civ=["c"], kind="era")
+    assert results and results[0]["label"] == "貞觀" and results[0]["match"] == "exact"
+    assert all(r["kind"] == "era" for r in results)
+
+    tang = search_authority("唐", civ=["c"])
+    assert tang[0]["kind"] == "dynasty" and tang[0]["label"] == "唐"
+    ranks = ["exact", "prefix", "substring"]
+    assert [r["match"] for r in tang] == sorted((r["match"] for r in tang), key=ranks.index)
+
+    assert search_authority("建武中元", civ=["c"])[0]["label"] == "建武中元"
+    assert len(search_authority("元", civ=["c"], limit=5)) == 5
+    assert handle_request({"mode": "search", "query": "建隆", "civ": ["c"]})[0]["label"] == "建隆"
@@ -0,0 +1,41 @@
+"""Profiler and stage timing tests."""
+
+import io
+import json
+
+import pytest
+
+from sanmiao.tei_bridge import propose_dates_batch, serve_ndjson
+
+
+def test_stage_timings_on_chunk_events():
+    requests = json.dumps({"chunks": ["永明元年春正月", ""], "civ": ["c"], "stream": True}) + "\n"
+    out = io.StringIO()
+    serve_ndjson(io.StringIO(requests), out, {"timings": True})
+    events = [json.loads(line) for line in out.getvalue().splitlines()]
+    chunk = events[1]
+    assert {"tag", "consolidate", "resolve", "candidates", "solve", "report"} <= set(chunk["stageMs"])
+    assert chunk["counts"]["dateNodes"] == 1
+    assert chunk["counts"]["regexPasses"] > 0
+    plain = propose_dates_batch(["永明元年"], civ=["c"], on_chunk=events.append)
+    assert "stageMs" not in events[-1] and plain
+
+
+def test_profile_counts_hot_paths_and_restores_originals(tmp_path):
+    import sanmiao
+    from sanmiao import converters, solving
+
+    original = solving.jdn_to_iso
+    with sanmiao.profile(trace=True, out=tmp_path / "trace.json") as prof:
+        events = []
+        propose_dates_batch(["永明元年春正月", "明年夏四月"], civ=["c"], stage_timings=True, on_chunk=events.append)
+        with pytest.raises(RuntimeError):
+            sanmiao.profile().__enter__()
+    assert solving.jdn_to_iso is original and converters.jdn_to_iso is original
+    summary = prof.as_dict()
+    assert summary["functions"]["bulk_processing.bulk_generate_date_candidates"]["calls"] == 2
+    assert summary["functions"]["bulk_processing.bulk_generate_date_candidates"]["rowsMax"] >= 1
+    assert summary["counts"]["candidateRowsMax"] >= 1
+    assert summary["counts"]["dateNodes"] == sum(e["counts"]["dateNodes"] for e in events if e["type"] == "chunk")
+    trace = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))
+    assert {e["ph"] for e in trace["traceEvents"]} == {"X"}
@@ -0,0 +1,106 @@
+"""Calendar string reporting tests."""
+
+import pytest
+
+from sanmiao import DayIndex, jdn_to_ccs, jdn_to_ccs_batch, jy_to_ccs, jy_to_ccs_batch
+
+
+@pytest.mark.parametrize("by_era", [True, False])
+def test_jdn_to_ccs_batch_matches_single(by_era):
+    xs = [1954261.5, 2299160.5, "1000-03-04", "0600-01-01"]
+    batch = jdn_to_ccs_batch(xs, by_era=by_era)
+    for i, x in enumerate(xs):
+        single = jdn_to_ccs(x, by_era=by_era)
+        want = sorted(single.split("\n")[2:]) if single else []
+        assert sorted(batch.loc[batch["input_index"] == i, "ccs"]) == want
+
+
+def test_jdn_to_ccs_batch_fields():
+    batch = jdn_to_ccs_batch([1954261.5, "not a date"])
+    assert set(batch["input_index"]) == {0}
+    row = batch[batch["era_name"] == "貞觀"].iloc[0]
+    assert (row["year"], row["month"], row["day"]) == (12, 5, 8)
+    assert row["iso"] == "0638-06-24"
+
+
+@pytest.mark.parametrize("by_era", [True, False])
+def test_jdn_to_ccs_batch_no_match_keeps_string_columns(by_era):
+    batch = jdn_to_ccs_batch([1.0], by_era=by_era)
+    assert batch.empty
+    assert {"iso", "ccs"} <= set(batch.columns)
+    assert "ccs" not in jdn_to_ccs_batch([1.0], by_era=by_era, strings=False).columns
+
+
+def test_jy_to_ccs_batch_matches_single():
+    years = [-100, 638, 2050]
+    batch = jy_to_ccs_batch(years)
+    assert batch.loc[batch["input_index"] == 0, "ccs"].to_list() == ["西漢孝武太初四年（歲在庚辰）"]
+    assert batch.loc[batch["input_index"] == 1, "ccs"].to_list() == [
+        "唐李世民貞觀十二年（歲在戊戌）",
+        "日本舒明天皇十年（歲在戊戌）",
+        "高句麗榮留王二十一年（歲在戊戌）",
+        "百濟武王三十九年（歲在戊戌）",
+        "新羅善德王仁平五年（歲在戊戌）",
+    ]
+    assert batch.loc[batch["input_index"] == 2].empty
+    assert jy_to_ccs(638).split("\n")[2:] == batch.loc[batch["input_index"] == 1, "ccs"].to_list()
+    tang = batch[(batch["input_index"] == 1) & (batch["era_name"] == "貞觀")].iloc[0]
+    assert tang["era_year"] == 12
+
+
+def test_day_index_matches_interval_lookup(tmp_path):
+    DayIndex.build().save(tmp_path)
+    index = DayIndex.load(tmp_path)
+    xs = [1954261.5, 2299160.5, 1700000.25, "1000-03-04", 1.0]
+    assert jdn_to_ccs_batch(xs).equals(jdn_to_ccs_batch(xs, day_index=index))
+
+
+def test_candidate_budget_reports_too_many_candidates(monkeypatch):
+    from sanmiao import cjk_date_interpreter
+    from sanmiao.budget import estimate_merge_rows
+    import pandas as pd
+
+    left = pd.DataFrame({"k": [1, 1, 2, None], "v": range(4)})
+    right = pd.DataFrame({"k": [1, 1, 1, 3, None], "w": range(5)})
+    for how in ("left", "inner"):
+        assert estimate_merge_rows(left, right, "k", how) == len(left.merge(right, on="k", how=how))
+
+    monkeypatch.setenv("SANMIAO_MAX_CANDIDATE_ROWS", "10000")
+    report = cjk_date_interpreter("三年四月甲子", civ=["c"], sequential=False)
+    assert report.splitlines()[2].endswith("candidates. Please narrow date range.")
+    assert "1103-05-23" in cjk_date_interpreter("貞觀三年四月甲子", civ=["c"], sequential=False)
+
+
+def test_cjk_date_interpreter_structured_formats():
+    import json
+
+    from sanmiao import cjk_date_interpreter
+
+    ui = "貞觀三年正月甲子\n1954261.5\n638\n唐"
+    df = cjk_date_interpreter(ui, civ=["c"], format="dataframe")
+    lines = df.drop_duplicates("input_index")
+    assert list(lines["input_index"]) == [0, 1, 2, 3]
+    assert list(lines["input_type"]) == ["ccs", "jdn", "year", "ccs"]
+    tang = df[df["era_name"] == "貞觀"].set_index("input_type")
+    assert tang.loc["ccs", "iso"] == "0629-02-20"
+    assert tang.loc["jdn", "iso"] == "0638-06-24"
+    assert (tang.loc["jdn", "year"], tang.loc["jdn", "month"], tang.loc["jdn", "day"]) == (12, 5, 8)
+    assert (tang.loc["year", "year"], tang.loc["year", "ind_year"]) == (12, 638)
+    assert df.loc[df["input_index"] == 3, "error_code"].tolist() == ["no-matches"]
+    assert all(code is None for code in df.loc[df["input_index"] < 3, "error_code"])
+
+    records = cjk_date_interpreter(ui, civ=["c"], format="records")
+    assert records == json.loads(cjk_date_interpreter(ui, civ=["c"], format="json"))
+    assert len(records) == len(df)
+    with pytest.raises(ValueError):
+        cjk_date_interpreter(ui, format="xml")
+
+
+def test_cjk_date_interpreter_structured_codes_per_date():
+    from sanmiao import cjk_date_interpreter
+
+    df = cjk_date_interpreter("貞觀三年四月甲子，五月丙寅", format="dataframe")
+    codes = df.groupby("date_index")["error_code"].agg(lambda s: set(s))
+    assert codes[0] == {None} and codes[1] == {"insuff-data"}
+    assert not df.duplicated().any()
+    assert sorted(df.loc[df["date_index"] == 0, "iso"]) == ["0861-06-02", "1103-05-23"]
@@ -0,0 +1,90 @@
+"""Process-pool, proposal cache and NDJSON server tests."""
+
+import io
+import json
+
+import pytest
+
+from sanmiao.tei_bridge import ProposalCache, propose_dates_batch, serve_ndjson
+
+
+def test_serve_ndjson_answers_each_line():
+    """Server mode: one result per request, ids echoed, bad lines answered with an error."""
+    requests = "\n".join([
+        json.dumps({"id": 1, "mode": "tag", "chunks": ["魏太和元年"], "civ": ["c"], "stream": True}),
+        "not json",
+        json.dumps({"id": 2, "mode": "authority", "civ": ["j"]}),
+    ]) + "\n"
+    out = io.StringIO()
+    serve_ndjson(io.StringIO(requests), out)
+    events = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [e["type"] for e in events] == ["init", "chunk", "result", "error", "result"]
+    assert [e.get("id") for e in events] == [1, 1, 1, None, 2]
+    assert events[2]["results"][0][0]["status"] == "tagged"
+    assert "eras" in events[4]["results"]
+
+
+@pytest.mark.parametrize("sequential", [True, False])
+def test_propose_dates_batch_workers_match_serial(sequential):
+    chunks = ["永明元年春正月", "明年夏四月", "", "唐太宗貞觀十二年五月八日", "其年冬十一月壬午"]
+    serial = propose_dates_batch(chunks, civ=["c"], sequential=sequential)
+    events = []
+    pooled = propose_dates_batch(chunks, civ=["c"], sequential=sequential, workers=2, on_chunk=events.append)
+    assert pooled == serial
+    assert [e["index"] for e in events if e["type"] == "chunk"] == list(range(len(chunks)))
+
+
+def test_propose_dates_batch_cache_reuses_converged_chunks():
+    chunks = ["永明元年春正月", "二年夏四月", "三年秋七月", "唐太宗貞觀十二年五月八日"]
+    cache = ProposalCache()
+    propose_dates_batch(chunks, civ=["c"], cache=cache)
+    edited = ["永明元年春正月", "二年夏五月", "三年秋七月", "唐太宗貞觀十二年五月八日"]
+    events = []
+    cached = propose_dates_batch(edited, civ=["c"], cache=cache, on_chunk=events.append)
+    assert cached == propose_dates_batch(edited, civ=["c"])
+    flags = [e["cached"] for e in events if e["type"] == "chunk"]
+    assert flags[0] is True and flags[1] is False and flags[-1] is True
+
+
+def test_propose_segment_states_match_serial():
+    import copy
+
+    from sanmiao.config import DEFAULT_GREGORIAN_START, DEFAULT_TAQ, DEFAULT_TPQ
+    from sanmiao.loaders import load_normalisation_map, prepare_tables
+    from sanmiao.tei_bridge import _propose_chunk, _propose_segment, _same
+
+    chunks = ["永明元年春正月", "明年夏四月", "其年冬十一月壬午"]
+    opts = dict(civ=["c"], sequential=True, proliferate=False, fuzzy=True, tpq=DEFAULT_TPQ,
+                taq=DEFAULT_TAQ, pg=False, gs=DEFAULT_GREGORIAN_START, lang="en")
+    tables, char_map = prepare_tables(civ=["c"]), load_normalisation_map()
+    serial, implied = [], None
+    for text in chunks:
+        _, implied = _propose_chunk(text, implied, tables=tables, char_map=char_map, **opts)
+        serial.append(copy.deepcopy(implied))
+    states = [state for _, state, _, _ in _propose_segment(chunks, opts)]
+    assert (states[0]["year"], states[0]["month"]) == (1, 1)
+    assert all(_same(a, b) for a, b in zip(states, serial))
+
+
+def test_propose_dates_batch_workers_fill_cache_with_serial_states():
+    cache = ProposalCache()
+    propose_dates_batch(["永明元年春正月", "明年夏四月", "唐太宗貞觀十二年五月八日", "其年冬十一月壬午"],
+                        civ=["c"], workers=2, cache=cache)
+    edited = ["永明元年春正月", "明年夏四月", "其年冬十一月壬午"]
+    cached = propose_dates_batch(edited, civ=["c"], cache=cache)
+    assert cached == propose_dates_batch(edited, civ=["c"])
+    assert "永明二年" in cached[2][0]["candidates"][0]["displayLine"]
+
+
+def test_server_sessions_are_capped(monkeypatch):
+    from collections import OrderedDict
+
+    from sanmiao import tei_bridge
+
+    monkeypatch.setattr(tei_bridge, "_SESSIONS", OrderedDict())
+    monkeypatch.setattr(tei_bridge, "_MAX_SESSIONS", 2)
+    first = tei_bridge._session_cache("a")
+    tei_bridge._session_cache("b")
+    assert tei_bridge._session_cache("a") is first
+    tei_bridge._session_cache("c")
+    assert list(tei_bridge._SESSIONS) == ["a", "c"]
@@ -1,6 +1,7 @@
 """TEI namespace and tei_bridge tests."""
 
 import lxml.etree as et
+import pandas as pd
 import pytest
 
 from sanmiao import propose_dates, dates_xml_to_df, tag_date_elements, index_date_nodes
@@ -39,6 +40,22 @@ def test_dates_xml_to_df_namespaced_date_and_children():
     assert df.iloc[0]["era_str"] == "建安"
 
 
+def test_dates_xml_to_df_reads_first_child_of_each_kind():
+    xml = f"""<root xmlns="{TEI}">
+      <date index="0" era_id="5" lp="-1"><era>太
+ 和</era><!-- note --><rel unit="y">明年</rel><rel dir="next">x</rel></date>
+      <date index="1"><gz>甲子</gz><lp>朔</lp><int/><sexYear>甲子歲</sexYear><month>　</month><month>二月</month></date>
+    </root>"""
+    df = dates_xml_to_df(et.fromstring(xml.encode()), attributes=True)
+    assert df["era_str"].tolist()[0] == "太 和"
+    assert df.iloc[0]["rel_unit"] == "y" and pd.isna(df.iloc[0]["rel_dir"])
+    assert df.iloc[0]["rel_text"] == "明年"
+    assert (df.iloc[0]["era_id"], df.iloc[0]["lp"]) == (5, -1) and pd.isna(df.iloc[1]["era_id"])
+    assert df.iloc[1]["nmd_gz_str"] == "甲子" and df.iloc[1]["sexYear_str"] == "甲子"
+    assert pd.isna(df.iloc[1]["month_str"])
+    assert df["present_elements"].tolist() == ["e", "silzg"]
+
+
 def test_tag_date_elements_inside_tei_paragraph():
     """New <date> wrappers inherit TEI namespace; children stay unprefixed."""
     xml = f'<p xmlns="{TEI}">魏太和元年</p>'
@@ -86,6 +103,21 @@ def test_extract_and_resolve_date_fragment():
     assert isinstance(proposals, list)
 
 
+def test_extract_date_fragment_from_document_leaves_document_intact():
+    from sanmiao.ns import localize_namespaces, restore_namespaces
+
+    doc = et.fromstring(f'<p xmlns="{TEI}">魏<date index="0"><era>太和</era><year>元年</year></date>，大赦。</p>'.encode())
+    before = et.tostring(doc)
+    frag = extract_date_fragment(doc[0])
+    assert [el.tag for el in frag.iter()] == ["root", "date", "era", "year"]
+    assert frag[0].tail is None
+    assert et.tostring(doc) == before
+    renamed = localize_namespaces(doc)
+    assert doc[0].tag == "date" and len(renamed) == 4
+    restore_namespaces(renamed)
+    assert et.tostring(doc) == before
+
+
 def test_detect_wrapper_namespace_from_tei():
     root = et.fromstring(f'<TEI xmlns="{TEI}"><text><body><p>x</p></body></text></TEI>'.encode())
     assert detect_wrapper_namespace(root) == TEI
@@ -111,6 +143,58 @@ def test_resolve_dates_batch_sequential_context():
     assert "義熙三年" in results[1]["candidates"][0]["displayLine"]
 
 
+@pytest.mark.parametrize("sequential", [True, False])
+def test_resolve_dates_batch_one_pass_matches_per_element(sequential):
+    dates = [
+        "<date><year>三年</year><month>四月</month><gz>甲子</gz></date>",
+        "<date><era>義熙</era><year>元年</year><month>正月</month></date>",
+        "",
+        "<date><month>二月</month><gz>丙寅</gz></date>",
+        "<date><dyn>宋</dyn></date>",
+        "<date><era>貞觀</era><year>三年</year></date>",
+        "<date><year>四年</year></date>",
+    ]
+    per_element = resolve_dates_batch(dates, civ=["c"], sequential=sequential)
+    one_pass = resolve_dates_batch(dates, civ=["c"], sequential=sequential, one_pass=True)
+    assert one_pass[2] is None
+    for a, b in zip(per_element, one_pass):
+        if a is not None:
+            assert {**a, "date_index": 0} == {**b, "date_index": 0}
+    assert one_pass[0]["status"] == per_element[0]["status"] == "unique"
+    assert one_pass[4]["status"] == "ambiguous"
+
+
+@pytest.mark.parametrize("sequential", [True, False])
+def test_resolve_dates_batch_one_pass_matches_per_element_with_proliferate(sequential):
+    dates = [
+        "<date><era>義熙</era><year>元年</year><month>正月</month></date>",
+        "<date><rel>明年</rel><month>二月</month></date>",
+    ]
+    per_element = resolve_dates_batch(dates, civ=["c"], sequential=sequential, proliferate=True)
+    one_pass = resolve_dates_batch(dates, civ=["c"], sequential=sequential, proliferate=True, one_pass=True)
+    for a, b in zip(per_element, one_pass):
+        assert {**a, "date_index": 0} == {**b, "date_index": 0}
+    assert all(c["displayLine"].endswith("二月") for c in one_pass[1]["candidates"])
+
+
+def test_candidates_from_frame_matches_per_row_report():
+    from sanmiao.config import get_phrase_dic
+    from sanmiao.loaders import prepare_tables
+    from sanmiao.bulk_processing import add_can_names_bulk, extract_date_table_bulk
+    from sanmiao.tei_bridge import _candidate_from_row, _candidates_from_frame
+    from sanmiao import consolidate_date, remove_lone_tags, strip_text
+
+    text = "宋元嘉三年四月晦，大赦。明年正月，旱。貞觀三年，四月，建安十八年五月丙申。"
+    tables = prepare_tables(civ=["c", "j"])
+    root = index_date_nodes(strip_text(remove_lone_tags(consolidate_date(tag_date_elements(text, civ=["c", "j"])))))
+    _, df, _, _ = extract_date_table_bulk(root, civ=["c", "j"], tables=tables)
+    df = add_can_names_bulk(df, tables[6], tables[1], tables[0]).reset_index(drop=True)
+    for lang in ("en", "zh"):
+        phrase_dic = get_phrase_dic(lang)
+        expected = [_candidate_from_row(r, phrase_dic, False, None) for _, r in df.iterrows()]
+        assert _candidates_from_frame(df, phrase_dic, False, None) == expected
+
+
 def test_resolve_dates_batch_does_not_duplicate_tail_text_after_child_element():
     """
     A <date> whose content is <child>...</child>trailing-text (e.g. a TEI